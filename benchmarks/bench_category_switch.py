@@ -0,0 +1,85 @@
+# benchmarks/bench_category_switch.py
+"""
+Micro-benchmark: POS product grid category switching.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_category_switch --products 5000
+
+Times rebinding the grid model and processing the resulting layout/paint,
+against the 16.7 ms frame budget. No database is touched.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from ui.product_grid import ProductGridView
+
+FRAME_MS = 1000 / 60
+
+
+def make_products(count, categories):
+    return [
+        {"id": i, "name": f"Product {i}", "category_id": i % categories + 1,
+         "price": 100.0 + i % 50, "cost": 40.0, "category_name": f"Category {i % categories + 1}"}
+        for i in range(1, count + 1)
+    ]
+
+
+def run(products=2000, categories=12, switches=200, items=None):
+    """items: real product dicts (e.g. catalog.products()) instead of generated ones."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    view = ProductGridView()
+    view.resize(620, 640)
+    view.show()
+
+    items = items if items is not None else make_products(products, categories)
+    products = len(items)
+    by_category = {}
+    for p in items:
+        by_category.setdefault(p["category_id"], []).append(p)
+    categories = len(by_category)
+    targets = [items] + [by_category[c] for c in sorted(by_category)]
+
+    view.set_products(items)
+    app.processEvents()
+
+    timings = []
+    for i in range(switches):
+        start = time.perf_counter()
+        view.set_products(targets[i % len(targets)])
+        view.viewport().repaint()
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "products": products,
+        "categories": categories,
+        "switches": switches,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "max_ms": timings[-1],
+        "within_frame": timings[int(len(timings) * 0.95) - 1] < FRAME_MS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--switches", type=int, default=200)
+    args = parser.parse_args()
+
+    result = run(args.products, args.categories, args.switches)
+    for key, value in result.items():
+        print(f"{key:>12}: {value:.3f}" if isinstance(value, float) else f"{key:>12}: {value}")
+
+
+if __name__ == "__main__":
+    main()
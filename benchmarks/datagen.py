@@ -0,0 +1,176 @@
+# benchmarks/datagen.py
+"""
+Synthetic restaurant dataset for the benchmarks.
+
+    python -m benchmarks.datagen bench.db --scale medium
+    python -m benchmarks.datagen bench.db --categories 20 --products 400 --years 2 --orders-per-day 200
+
+Builds a database with the application's own schema (init_db + migrations):
+categories, products with costs and a skewed (Zipf-like) popularity, ingredients,
+tables, users, kitchen / cashier printers, and `years` of orders with lunch and
+dinner peaks, busier weekends and 1-6 lines each. Sales rollups are rebuilt at
+the end, so the result looks like a restaurant that has been running that long.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from models.database import use_database, init_db, get_connection
+from models.rollup import SalesRollup
+from models.catalog import catalog
+
+SCALES = {
+    "small": {"categories": 8, "products": 80, "years": 0.25, "orders_per_day": 60},
+    "medium": {"categories": 15, "products": 300, "years": 1, "orders_per_day": 150},
+    "large": {"categories": 30, "products": 1500, "years": 3, "orders_per_day": 300},
+}
+
+# share of the day's orders per opening hour (10:00 - 23:00), lunch and dinner peaks
+HOUR_WEIGHTS = {10: 2, 11: 6, 12: 14, 13: 13, 14: 6, 15: 3, 16: 3, 17: 4, 18: 8, 19: 13, 20: 14, 21: 9, 22: 4}
+WEEKDAY_FACTOR = [0.85, 0.85, 0.9, 0.95, 1.2, 1.35, 1.1]  # Monday .. Sunday
+CATEGORY_NAMES = ["Burgers", "Pizzas", "Tacos", "Sandwiches", "Salads", "Drinks", "Desserts", "Sides",
+                  "Chicken", "Wraps", "Pasta", "Breakfast", "Kids", "Coffee", "Juices"]
+INGREDIENTS = [("Bun", "pcs"), ("Beef patty", "pcs"), ("Cheese", "g"), ("Tomato", "g"), ("Lettuce", "g"),
+               ("Dough", "g"), ("Chicken", "g"), ("Fries", "g"), ("Sauce", "ml"), ("Tortilla", "pcs")]
+
+
+def _popularity(products, rng, skew=1.1):
+    """Zipf-like weights: a few best sellers, a long tail."""
+    ranked = list(products)
+    rng.shuffle(ranked)
+    return ranked, [1 / (rank ** skew) for rank in range(1, len(ranked) + 1)]
+
+
+def generate(path, categories=15, products=300, years=1.0, orders_per_day=150, printers=4,
+             tables=20, seed=42, end=None, pending=5, progress=None):
+    """Create (overwrite) a dataset at path and make it the pool's database. Returns row counts."""
+    rng = random.Random(seed)
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm"):
+        stale = path.with_name(path.name + suffix)
+        if stale.exists():
+            stale.unlink()
+    use_database(path)
+    init_db()
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+
+    names = [CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f"Category {i + 1}" for i in range(categories)]
+    cur.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(n,) for n in names])
+    category_ids = [row[0] for row in cur.execute("SELECT id FROM categories ORDER BY id").fetchall()]
+
+    product_rows = []
+    for i in range(products):
+        price = float(rng.choice(range(150, 1500, 50)))
+        product_rows.append((f"Product {i + 1}", category_ids[i % len(category_ids)], price,
+                             round(price * rng.uniform(0.25, 0.45), 2), "available"))
+    cur.executemany("INSERT INTO products (name, category_id, price, cost, status) VALUES (?, ?, ?, ?, ?)",
+                    product_rows)
+    catalog_rows = cur.execute("SELECT id, price FROM products ORDER BY id").fetchall()
+    ranked, weights = _popularity([(row[0], row[1]) for row in catalog_rows], rng)
+
+    cur.executemany("""
+        INSERT INTO ingredients (name, quantity, unit, min_quantity, cost, product_id) VALUES (?, ?, ?, ?, ?, ?)
+    """, [(name, rng.randint(50, 5000), unit, 20, round(rng.uniform(1, 50), 2), product_id)
+          for product_id, _ in catalog_rows for name, unit in rng.sample(INGREDIENTS, 3)])
+
+    cur.executemany("INSERT OR IGNORE INTO tables (table_number, name, status) VALUES (?, ?, 'Free')",
+                    [(n, f"Table {n}") for n in range(1, tables + 1)])
+    table_ids = [row[0] for row in cur.execute("SELECT id FROM tables").fetchall()]
+    cur.executemany("INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
+                    [("bench_admin", "x", "admin"), ("cashier1", "x", "cashier"), ("cashier2", "x", "cashier")])
+    user_ids = [row[0] for row in cur.execute("SELECT id FROM users").fetchall()]
+
+    kitchen = max(1, printers - 1)
+    for n in range(kitchen):
+        cur.execute("""
+            INSERT INTO printers (name, connection_type, ip_address, port, status)
+            VALUES (?, 'network', ?, 9100, 'online')
+        """, (f"Kitchen {n + 1}", f"10.0.0.{n + 10}"))
+        printer_id = cur.lastrowid
+        cur.executemany("INSERT OR IGNORE INTO printer_categories (printer_id, category_id) VALUES (?, ?)",
+                        [(printer_id, category_ids[i]) for i in range(n, len(category_ids), kitchen)])
+    if printers > 1:
+        cur.execute("""
+            INSERT INTO printers (name, connection_type, ip_address, port, is_cashier, status)
+            VALUES ('Cashier', 'network', '10.0.0.9', 9100, 1, 'online')
+        """)
+
+    # orders, day by day
+    end = end or date.today()
+    days = max(1, int(years * 365))
+    hours, hour_weights = list(HOUR_WEIGHTS), list(HOUR_WEIGHTS.values())
+    orders = items = 0
+    for offset in range(days, 0, -1):
+        day = end - timedelta(days=offset)
+        count = max(1, int(rng.gauss(orders_per_day, orders_per_day * 0.1) * WEEKDAY_FACTOR[day.weekday()]))
+        order_rows, item_rows = [], []
+        for hour in sorted(rng.choices(hours, hour_weights, k=count)):
+            created_at = datetime(day.year, day.month, day.day, hour, rng.randrange(60),
+                                  rng.randrange(60)).isoformat()
+            lines = {}
+            for product_id, price in rng.choices(ranked, weights, k=rng.choice((1, 1, 2, 2, 3, 3, 4, 5, 6))):
+                lines[product_id] = (lines.get(product_id, (0, price))[0] + 1, price)
+            total = sum(qty * price for qty, price in lines.values())
+            order_rows.append((rng.choice(table_ids), rng.choice(user_ids), total,
+                               "cash" if rng.random() < 0.7 else "card", "paid", created_at, lines))
+        for table_id, user_id, total, payment, status, created_at, lines in order_rows:
+            cur.execute("""
+                INSERT INTO orders (table_id, user_id, total, payment_type, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (table_id, user_id, total, payment, status, created_at))
+            order_id = cur.lastrowid
+            item_rows.extend((order_id, product_id, qty, price, qty) for product_id, (qty, price) in lines.items())
+        cur.executemany("""
+            INSERT INTO order_items (order_id, product_id, quantity, price, printed_qty) VALUES (?, ?, ?, ?, ?)
+        """, item_rows)
+        orders += len(order_rows)
+        items += len(item_rows)
+        if progress:
+            progress(days - offset + 1, days)
+
+    # a few tables still open
+    cur.execute("""
+        UPDATE orders SET status = 'pending'
+        WHERE id IN (SELECT id FROM orders ORDER BY id DESC LIMIT ?)
+    """, (pending,))
+    conn.commit()
+    conn.close()
+
+    SalesRollup.rebuild()
+    catalog.invalidate()
+    conn = get_connection()
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    return {"categories": categories, "products": products, "orders": orders, "order_items": items,
+            "days": days}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic restaurant database")
+    parser.add_argument("path")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--categories", type=int)
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--years", type=float)
+    parser.add_argument("--orders-per-day", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    started = time.perf_counter()
+    counts = generate(args.path, seed=args.seed, **params)
+    print(f"✅ {args.path}: " + ", ".join(f"{v} {k}" for k, v in counts.items())
+          + f" in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
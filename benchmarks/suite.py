@@ -0,0 +1,308 @@
+# benchmarks/suite.py
+"""
+Benchmark suite over synthetic restaurant data (benchmarks.datagen).
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.suite --scale small medium --out results.json
+    python -m benchmarks.suite --scale medium --compare baseline.json
+
+For each scale a fresh database is generated in a temporary directory and the
+hot paths are timed on it: Product.get_all, POS category switching (catalog
+lookup + product grid), the ReportsPage.load_data queries, Order.filter, order
+and catalog exports, checkout through OrderController, and sending a kitchen
+ticket to a fake network printer (utils.fake_printer) over a pooled
+PrinterSession and over a new connection per ticket. Results are written
+as JSON (per benchmark: runs, mean / p50 / p95 / max in ms, plus the
+environment) so runs of two versions can be compared with --compare, which
+exits non-zero when a benchmark got slower than the threshold.
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from benchmarks.datagen import SCALES, generate
+from models.catalog import catalog
+
+RUNS = {"small": 20, "medium": 10, "large": 5}
+
+
+def _stats(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[max(0, int(len(timings) * 0.95) - 1)],
+        "max_ms": timings[-1],
+    }
+
+
+def _time(fn, runs, setup=None):
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return _stats(timings)
+
+
+# --- benchmarks: each takes (runs, workdir) and returns a result dict ---
+def bench_product_get_all(runs, workdir):
+    from models.product import Product
+    return _time(Product.get_all, runs)
+
+
+def bench_catalog_load(runs, workdir):
+    """Cold catalog load, as after an edit in the admin dashboard."""
+    return _time(catalog.products, runs, setup=catalog.invalidate)
+
+
+def bench_category_lookup(runs, workdir):
+    """The data side of a POS category switch: every category once, cache warm."""
+    ids = [c["id"] for c in catalog.categories()]
+
+    def switch_all():
+        for category_id in ids:
+            catalog.products_in_category(category_id)
+    return _time(switch_all, runs)
+
+
+def bench_pos_category_switch(runs, workdir):
+    """Rebinding the POS product grid to each category of the real catalog."""
+    from benchmarks.bench_category_switch import run
+    result = run(switches=max(runs * 10, 50), items=catalog.products())
+    return {key: result[key] for key in ("mean_ms", "p50_ms", "p95_ms", "max_ms")} | {"runs": result["switches"]}
+
+
+def _report_range(days):
+    end = date.today()
+    return (end - timedelta(days=days)).isoformat(), end.isoformat()
+
+
+def bench_reports_load(runs, workdir):
+    """What ReportsPage.load_data reads for the last 30 days: daily rows + category chart."""
+    from models.rollup import SalesRollup
+    start, end = _report_range(30)
+
+    def load():
+        rows = [row for chunk in SalesRollup.daily_chunks(start, end) for row in chunk]
+        SalesRollup.by_category(start, end)
+        return rows
+    return _time(load, runs)
+
+
+def bench_reports_load_all(runs, workdir):
+    """ReportsPage.load_data without a date filter (the whole history)."""
+    from models.rollup import SalesRollup
+
+    def load():
+        rows = [row for chunk in SalesRollup.daily_chunks() for row in chunk]
+        SalesRollup.by_category()
+        return rows
+    return _time(load, runs)
+
+
+def bench_order_filter_month(runs, workdir):
+    from models.order import Order
+    start, end = _report_range(30)
+    return _time(lambda: Order.filter(start, end, "cash"), runs)
+
+
+def bench_order_filter_year(runs, workdir):
+    from models.order import Order
+    start, end = _report_range(365)
+    return _time(lambda: Order.filter(start, end), max(1, runs // 4))
+
+
+def _export(fmt, lines, runs, workdir):
+    from controllers.order_export import export_orders
+    from models.order import OrderQuery
+    start, end = _report_range(90)
+    target = Path(workdir) / f"orders.{fmt}"
+    return _time(lambda: export_orders(target, OrderQuery().between(start, end), fmt, lines=lines), runs)
+
+
+def bench_export_orders_csv(runs, workdir):
+    """Last 90 days of orders, one row per order line."""
+    return _export("csv", True, max(1, runs // 4), workdir)
+
+
+def bench_export_orders_xlsx(runs, workdir):
+    return _export("xlsx", False, max(1, runs // 4), workdir)
+
+
+def bench_export_catalog(runs, workdir):
+    from controllers.catalog_io import export_catalog
+    target = Path(workdir) / "catalog.csv"
+    return _time(lambda: export_catalog(target, "csv"), max(1, runs // 2))
+
+
+def bench_checkout(runs, workdir):
+    """New paid orders through OrderController.checkout (writes; runs last)."""
+    from controllers.order_controller import OrderController
+    products = catalog.products()
+    carts = [[{"product_id": p["id"], "qty": 1 + i % 3, "price": p["price"]}
+              for i, p in enumerate(products[n % len(products):n % len(products) + 4])]
+             for n in range(runs * 5)]
+    carts = iter(carts)
+    return _time(lambda: OrderController.checkout(1, 1, next(carts), "cash", "paid"), runs * 5)
+
+
+def _send_ticket(runs, session_for):
+    """Kitchen ticket -> FakePrinterServer, timed until the printer has all of it."""
+    from utils.fake_printer import FakePrinterServer
+    from utils.receipt_renderer import receipts
+    lines = [{"product_name": p["name"], "quantity": 1 + i % 3} for i, p in enumerate(catalog.products()[:6])]
+    ticket = receipts.kitchen_ticket(1, "Kitchen", lines, "Table 1")
+    with FakePrinterServer() as server:
+        key = ("network",) + server.address
+
+        def send():
+            expected = len(server.received) + len(ticket)
+            session_for(key).send_raw(ticket)
+            while len(server.received) < expected:
+                time.sleep(0)
+        return _time(send, runs * 5)
+
+
+def bench_printer_send(runs, workdir):
+    """Ticket over the long-lived PrinterSession of a SessionManager (utils.escpos_sessions)."""
+    from utils.escpos_sessions import SessionManager
+    manager = SessionManager()
+    try:
+        return _send_ticket(runs, manager.session)
+    finally:
+        manager.close_all()
+
+
+def bench_printer_connect_send(runs, workdir):
+    """Ticket over a new connection each time, for comparison with printer_send."""
+    from utils.escpos_sessions import PrinterSession
+    opened = []
+
+    def fresh(key):
+        if opened:
+            opened.pop().close()
+        opened.append(PrinterSession(key))
+        return opened[-1]
+    try:
+        return _send_ticket(runs, fresh)
+    finally:
+        for session in opened:
+            session.close()
+
+
+BENCHMARKS = {
+    "product_get_all": bench_product_get_all,
+    "catalog_load": bench_catalog_load,
+    "category_lookup": bench_category_lookup,
+    "pos_category_switch": bench_pos_category_switch,
+    "reports_load_30d": bench_reports_load,
+    "reports_load_all": bench_reports_load_all,
+    "order_filter_30d": bench_order_filter_month,
+    "order_filter_365d": bench_order_filter_year,
+    "export_orders_csv": bench_export_orders_csv,
+    "export_orders_xlsx": bench_export_orders_xlsx,
+    "export_catalog": bench_export_catalog,
+    "printer_send": bench_printer_send,
+    "printer_connect_send": bench_printer_connect_send,
+    "checkout": bench_checkout,
+}
+GUI_BENCHMARKS = {"pos_category_switch"}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def run(scales=("small",), only=None, gui=True, seed=42, workdir=None, progress=print):
+    """Generate each scale and run the benchmarks on it. Returns the results document."""
+    names = [n for n in BENCHMARKS if (not only or n in only) and (gui or n not in GUI_BENCHMARKS)]
+    results = {"environment": environment(), "scales": {}}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for scale in scales:
+            started = time.perf_counter()
+            counts = generate(Path(tmp) / f"bench-{scale}.db", seed=seed, **SCALES[scale])
+            progress(f"📦 {scale}: {counts['orders']} orders generated in {time.perf_counter() - started:.1f}s")
+            catalog.invalidate()
+            entry = {"dataset": counts, "benchmarks": {}}
+            for name in names:
+                try:
+                    entry["benchmarks"][name] = BENCHMARKS[name](RUNS[scale], tmp)
+                except Exception as e:
+                    entry["benchmarks"][name] = {"error": str(e)}
+                    progress(f"❌ {scale}/{name}: {e}")
+                    continue
+                progress(f"   {name:<22} p50 {entry['benchmarks'][name]['p50_ms']:9.2f} ms"
+                         f"   p95 {entry['benchmarks'][name]['p95_ms']:9.2f} ms")
+            results["scales"][scale] = entry
+        from models.database import close_pool
+        close_pool()
+    return results
+
+
+def compare(current, baseline, threshold=0.2, metric="p50_ms"):
+    """Benchmarks whose metric grew by more than threshold (fraction): [(scale, name, old, new)]."""
+    regressions = []
+    for scale, entry in current["scales"].items():
+        old_entry = baseline.get("scales", {}).get(scale, {}).get("benchmarks", {})
+        for name, result in entry["benchmarks"].items():
+            old = old_entry.get(name, {}).get(metric)
+            new = result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append((scale, name, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["small"])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run just these benchmarks")
+    parser.add_argument("--no-gui", action="store_true", help="skip the benchmarks that need Qt")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if not args.no_gui:
+        import os
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    results = run(args.scale, args.only, gui=not args.no_gui, seed=args.seed)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"✅ Results written to {args.out}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for scale, name, old, new in regressions:
+            print(f"⚠️ {scale}/{name}: p50 {old:.2f} ms -> {new:.2f} ms ({new / old - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare} (baseline {baseline['environment'].get('commit')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# controllers/backup_manager.py
+"""
+Online database backup / restore.
+
+backup() copies the live database with sqlite3's backup API, `pages` pages per
+step with a short sleep in between, on its own connection: writers keep going
+while it runs and the copy is a consistent snapshot (a plain file copy of a WAL
+database can miss committed pages or tear). The copy is switched out of WAL
+mode so it is a single file, checked with PRAGMA integrity_check and
+gzip-compressed, and only then renamed to its final name.
+
+restore() stages the backup next to the live file (decompressed, checked),
+keeps a safety backup of the current data, drains the connection pool and
+swaps the staged file in with os.replace; pooled connections reopen on the
+restored database and migrations bring an older backup up to date.
+
+BackupManager.start() takes rotating backups in the background, settings from
+the settings row (Settings > Backup & Restore): backup_dir (default: backups/
+next to the database), backup_interval_hours (24, 0 = off) and backup_keep (7).
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from models.database import database_path, drain_pool, init_db
+from models.settings import Settings
+
+DEFAULTS = {"dir": None, "interval_hours": 24, "keep": 7}
+PREFIX = "fastfood-"
+
+
+class BackupError(Exception):
+    pass
+
+
+def _is_gzip(path):
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def _check(conn):
+    result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    if result != "ok":
+        raise BackupError(f"integrity check failed: {result}")
+
+
+def _copy(src_path, dst_path, pages, sleep, progress):
+    """Backup-API copy src -> dst (a new single-file database), integrity checked."""
+    src = sqlite3.connect(src_path, timeout=10, isolation_level=None)
+    dst = sqlite3.connect(dst_path)
+    try:
+        # one read transaction for the whole copy: in WAL mode every step then sees the same
+        # snapshot, so writes from other connections neither block nor restart the backup
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+        def step(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+        src.backup(dst, pages=pages, progress=step, sleep=sleep)
+        dst.execute("PRAGMA journal_mode=DELETE")
+        _check(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def verify(path):
+    """Integrity-check a backup file (.db or gzip); raises BackupError if it is damaged."""
+    path = Path(path)
+    staged = path.with_name(path.name + ".verify")
+    try:
+        if _is_gzip(path):
+            with gzip.open(path, "rb") as src, open(staged, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            target = staged
+        else:
+            target = path
+        conn = sqlite3.connect(f"file:{target}?mode=ro", uri=True)
+        try:
+            _check(conn)
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+    except (sqlite3.DatabaseError, OSError, EOFError) as e:
+        raise BackupError(f"not a valid backup: {e}")
+    finally:
+        if staged.exists():
+            staged.unlink()
+    if not {"orders", "products", "settings"} <= tables:
+        raise BackupError("not a database of this application")
+    return True
+
+
+class BackupManager:
+    def __init__(self, pages=256, sleep=0.005):
+        self.pages = pages
+        self.sleep = sleep
+        self._lock = threading.Lock()  # one backup / restore at a time
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_backup = None
+
+    # --- settings ---
+    @staticmethod
+    def settings():
+        settings = Settings.section("backup", DEFAULTS)
+        settings["dir"] = Path(settings["dir"] or database_path().parent / "backups")
+        return settings
+
+    # --- backup ---
+    def backup(self, target, compress=None, progress=None):
+        """
+        Copy the live database to target; gzip it if compress (default: target ends in .gz).
+        progress(pages_done, pages_total) per step. Returns {"path", "size", "seconds"}.
+        """
+        target = Path(target)
+        compress = target.suffix == ".gz" if compress is None else compress
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staged = target.with_name(target.name + ".part")
+        started = time.monotonic()
+        with self._lock:
+            try:
+                _copy(database_path(), staged, self.pages, self.sleep, progress)
+                if compress:
+                    packed = target.with_name(target.name + ".gz.part")
+                    with open(staged, "rb") as src, gzip.open(packed, "wb", compresslevel=6) as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    staged.unlink()
+                    staged = packed
+                os.replace(staged, target)
+            finally:
+                if staged.exists():
+                    staged.unlink()
+        self.last_backup = {"path": str(target), "size": target.stat().st_size,
+                            "seconds": time.monotonic() - started}
+        return self.last_backup
+
+    def backup_now(self, progress=None):
+        """Timestamped backup in the backup directory, then rotation."""
+        settings = self.settings()
+        name = f"{PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}.db.gz"
+        result = self.backup(settings["dir"] / name, compress=True, progress=progress)
+        self.rotate(settings["dir"], settings["keep"])
+        return result
+
+    @staticmethod
+    def list_backups(directory=None):
+        """Backups in directory, newest first."""
+        directory = Path(directory or BackupManager.settings()["dir"])
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob(f"{PREFIX}*.db.gz"), reverse=True)
+
+    def rotate(self, directory, keep):
+        """Delete all but the keep newest backups."""
+        for old in self.list_backups(directory)[max(1, int(keep)):]:
+            try:
+                old.unlink()
+            except OSError as e:
+                print(f"⚠️ Could not remove old backup {old}: {e}")
+
+    # --- restore ---
+    def restore(self, source, progress=None, timeout=10.0):
+        """
+        Replace the live database with a backup (.db or .db.gz). The current data is
+        saved as a backup first. Returns the path of that safety backup.
+        """
+        source = Path(source)
+        live = database_path()
+        staged = live.with_name(live.name + ".restore")
+        unpacked = live.with_name(live.name + ".restore-src")
+        with self._lock:
+            try:
+                if _is_gzip(source):
+                    with gzip.open(source, "rb") as src, open(unpacked, "wb") as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    source = unpacked
+                verify(source)
+                if staged.exists():
+                    staged.unlink()
+                _copy(source, staged, self.pages, 0, progress)
+            except Exception:
+                if staged.exists():
+                    staged.unlink()
+                raise
+            finally:
+                if unpacked.exists():
+                    unpacked.unlink()
+
+        settings = self.settings()
+        safety = settings["dir"] / f"{PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}-before-restore.db.gz"
+        self.backup(safety, compress=True)
+
+        with self._lock:
+            try:
+                with drain_pool(timeout):
+                    os.replace(staged, live)
+                    for suffix in ("-wal", "-shm"):  # belonged to the old file
+                        stale = live.with_name(live.name + suffix)
+                        if stale.exists():
+                            stale.unlink()
+            finally:
+                if staged.exists():
+                    staged.unlink()
+        init_db()  # migrate a backup taken by an older version
+        self._invalidate_caches()
+        return safety
+
+    @staticmethod
+    def _invalidate_caches():
+        from models.catalog import catalog
+        from models.printer_routing import printer_routing
+        from utils.receipt_renderer import receipts
+
+        catalog.invalidate()
+        printer_routing.invalidate()
+        receipts.invalidate()
+
+    # --- schedule ---
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _due(self, settings):
+        latest = self.list_backups(settings["dir"])
+        if not latest:
+            return 0
+        age = time.time() - latest[0].stat().st_mtime
+        return max(0, settings["interval_hours"] * 3600 - age)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                settings = self.settings()
+                wait = self._due(settings) if settings["interval_hours"] > 0 else None
+                if wait == 0:
+                    self.backup_now()
+                    wait = settings["interval_hours"] * 3600
+            except Exception as e:
+                print(f"⚠️ Scheduled backup failed: {e}")
+                wait = 600
+            if wait is None:
+                return  # scheduled backups disabled
+            self._stop.wait(min(wait, 3600))  # re-read the settings at least hourly
+
+
+backups = BackupManager()
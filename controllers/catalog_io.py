@@ -0,0 +1,372 @@
+# controllers/catalog_io.py
+"""
+Bulk catalog import / export (categories, products, ingredients) as CSV or JSON.
+
+    python -m controllers.catalog_io import menu.csv [--dry-run] [--strict]
+    python -m controllers.catalog_io export menu.json
+
+CSV: one record per row with a `type` column (category / product / ingredient);
+a file without `type` is read as products only, e.g. a menu spreadsheet:
+
+    type,name,category,product,price,cost,status,image,quantity,unit,min_quantity
+    category,Burgers,,,,,,,,,
+    product,Cheese Burger,Burgers,,650,210,available,,,,
+    ingredient,Bun,,Cheese Burger,,12,,,200,pcs,50
+
+JSON: {"categories": [{"name"}], "products": [{...}], "ingredients": [{...}]}
+with the same field names.
+
+Records are validated and written in batches with executemany, inside one
+transaction for the whole file. Everything is upserted by name (ingredients by
+name + product), and referenced categories are created on the fly. Invalid
+records are skipped and reported (or abort the import with strict=True).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from models.database import get_connection, iter_chunks
+from models.catalog import catalog
+
+FIELDS = ["type", "name", "category", "product", "price", "cost", "status", "image",
+          "quantity", "unit", "min_quantity"]
+TYPES = ("category", "product", "ingredient")
+SECTIONS = {"category": "categories", "product": "products", "ingredient": "ingredients"}  # JSON keys
+
+
+class ImportCancelled(Exception):
+    """The caller asked to stop; nothing was written."""
+
+
+def _number(value, field, default=None):
+    if value in (None, ""):
+        if default is None:
+            raise ValueError(f"{field} is required")
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} '{value}' is not a number")
+    if number < 0:
+        raise ValueError(f"{field} cannot be negative")
+    return number
+
+
+def _text(record, field):
+    return str(record.get(field) or "").strip()
+
+
+def validate(record):
+    """Normalized (type, values) for one record; raises ValueError with the reason."""
+    kind = _text(record, "type").lower() or "product"
+    if kind not in TYPES:
+        raise ValueError(f"unknown type '{kind}'")
+    name = _text(record, "name")
+    if not name:
+        raise ValueError("name is required")
+
+    if kind == "category":
+        return kind, {"name": name}
+    if kind == "product":
+        return kind, {
+            "name": name,
+            "category": _text(record, "category") or None,
+            "price": _number(record.get("price"), "price"),
+            "cost": _number(record.get("cost"), "cost", 0.0),
+            "status": _text(record, "status") or "available",
+            "image": _text(record, "image") or None,
+        }
+    return kind, {
+        "name": name,
+        "product": _text(record, "product") or None,
+        "quantity": _number(record.get("quantity"), "quantity", 0.0),
+        "unit": _text(record, "unit") or "pcs",
+        "min_quantity": _number(record.get("min_quantity"), "min_quantity", 0.0),
+        "cost": _number(record.get("cost"), "cost", 0.0),
+    }
+
+
+# ------------------------------------------------------
+# Reading
+# ------------------------------------------------------
+def _file_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in ("csv", "json"):
+        raise ValueError(f"Unsupported format '{fmt}' (use .csv or .json)")
+    return fmt
+
+
+def read_records(path, fmt=None):
+    """(total, iterator of (line, record)); CSV is streamed, JSON is loaded whole."""
+    fmt = _file_format(path, fmt)
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            total = max(0, sum(1 for _ in f) - 1)
+
+        def rows():
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                for line, record in enumerate(csv.DictReader(f), start=2):
+                    yield line, record
+        return total, rows()
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"products": data}
+    records = []
+    for kind in TYPES:
+        for record in data.get(SECTIONS[kind]) or []:
+            records.append(dict(record, type=kind))
+    return len(records), ((i, record) for i, record in enumerate(records, start=1))
+
+
+# ------------------------------------------------------
+# Import
+# ------------------------------------------------------
+class _Writer:
+    """Upserts validated batches on one cursor, keeping name -> id maps current."""
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.stats = {kind: {"inserted": 0, "updated": 0} for kind in TYPES}
+        cur.execute("SELECT id, name FROM categories")
+        self.categories = {row["name"]: row["id"] for row in cur.fetchall()}
+        cur.execute("SELECT id, name FROM products ORDER BY id DESC")
+        self.products = {row["name"]: row["id"] for row in cur.fetchall()}  # lowest id wins for duplicates
+        cur.execute("SELECT id, name, product_id FROM ingredients ORDER BY id DESC")
+        self.ingredients = {(row["name"], row["product_id"]): row["id"] for row in cur.fetchall()}
+
+    def _ids(self, table, names):
+        names = list(names)
+        found = {}
+        for start in range(0, len(names), 500):
+            part = names[start:start + 500]
+            self.cur.execute(f"SELECT id, name FROM {table} WHERE name IN ({', '.join('?' * len(part))})"
+                             f" ORDER BY id DESC", part)
+            found.update({row["name"]: row["id"] for row in self.cur.fetchall()})
+        return found
+
+    def upsert_categories(self, names):
+        new = [name for name in dict.fromkeys(names) if name and name not in self.categories]
+        if new:
+            self.cur.executemany("INSERT INTO categories (name) VALUES (?) ON CONFLICT(name) DO NOTHING",
+                                 [(name,) for name in new])
+            self.categories.update(self._ids("categories", new))
+            self.stats["category"]["inserted"] += len(new)
+
+    def upsert_products(self, records):
+        self.upsert_categories(r["category"] for r in records)
+        latest = {r["name"]: r for r in records}  # a name repeated in one batch: last one wins
+        updates, inserts = [], []
+        for r in latest.values():
+            values = (r["name"], self.categories.get(r["category"]), r["price"], r["cost"], r["status"], r["image"])
+            if r["name"] in self.products:
+                updates.append(values + (self.products[r["name"]],))
+            else:
+                inserts.append(values)
+        if updates:
+            self.cur.executemany("""
+                UPDATE products SET name = ?, category_id = COALESCE(?, category_id), price = ?, cost = ?,
+                                    status = ?, image = COALESCE(?, image)
+                WHERE id = ?
+            """, updates)
+        if inserts:
+            self.cur.executemany("""
+                INSERT INTO products (name, category_id, price, cost, status, image) VALUES (?, ?, ?, ?, ?, ?)
+            """, inserts)
+            self.products.update(self._ids("products", [v[0] for v in inserts]))
+        self.stats["product"]["updated"] += len(updates)
+        self.stats["product"]["inserted"] += len(inserts)
+
+    def upsert_ingredients(self, records):
+        """Writes the ingredients whose product is known; returns the others."""
+        updates, inserts, unresolved = {}, {}, []
+        for r in records:
+            product_id = self.products.get(r["product"]) if r["product"] else None
+            if r["product"] and product_id is None:
+                unresolved.append(r)
+                continue
+            key = (r["name"], product_id)
+            values = (r["name"], r["quantity"], r["unit"], r["min_quantity"], r["cost"], product_id)
+            if key in self.ingredients:
+                updates[key] = values + (self.ingredients[key],)
+            else:
+                inserts[key] = values  # repeated in one batch: last one wins
+        if updates:
+            self.cur.executemany("""
+                UPDATE ingredients SET name = ?, quantity = ?, unit = ?, min_quantity = ?, cost = ?, product_id = ?
+                WHERE id = ?
+            """, list(updates.values()))
+        if inserts:
+            self.cur.executemany("""
+                INSERT INTO ingredients (name, quantity, unit, min_quantity, cost, product_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, list(inserts.values()))
+            names = list({name for name, _ in inserts})
+            for start in range(0, len(names), 500):
+                part = names[start:start + 500]
+                self.cur.execute(f"SELECT id, name, product_id FROM ingredients"
+                                 f" WHERE name IN ({', '.join('?' * len(part))}) ORDER BY id DESC", part)
+                for row in self.cur.fetchall():
+                    self.ingredients.setdefault((row["name"], row["product_id"]), row["id"])
+        self.stats["ingredient"]["updated"] += len(updates)
+        self.stats["ingredient"]["inserted"] += len(inserts)
+        return unresolved
+
+
+def import_catalog(path, fmt=None, batch_size=500, strict=False, dry_run=False, progress=None, cancelled=None):
+    """
+    Import a CSV / JSON catalog file in one transaction.
+    progress(done, total) is called after every batch; cancelled() -> True stops and rolls back.
+    Returns {"rows", "committed", "errors": [(line, msg)],
+             "category" / "product" / "ingredient": {"inserted", "updated"}}.
+    """
+    total, records = read_records(path, fmt)
+    errors = []
+    done = 0
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        writer = _Writer(cur)
+        pending_ingredients = []
+
+        def flush(batch):
+            categories = [values["name"] for kind, values in batch if kind == "category"]
+            writer.upsert_categories(categories)
+            writer.upsert_products([values for kind, values in batch if kind == "product"])
+            # ingredients may name a product further down the file: retry those at the end
+            ingredients = [values for kind, values in batch if kind == "ingredient"]
+            pending_ingredients.extend(writer.upsert_ingredients(ingredients))
+
+        batch = []
+        for line, record in records:
+            try:
+                kind, values = validate(record)
+                values["line"] = line
+                batch.append((kind, values))
+            except ValueError as e:
+                errors.append((line, str(e)))
+            done += 1
+            if done % batch_size == 0:
+                if cancelled and cancelled():
+                    raise ImportCancelled()
+                flush(batch)
+                batch = []
+                if progress:
+                    progress(done, total)
+        flush(batch)
+        for r in writer.upsert_ingredients(pending_ingredients):
+            errors.append((r["line"], f"ingredient '{r['name']}': unknown product '{r['product']}'"))
+
+        committed = not dry_run and not (strict and errors)
+        if committed:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if progress:
+        progress(done, total)
+    if committed:
+        catalog.invalidate()
+    return dict(writer.stats, rows=done, errors=errors, committed=committed)
+
+
+# ------------------------------------------------------
+# Export
+# ------------------------------------------------------
+EXPORT_QUERIES = {
+    "category": "SELECT name FROM categories ORDER BY name",
+    "product": """
+        SELECT p.name, c.name AS category, p.price, p.cost, p.status, p.image
+        FROM products p LEFT JOIN categories c ON c.id = p.category_id
+        ORDER BY c.name, p.name
+    """,
+    "ingredient": """
+        SELECT i.name, p.name AS product, i.quantity, i.unit, i.min_quantity, i.cost
+        FROM ingredients i LEFT JOIN products p ON p.id = i.product_id
+        ORDER BY i.name
+    """,
+}
+
+
+def export_catalog(path, fmt=None, progress=None):
+    """Stream the catalog to a CSV / JSON file. Returns the number of records written."""
+    fmt = _file_format(path, fmt)
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            out = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            out.writeheader()
+        else:
+            f.write("{")
+        for index, (kind, query) in enumerate(EXPORT_QUERIES.items()):
+            if fmt == "json":
+                f.write(f'{"," if index else ""}\n  "{SECTIONS[kind]}": [')
+            first = True
+            for rows in iter_chunks(query, (), 500):
+                for row in rows:
+                    record = dict(row)
+                    if fmt == "csv":
+                        out.writerow(dict(record, type=kind))
+                    else:
+                        f.write(("" if first else ",") + "\n    " + json.dumps(record, ensure_ascii=False))
+                        first = False
+                written += len(rows)
+                if progress:
+                    progress(written, None)
+            if fmt == "json":
+                f.write("\n  ]")
+        if fmt == "json":
+            f.write("\n}\n")
+    return written
+
+
+# ------------------------------------------------------
+# Command line
+# ------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk catalog import / export")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="upsert categories / products / ingredients from a file")
+    p_import.add_argument("path")
+    p_import.add_argument("--format", choices=["csv", "json"])
+    p_import.add_argument("--dry-run", action="store_true", help="validate and roll back")
+    p_import.add_argument("--strict", action="store_true", help="write nothing if any record is invalid")
+    p_import.add_argument("--batch-size", type=int, default=500)
+    p_export = sub.add_parser("export", help="write the catalog to a file")
+    p_export.add_argument("path")
+    p_export.add_argument("--format", choices=["csv", "json"])
+    args = parser.parse_args(argv)
+
+    from models.database import init_db
+    init_db()
+
+    if args.command == "export":
+        count = export_catalog(args.path, args.format)
+        print(f"✅ Exported {count} records to {args.path}")
+        return 0
+
+    def report(done, total):
+        print(f"\r{done}/{total} records", end="", file=sys.stderr, flush=True)
+
+    result = import_catalog(args.path, args.format, args.batch_size, args.strict, args.dry_run, progress=report)
+    print(file=sys.stderr)
+    for kind in TYPES:
+        print(f"{kind}: {result[kind]['inserted']} inserted, {result[kind]['updated']} updated")
+    for line, message in result["errors"]:
+        print(f"⚠️ line {line}: {message}" if line else f"⚠️ {message}")
+    print("✅ Committed" if result["committed"] else "↩️ Rolled back (nothing written)")
+    return 1 if result["errors"] and args.strict else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,29 @@
 # controllers/inventory_controller.py
-from models.database import get_connection
+from models.database import get_connection, iter_chunks
+
+ALL_ITEMS_QUERY = """
+    SELECT i.id, i.name, i.quantity, i.unit, i.min_quantity, i.cost, p.name AS product_name
+    FROM ingredients i
+    LEFT JOIN products p ON i.product_id = p.id
+    ORDER BY i.name
+"""
+
 
 class InventoryController:
     @staticmethod
     def get_all():
         conn = get_connection()
         cur = conn.cursor()
-        cur.execute("""
-            SELECT i.id, i.name, i.quantity, i.unit, i.min_quantity, i.cost, p.name AS product_name
-            FROM ingredients i
-            LEFT JOIN products p ON i.product_id = p.id
-            ORDER BY i.name
-        """)
+        cur.execute(ALL_ITEMS_QUERY)
         items = cur.fetchall()
         conn.close()
         return items
 
+    @staticmethod
+    def iter_all(size=200):
+        """Same rows as get_all(), in chunks of up to size rows."""
+        return iter_chunks(ALL_ITEMS_QUERY, (), size)
+
     @staticmethod
     def add(name, quantity, unit, min_quantity, cost, product_id=None):
         conn = get_connection()
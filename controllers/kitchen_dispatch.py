@@ -0,0 +1,169 @@
+# controllers/kitchen_dispatch.py
+"""
+Kitchen dispatch: coalesces what each station (kitchen printer) has to hear about.
+
+dispatch(order_id) buffers the order and starts a `window` seconds timer (if one
+is not already running). The flush claims, for every buffered order, the lines
+the kitchen has not seen yet (order_items.printed_qty, so a reopened table only
+sends the difference), routes them through printer_routing and queues one
+spooler job per station holding a ticket per order / category, headed with the
+order's table as stored (orders JOIN tables, like the receipt); repeated executes
+of the same order within the window are merged. The claim and the print jobs
+are written in one transaction: until the flush commits nothing is marked
+printed, so a crash or a full spooler (SpoolerFull: retried after RETRY_DELAY)
+never loses a ticket. window <= 0 sends right away.
+
+Ticket latency (execute -> printed) is measured from the spooler's job updates.
+"""
+import threading
+import time
+from collections import deque
+
+from controllers.print_spooler import spooler, printer_target
+from models.catalog import catalog
+from models.database import connection
+from models.order import Order
+from models.printer_routing import printer_routing
+from utils.receipt_renderer import receipts
+
+RETRY_DELAY = 5.0
+
+
+class KitchenDispatcher:
+    def __init__(self, window=2.0, samples=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush (claim + queue) at a time
+        self._orders = {}  # order_id -> [executed_at, ...]
+        self._timer = None
+        self._jobs = {}  # spooler job id -> [executed_at, ...]
+        self._latencies = deque(maxlen=samples)
+        spooler.add_listener(self._on_job)
+
+    def dispatch(self, order_id, window=None):
+        """Buffer the order for its stations. Returns the job ids queued right away (window <= 0)."""
+        if not Order.has_kitchen_deltas(order_id):
+            return []
+        window = self.window if window is None else window
+        with self._lock:
+            self._orders.setdefault(order_id, []).append(time.time())
+            if window > 0:
+                self._arm(window)
+                return []
+        return self._flush()
+
+    def _arm(self, delay):
+        # caller holds self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        """Claim the buffered orders' unprinted lines and queue their tickets, atomically."""
+        with self._flush_lock:
+            with self._lock:
+                orders, self._orders = self._orders, {}
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+            if not orders:
+                return []
+            try:
+                with connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    cur = conn.cursor()
+                    stations = self._route(cur, orders)
+                    queued = spooler.submit_with(cur, [station["job"] for station in stations])
+            except Exception as e:
+                # nothing was marked printed: keep the orders and try again
+                print(f"❌ Kitchen tickets not queued, retrying in {RETRY_DELAY:.0f}s: {e}")
+                with self._lock:
+                    for order_id, executed_at in orders.items():
+                        self._orders.setdefault(order_id, [])[:0] = executed_at
+                    self._arm(RETRY_DELAY)
+                return []
+
+            with self._lock:
+                for station, job in zip(stations, queued):
+                    self._jobs[job["id"]] = station["executed"]
+            spooler.announce(queued)
+            return [job["id"] for job in queued]
+
+    @staticmethod
+    def _route(cur, orders):
+        """Per station: the spooler job for the claimed lines of orders, and their execute times."""
+        stations = {}  # printer_id -> {"printer", "orders": {order_id: {category: {product: qty}}}}
+        tables = {}
+        for order_id in orders:
+            row = cur.execute("""
+                SELECT COALESCE(t.name, 'Table ' || t.table_number) AS table_name
+                FROM orders o
+                LEFT JOIN tables t ON o.table_id = t.id
+                WHERE o.id = ?
+            """, (order_id,)).fetchone()
+            tables[order_id] = row["table_name"] if row else None
+            for delta in Order.claim_kitchen_deltas_with(cur, order_id):
+                product = catalog.product(delta["product_id"])
+                if not product:
+                    continue
+                category = catalog.category(product["category_id"])
+                category_name = category["name"] if category else "Other"
+                for printer in printer_routing.printers_for(product["category_id"]):
+                    station = stations.setdefault(printer["id"], {"printer": printer, "orders": {}})
+                    items = station["orders"].setdefault(order_id, {}).setdefault(category_name, {})
+                    items[product["name"]] = items.get(product["name"], 0) + delta["quantity"]
+
+        routed = []
+        for printer_id, station in stations.items():
+            tickets, executed = [], []
+            for order_id, categories in station["orders"].items():
+                for category_name, items in categories.items():
+                    lines = [{"product_name": name, "quantity": qty} for name, qty in items.items() if qty]
+                    if lines:
+                        tickets.append(receipts.kitchen_ticket(order_id, category_name, lines,
+                                                               tables[order_id]))
+                executed.extend(orders[order_id])
+            if not tickets:
+                continue
+            ids = list(station["orders"])
+            title = f"Order {ids[0]}" if len(ids) == 1 else f"Orders {', '.join(map(str, ids))}"
+            routed.append({
+                "job": {"target": printer_target(printer_id), "payload": b"".join(tickets), "kind": "kitchen",
+                        "order_id": ids[0] if len(ids) == 1 else None,
+                        "title": f"{title} - {station['printer']['name']}"},
+                "executed": executed,
+            })
+        return routed
+
+    def flush_all(self):
+        """Send everything still waiting for its window (e.g. on quit)."""
+        return self._flush()
+
+    # --- latency ---
+    def _on_job(self, job):
+        if job.get("status") not in ("done", "dead"):
+            return
+        with self._lock:
+            executed = self._jobs.pop(job.get("id"), None)
+            if executed and job["status"] == "done":
+                now = time.time()
+                self._latencies.extend(now - t for t in executed)
+
+    def stats(self):
+        """Execute -> printed latency over the last tickets, in ms."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return {"tickets": 0}
+        n = len(samples)
+        return {
+            "tickets": n,
+            "avg_ms": sum(samples) / n * 1000,
+            "p50_ms": samples[n // 2] * 1000,
+            "p95_ms": samples[int(0.95 * (n - 1))] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+
+kitchen_dispatch = KitchenDispatcher()
@@ -0,0 +1,70 @@
+# controllers/order_archiver.py
+"""
+Background job moving old closed orders into the per-month archives
+(models.order_archive), once shortly after startup and then every `interval`.
+
+    python -m controllers.order_archiver [--horizon-days N]
+"""
+import argparse
+import threading
+
+from models.order_archive import OrderArchive
+
+
+class OrderArchiver:
+    def __init__(self, interval=24 * 3600, delay=60.0):
+        self.interval = interval
+        self.delay = delay
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+
+    def run_once(self, horizon_days=None):
+        """Archive now; returns {month: orders moved}."""
+        moved = OrderArchive.archive(horizon_days)
+        self.last_run = moved
+        if moved:
+            print(f"🗄️ Archived {sum(moved.values())} orders ({', '.join(sorted(moved))})")
+        return moved
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="order-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        if self._stop.wait(self.delay):  # let startup and the first orders go first
+            return
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Order archiving failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+
+order_archiver = OrderArchiver()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move closed orders older than the horizon into monthly archives")
+    parser.add_argument("--horizon-days", type=int, help="override the archive_horizon_days setting")
+    args = parser.parse_args(argv)
+
+    from models.database import init_db
+    init_db()
+    moved = order_archiver.run_once(args.horizon_days)
+    if not moved:
+        print("Nothing to archive.")
+    for month, count in sorted(moved.items()):
+        print(f"{month}: {count} orders -> {OrderArchive.path(month)}")
+
+
+if __name__ == "__main__":
+    main()
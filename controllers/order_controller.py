@@ -1,14 +1,16 @@
 # controllers/order_controller.py
-import os
-import cups
-import pandas as pd
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
-from models.order import Order
-from models.database import get_connection
+from models.order import Order, OrderQuery
+from models.order_archive import OrderArchive
+from models.catalog import catalog
+from models.rollup import SalesRollup
+from models.database import get_connection, connection
+from controllers.print_spooler import spooler, cups_target
+from controllers.kitchen_dispatch import kitchen_dispatch
+from controllers.order_export import export_orders
+from utils.receipt_renderer import receipts
 
 
 class OrderController:
@@ -27,9 +29,82 @@ class OrderController:
             INSERT INTO order_items (order_id, product_id, quantity, price)
             VALUES (?, ?, ?, ?)
         """, (order_id, product_id, quantity, price))
+        cur.execute("SELECT created_at FROM orders WHERE id = ?", (order_id,))
+        order = cur.fetchone()
+        if order:
+            SalesRollup.record_items(cur, order["created_at"], [(product_id, quantity, price)])
         conn.commit()
         conn.close()
 
+    @staticmethod
+    def checkout(table_id, user_id, cart, payment_type="cash", status="pending", order_id=None):
+        """
+        Save an order header and all its lines in one transaction.
+        With order_id (the pending order loaded into the cart) that order is updated
+        to match the cart instead of creating a new one; if it has been settled in the
+        meantime (receipt printed) a new order is created instead.
+        Returns (order_id, items_by_category) where items_by_category maps
+        category_id -> list of {"product_id", "name", "quantity", "price"}.
+        """
+        lines = []
+        for it in cart:
+            lines.append({
+                "product_id": it.get("product_id") or it.get("id"),
+                "name": it.get("name", "Item"),
+                "quantity": int(it.get("qty", it.get("quantity", 1))),
+                "price": float(it.get("price", 0.0)),
+            })
+        if not lines:
+            raise ValueError("Cannot checkout an empty cart.")
+
+        total = sum(l["quantity"] * l["price"] for l in lines)
+        with connection() as conn:
+            # take the write lock up front so the whole order lands in one commit
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            order = None
+            if order_id:
+                cur.execute("SELECT id, total, created_at FROM orders WHERE id = ? AND status = 'pending'",
+                            (order_id,))
+                order = cur.fetchone()
+
+            if order:
+                # reopened table: edit the order in place, the kitchen only gets the difference
+                changes = Order.sync_items(cur, order, lines)
+                cur.execute("UPDATE orders SET total = ? WHERE id = ?", (total, order_id))
+                SalesRollup.adjust_order_total(cur, order["created_at"], total - (order["total"] or 0))
+                SalesRollup.record_items(cur, order["created_at"], changes)
+            else:
+                created_at = datetime.now().isoformat()
+                cur.execute("""
+                    INSERT INTO orders (table_id, user_id, total, payment_type, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (table_id, user_id, total, payment_type, status, created_at))
+                order_id = cur.lastrowid
+
+                cur.executemany("""
+                    INSERT INTO order_items (order_id, product_id, quantity, price)
+                    VALUES (?, ?, ?, ?)
+                """, [(order_id, l["product_id"], l["quantity"], l["price"]) for l in lines])
+
+                SalesRollup.record_order(cur, created_at, total,
+                                         [(l["product_id"], l["quantity"], l["price"]) for l in lines])
+
+        # kitchen grouping comes from the in-memory catalog, no per-item SELECT
+        items_by_category = {}
+        for l in lines:
+            prod = catalog.product(l["product_id"])
+            if prod:
+                l["name"] = prod["name"]
+            items_by_category.setdefault(prod["category_id"] if prod else None, []).append(l)
+
+        return order_id, items_by_category
+
+    @staticmethod
+    def close_order(order_id):
+        """Mark a pending order paid; it is no longer loaded back into the cart."""
+        return Order.close(order_id)
+
     @staticmethod
     def get_order_items(order_id):
         """Fetch all items for a given order."""
@@ -48,12 +123,23 @@ class OrderController:
         """, (order_id,))
         items = cur.fetchall()
         conn.close()
+        if not items:
+            items = OrderArchive.find_order(order_id)[1]
         return items
 
     @staticmethod
     def get_all_orders():
         return Order.all()
 
+    @staticmethod
+    def query_orders(filters=None):
+        """OrderQuery for FilterDialog filters (all orders when None)."""
+        return OrderQuery.from_filters(filters)
+
+    @staticmethod
+    def get_filter_options():
+        return Order.filter_options()
+
     @staticmethod
     def filter_orders(start_date=None, end_date=None, payment_type=None):
         return Order.filter(start_date, end_date, payment_type)
@@ -64,90 +150,36 @@ class OrderController:
 
     # === EXPORTS ===
     @staticmethod
-    def export_to_excel(orders, parent=None):
-        """Export all orders to Excel or CSV."""
-        if not orders:
-            QMessageBox.warning(parent, "Export Failed", "No data to export.")
-            return
-
+    def _export(query, parent, fmt, caption, file_filter, lines):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_name = f"orders_{timestamp}.xlsx"
-
-        file_path, _ = QFileDialog.getSaveFileName(
-            parent,
-            "Save Excel File",
-            default_name,
-            "Excel Files (*.xlsx);;CSV Files (*.csv)"
-        )
+        file_path, _ = QFileDialog.getSaveFileName(parent, caption, f"orders_{timestamp}.{fmt}", file_filter)
         if not file_path:
             return
-
         try:
-            df = pd.DataFrame(orders)
-            if file_path.endswith(".csv"):
-                df.to_csv(file_path, index=False)
-            else:
-                df.to_excel(file_path, index=False)
-            QMessageBox.information(parent, "Success", f"Exported to:\n{file_path}")
+            count = export_orders(file_path, query, lines=lines)
         except Exception as e:
             QMessageBox.critical(parent, "Error", f"Export failed:\n{e}")
-
-    @staticmethod
-    def export_to_pdf(orders, parent=None):
-        """Export orders to a PDF report."""
-        if not orders:
-            QMessageBox.warning(parent, "Export Failed", "No data to export.")
-            return
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_name = f"orders_{timestamp}.pdf"
-
-        file_path, _ = QFileDialog.getSaveFileName(
-            parent,
-            "Save PDF File",
-            default_name,
-            "PDF Files (*.pdf)"
-        )
-        if not file_path:
             return
+        if not count:
+            QMessageBox.warning(parent, "Export", "No orders matched; the file only has the headers.")
+        else:
+            QMessageBox.information(parent, "Success", f"Exported {count} rows to:\n{file_path}")
 
-        try:
-            pdf = canvas.Canvas(file_path, pagesize=A4)
-            width, height = A4
-            pdf.setTitle("Orders Report")
-
-            y = height - 50
-            pdf.setFont("Helvetica-Bold", 16)
-            pdf.drawString(200, y, "Orders Report")
-            y -= 30
-
-            pdf.setFont("Helvetica", 10)
-            pdf.drawString(40, y, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            y -= 25
-
-            for order in orders:
-                text = (
-                    f"#{order['id']} | Table: {order.get('table_name', '')} | "
-                    f"User: {order.get('user_name', '')} | "
-                    f"Total: {order['total']} | Payment: {order['payment_type']} | "
-                    f"Date: {order['created_at']}"
-                )
-                pdf.drawString(40, y, text)
-                y -= 15
-                if y < 50:
-                    pdf.showPage()
-                    y = height - 50
-                    pdf.setFont("Helvetica", 10)
+    @staticmethod
+    def export_to_excel(query=None, parent=None, lines=False):
+        """Export the orders of query (an OrderQuery, default all) to Excel or CSV, streamed in chunks."""
+        OrderController._export(query, parent, "xlsx", "Save Excel File",
+                                "Excel Files (*.xlsx);;CSV Files (*.csv)", lines)
 
-            pdf.save()
-            QMessageBox.information(parent, "Success", f"PDF saved:\n{file_path}")
-        except Exception as e:
-            QMessageBox.critical(parent, "Error", f"Failed to export: {e}")
+    @staticmethod
+    def export_to_pdf(query=None, parent=None, lines=False):
+        """Export the orders of query to a PDF report, drawn page by page."""
+        OrderController._export(query, parent, "pdf", "Save PDF File", "PDF Files (*.pdf)", lines)
 
     # === PRINT RECEIPT ===
     @staticmethod
-    def print_receipt(order_id):
-        """Print a receipt to the cashier printer via CUPS."""
+    def render_receipt(order_id):
+        """ESC/POS bytes for an order's receipt."""
         conn = get_connection()
         cur = conn.cursor()
 
@@ -160,6 +192,7 @@ class OrderController:
         """, (order_id,))
         order = cur.fetchone()
         if not order:
+            conn.close()
             raise Exception("Order not found.")
 
         # Get order items
@@ -172,89 +205,16 @@ class OrderController:
         items = cur.fetchall()
         conn.close()
 
-        # Build receipt text
-        receipt_text = f"*** {order['table_name']} ***\n"
-        receipt_text += f"Order #{order['id']}\nDate: {order['created_at']}\n"
-        receipt_text += "-" * 30 + "\n"
-        for item in items:
-            receipt_text += f"{item['name']} x{item['quantity']}  {item['price'] * item['quantity']:.2f} DZD\n"
-        receipt_text += "-" * 30 + "\n"
-        receipt_text += f"TOTAL: {order['total']:.2f} DZD\n"
-        receipt_text += "*** THANK YOU ***\n"
-
-        # Print via CUPS
-        try:
-            conn_cups = cups.Connection()
-            printers = conn_cups.getPrinters()
-            if not printers:
-                raise Exception("No printer found in CUPS.")
-
-            printer_name = list(printers.keys())[0]
-            temp_path = f"/tmp/receipt_{order_id}.txt"
-            with open(temp_path, "w", encoding="utf-8") as f:
-                f.write(receipt_text)
-
-            conn_cups.printFile(printer_name, temp_path, f"Order {order_id}", {})
-            os.remove(temp_path)
-        except Exception as e:
-            print(f"Failed to print: {e}")
-            raise
-
-
+        return receipts.receipt(order, items)
 
     @staticmethod
-    def send_to_category_printers(order_id):
-        """Send order items to category printers after order is saved."""
-        def _do_print():
-            try:
-                conn = get_connection()
-                cur = conn.cursor()
-
-                # 1. Fetch all order items with categories
-                cur.execute("""
-                    SELECT oi.quantity, oi.price, p.name AS product_name, c.name AS category_name
-                    FROM order_items oi
-                    JOIN products p ON oi.product_id = p.id
-                    JOIN categories c ON p.category_id = c.id
-                    WHERE oi.order_id = ?
-                """, (order_id,))
-                items = cur.fetchall()
-                if not items:
-                    print(f"No items found for order {order_id}")
-                    return
-
-                # 2. Group by category
-                grouped = {}
-                for item in items:
-                    cat = item["category_name"]
-                    grouped.setdefault(cat, []).append(item)
-
-                # 3. Get all printers
-                cur.execute("SELECT * FROM printers")
-                printers = cur.fetchall()
-
-                # 4. Match categories to printers
-                for printer in printers:
-                    assigned = [c.strip() for c in printer["assigned_categories"].split(",") if c.strip()]
-                    for cat, cat_items in grouped.items():
-                        if cat in assigned:
-                            OrderController._print_to_printer(printer, cat_items, order_id, cat)
-
-                conn.close()
-
-            except Exception as e:
-                print(f"⚠️ Failed sending to category printers: {e}")
-
-        # run in background thread to avoid UI blocking
-        threading.Thread(target=_do_print, daemon=True).start()
+    def print_receipt(order_id, queue=""):
+        """Queue a receipt for the cashier printer (CUPS). Returns the print job id."""
+        # the spooler's CUPS worker sends it; the caller never waits on the printer
+        return spooler.submit(cups_target(queue), OrderController.render_receipt(order_id), kind="receipt",
+                              order_id=order_id, title=f"Order {order_id}")
 
     @staticmethod
-    def _print_to_printer(printer, items, order_id, category_name):
-        """Example printer handler (replace with real printer logic)."""
-        print(f"\n🖨️ Sending order #{order_id} - category {category_name} to printer {printer['name']}")
-
-        # Example: Just simulate print for now
-        for item in items:
-            print(f"   {item['product_name']} x{item['quantity']} - {item['price']} DZD")
-
-        print(f"✅ Done printing for {printer['name']}")
+    def send_to_category_printers(order_id):
+        """Queue the kitchen tickets for the order's not yet printed lines now. Returns the job ids."""
+        return kitchen_dispatch.dispatch(order_id, window=0)
@@ -0,0 +1,176 @@
+# controllers/order_export.py
+"""
+Streaming order export to CSV, XLSX or PDF.
+
+Rows come from OrderQuery.chunks() / line_chunks() (fetchmany on one cursor)
+and each chunk is written out before the next one is fetched, so memory stays
+flat however many orders match: openpyxl runs in write-only mode and the PDF
+is drawn page by page. The file is written next to the target and renamed
+into place when complete; a cancelled or failed export leaves nothing behind.
+"""
+import csv
+import os
+from datetime import datetime
+
+from models.order import OrderQuery
+
+ORDER_COLUMNS = [
+    ("id", "ID"), ("table_name", "Table"), ("user_name", "User"), ("total", "Total (DA)"),
+    ("payment_type", "Payment Type"), ("status", "Status"), ("created_at", "Date"),
+]
+LINE_COLUMNS = ORDER_COLUMNS + [
+    ("product_name", "Product"), ("quantity", "Qty"), ("price", "Price (DA)"), ("line_total", "Line Total (DA)"),
+]
+FORMATS = ("csv", "xlsx", "pdf")
+
+
+class ExportCancelled(Exception):
+    """The caller asked to stop; the partial file was removed."""
+
+
+# ------------------------------------------------------
+# Writers: write(rows) per chunk, close() at the end
+# ------------------------------------------------------
+class _CsvWriter:
+    def __init__(self, path, columns, title):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.keys = [key for key, _ in columns]
+        self.out = csv.writer(self.file)
+        self.out.writerow([label for _, label in columns])
+
+    def write(self, rows):
+        self.out.writerows([row.get(key) for key in self.keys] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path, columns, title):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.keys = [key for key, _ in columns]
+        self.book = Workbook(write_only=True)  # rows are streamed to disk, not kept as cells
+        self.sheet = self.book.create_sheet(title[:31])
+        self.sheet.append([label for _, label in columns])
+
+    def write(self, rows):
+        for row in rows:
+            self.sheet.append([row.get(key) for key in self.keys])
+
+    def close(self):
+        self.book.save(self.path)
+
+
+class _PdfWriter:
+    MARGIN = 40
+    LINE = 14
+
+    def __init__(self, path, columns, title):
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.pdfgen import canvas
+
+        self.size = landscape(A4) if len(columns) > len(ORDER_COLUMNS) else A4
+        self.pdf = canvas.Canvas(path, pagesize=self.size)
+        self.pdf.setTitle(title)
+        self.columns = columns
+        usable = self.size[0] - 2 * self.MARGIN
+        self.x = [self.MARGIN + usable * i / len(columns) for i in range(len(columns))]
+        self.width = usable / len(columns) - 4
+
+        height = self.size[1]
+        self.pdf.setFont("Helvetica-Bold", 16)
+        self.pdf.drawString(self.MARGIN, height - 50, title)
+        self.pdf.setFont("Helvetica", 10)
+        self.pdf.drawString(self.MARGIN, height - 68, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._header(height - 95)
+
+    def _header(self, y):
+        self._font("Helvetica-Bold")
+        self._cells([label for _, label in self.columns], y)
+        self.pdf.line(self.MARGIN, y - 4, self.size[0] - self.MARGIN, y - 4)
+        self._font("Helvetica")
+        self.y = y - self.LINE - 4
+
+    def _font(self, name, size=9):
+        self.font = (name, size)
+        self.pdf.setFont(name, size)
+
+    def _fit(self, value):
+        text = "" if value is None else (f"{value:.2f}" if isinstance(value, float) else str(value))
+        width = self.pdf.stringWidth(text, *self.font)
+        if width > self.width:
+            text = text[:int(len(text) * self.width / width)]  # proportional cut, then trim the rest
+            while text and self.pdf.stringWidth(text, *self.font) > self.width:
+                text = text[:-1]
+        return text
+
+    def _cells(self, values, y):
+        # one text object per row instead of one per cell
+        line = self.pdf.beginText()
+        line.setFont(*self.font)
+        for x, value in zip(self.x, values):
+            line.setTextOrigin(x, y)
+            line.textOut(self._fit(value))
+        self.pdf.drawText(line)
+
+    def write(self, rows):
+        for row in rows:
+            if self.y < self.MARGIN:
+                self.pdf.showPage()
+                self._header(self.size[1] - self.MARGIN)
+            self._cells([row.get(key) for key, _ in self.columns], self.y)
+            self.y -= self.LINE
+
+    def close(self):
+        self.pdf.save()
+
+
+WRITERS = {"csv": _CsvWriter, "xlsx": _XlsxWriter, "pdf": _PdfWriter}
+
+
+def export_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}' (use {', '.join(FORMATS)})")
+    return fmt
+
+
+def export_orders(path, query=None, fmt=None, lines=False, chunk_size=500, progress=None, cancelled=None):
+    """
+    Write the orders matching query (default: all) to path, one row per order or,
+    with lines=True, one row per order line. The format comes from fmt or the extension.
+    progress(done, total) after every chunk; cancelled() -> True stops and removes the file.
+    Returns the number of rows written.
+    """
+    fmt = export_format(path, fmt)
+    query = query or OrderQuery()
+    if lines:
+        columns, title = LINE_COLUMNS, "Order Lines"
+        total, chunks = query.line_count(), query.line_chunks(chunk_size)
+    else:
+        columns, title = ORDER_COLUMNS, "Orders"
+        total, chunks = query.summary()["count"], query.chunks(chunk_size)
+
+    partial = f"{path}.part"
+    written = 0
+    try:
+        writer = WRITERS[fmt](partial, columns, f"{title} Report" if fmt == "pdf" else title)
+        try:
+            for rows in chunks:
+                if cancelled and cancelled():
+                    raise ExportCancelled()
+                writer.write(rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+        finally:
+            chunks.close()
+            writer.close()
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return written
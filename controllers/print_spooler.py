@@ -0,0 +1,310 @@
+# controllers/print_spooler.py
+"""
+Print spooler: every receipt / kitchen ticket is stored in print_jobs and sent
+by one worker thread per target, so an offline printer never blocks the UI or
+the other printers. Failed jobs are retried with exponential backoff and end
+up 'dead' after max_attempts.
+
+Targets are strings:
+    "cups:<queue>"    CUPS queue (empty queue = first available)
+    "printer:<id>"    row of the printers table (ESC/POS over network / USB)
+
+Finished jobs (and their payloads) are purged at start and then at most hourly
+from the workers, after print_jobs_retention_days (7) / print_jobs_dead_retention_days
+(30) on the settings row (0 keeps them).
+"""
+import random
+import threading
+import time
+
+from models.print_job import PrintJob, QUEUED, DONE, DEAD
+from models.settings import Settings
+from utils.cups_discovery import cups_queues
+from utils.escpos_sessions import sessions, session_key
+from utils.receipt_renderer import is_escpos, plain_text
+
+
+RETENTION = {"retention_days": 7, "dead_retention_days": 30}
+PURGE_INTERVAL = 3600
+
+
+class SpoolerFull(Exception):
+    """Too many jobs already waiting for this printer."""
+
+
+def cups_target(queue=""):
+    return f"cups:{queue or ''}"
+
+
+def printer_target(printer_id):
+    return f"printer:{printer_id}"
+
+
+# ------------------------------------------------------
+# Transports: send(arg, payload: bytes, title)
+# ------------------------------------------------------
+def _send_cups(queue, payload, title):
+    import cups
+
+    queue = cups_queues.resolve(queue)  # cached queue list / name lookup
+    # stream the bytes into the job (no temp file); ESC/POS goes through untouched
+    doc_format = (getattr(cups, "CUPS_FORMAT_RAW", "application/vnd.cups-raw") if is_escpos(payload)
+                  else getattr(cups, "CUPS_FORMAT_TEXT", "text/plain"))
+    try:
+        conn = cups_queues.connection()
+        job_id = conn.createJob(queue, title or "Receipt", {})
+        conn.startDocument(queue, job_id, title or "Receipt", doc_format, 1)
+        conn.writeRequestData(payload, len(payload))
+        conn.finishDocument(queue)
+    except Exception:
+        # stale connection or the queue went away: look everything up again next time
+        cups_queues.drop_connection()
+        cups_queues.invalidate()
+        raise
+
+
+def _send_printer(printer_id, payload, title):
+    from models.printer import Printer
+
+    printer = Printer.get(int(printer_id))
+    if not printer:
+        raise Exception(f"Printer #{printer_id} no longer exists.")
+
+    if session_key(printer) is None:
+        # manual printers have no device to talk to
+        print(f"\n🖨️ {title} -> {printer['name']}\n{plain_text(payload)}")
+        return
+
+    # pooled connection: no TCP handshake / USB claim per ticket
+    session = sessions.session(printer)
+    if is_escpos(payload):
+        session.send_raw(bytes(payload))
+    else:
+        session.send_text(payload.decode("utf-8", "replace"))
+
+
+TRANSPORTS = {
+    "cups": _send_cups,
+    "printer": _send_printer,
+}
+
+
+# ------------------------------------------------------
+# Workers
+# ------------------------------------------------------
+class _TargetWorker(threading.Thread):
+    """Sends the jobs of one target in order, retrying failures with backoff."""
+
+    IDLE_WAIT = 30.0
+
+    def __init__(self, spooler, target):
+        super().__init__(name=f"print-{target}", daemon=True)
+        self.spooler = spooler
+        self.target = target
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                jobs, wait = PrintJob.claim_next(self.target, self.spooler.batch_size)
+            except Exception as e:
+                print(f"⚠️ Print spooler ({self.target}): {e}")
+                jobs, wait = [], 1.0
+            if not jobs:
+                self.spooler.purge_due()
+                self._wake.wait(self.IDLE_WAIT if wait is None else min(wait, self.IDLE_WAIT))
+                continue
+            self.spooler._process(jobs)
+
+
+class PrintSpooler:
+    def __init__(self, max_pending=50, base_delay=2.0, max_delay=120.0, batch_size=8):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.transports = dict(TRANSPORTS)
+        self._workers = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._purged_at = None
+
+    # --- lifecycle ---
+    def start(self):
+        """Resume jobs left over from the last run."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.purge_due()
+        for target in PrintJob.recover():
+            self._worker(target).wake()
+
+    def stop(self, timeout=2.0):
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._started = False
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.join(timeout)
+
+    def _worker(self, target):
+        with self._lock:
+            worker = self._workers.get(target)
+            if worker is None or not worker.is_alive():
+                worker = _TargetWorker(self, target)
+                self._workers[target] = worker
+                worker.start()
+            return worker
+
+    # --- listeners (called from worker threads) ---
+    def add_listener(self, callback):
+        """callback(job) on every status change; job has id, target, kind, order_id, title, status, attempts, last_error."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, job):
+        info = {k: job.get(k) for k in ("id", "target", "kind", "order_id", "title",
+                                          "status", "attempts", "last_error")}
+        for callback in list(self._listeners):
+            try:
+                callback(info)
+            except Exception as e:
+                print(f"⚠️ Print job listener failed: {e}")
+
+    # --- jobs ---
+    def submit(self, target, payload, kind="receipt", order_id=None, title=None, max_attempts=5):
+        """Queue payload (str or bytes) for target and return the job id. Raises SpoolerFull."""
+        if PrintJob.count_pending(target) >= self.max_pending:
+            raise SpoolerFull(f"{self.max_pending} jobs already waiting for {target}")
+        job_id = PrintJob.enqueue(target, payload, kind, order_id, title, max_attempts)
+        self.announce([{"id": job_id, "target": target, "kind": kind, "order_id": order_id, "title": title}])
+        return job_id
+
+    def submit_with(self, cur, jobs):
+        """
+        Queue jobs [{"target", "payload", "kind", "order_id", "title"}] inside the caller's
+        transaction, so they commit (or roll back) with the caller's own writes. Raises
+        SpoolerFull before writing anything. Pass the result to announce() after the commit.
+        """
+        wanted = {}
+        for job in jobs:
+            wanted[job["target"]] = wanted.get(job["target"], 0) + 1
+        for target, count in wanted.items():
+            if PrintJob.count_pending(target) + count > self.max_pending:
+                raise SpoolerFull(f"{self.max_pending} jobs already waiting for {target}")
+        queued = []
+        for job in jobs:
+            job_id = PrintJob.enqueue_with(cur, job["target"], job["payload"], job.get("kind", "receipt"),
+                                           job.get("order_id"), job.get("title"))
+            queued.append({"id": job_id, "target": job["target"], "kind": job.get("kind", "receipt"),
+                           "order_id": job.get("order_id"), "title": job.get("title")})
+        return queued
+
+    def announce(self, jobs):
+        """Tell the listeners and wake the workers about committed jobs."""
+        for job in jobs:
+            self._notify(dict(job, status=QUEUED, attempts=0))
+            self._worker(job["target"]).wake()
+
+    def retry(self, job_id):
+        """Requeue a dead job."""
+        job = PrintJob.get(job_id)
+        if not job:
+            return
+        PrintJob.requeue(job_id)
+        job.update(status=QUEUED, attempts=0)
+        self._notify(job)
+        self._worker(job["target"]).wake()
+
+    # --- retention ---
+    @staticmethod
+    def retention():
+        return Settings.section("print_jobs", RETENTION)
+
+    def purge(self):
+        """Delete done / dead jobs past their retention; returns the number deleted."""
+        settings = self.retention()
+        deleted = 0
+        for status, key in ((DONE, "retention_days"), (DEAD, "dead_retention_days")):
+            if settings[key] and float(settings[key]) > 0:
+                deleted += PrintJob.purge(float(settings[key]), status)
+        return deleted
+
+    def purge_due(self):
+        """purge() if the last one was more than PURGE_INTERVAL ago (called from idle workers)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._purged_at is not None and now - self._purged_at < PURGE_INTERVAL:
+                return
+            self._purged_at = now
+        try:
+            deleted = self.purge()
+            if deleted:
+                print(f"🧹 Purged {deleted} old print jobs")
+        except Exception as e:
+            print(f"⚠️ Print job purge failed: {e}")
+
+    def backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _process(self, jobs):
+        """Send claimed jobs; ready ESC/POS tickets for the same target go out in one write."""
+        if len(jobs) > 1 and all(is_escpos(job["payload"]) for job in jobs):
+            self._send(jobs)
+        else:
+            for job in jobs:
+                self._send([job])
+
+    def _send(self, jobs):
+        for job in jobs:
+            self._notify(job)  # printing
+        first = jobs[0]
+        scheme, _, arg = first["target"].partition(":")
+        try:
+            transport = self.transports.get(scheme)
+            if transport is None:
+                raise Exception(f"Unknown print target '{first['target']}'")
+            payload = b"".join(job["payload"] for job in jobs)
+            title = first["title"] if len(jobs) == 1 else f"{first['title']} (+{len(jobs) - 1})"
+            transport(arg, payload, title)
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            for job in jobs:
+                self._failed(job, error)
+            return
+
+        PrintJob.mark_done_many([(job["id"], job["attempts"] + 1) for job in jobs])
+        for job in jobs:
+            job.update(status=DONE, attempts=job["attempts"] + 1, last_error=None)
+            self._notify(job)
+
+    def _failed(self, job, error):
+        attempts = job["attempts"] + 1
+        if attempts >= job["max_attempts"]:
+            PrintJob.mark_dead(job["id"], attempts, error)
+            job.update(status=DEAD, attempts=attempts, last_error=error)
+            print(f"❌ Print job #{job['id']} ({job['target']}) gave up: {error}")
+        else:
+            PrintJob.mark_retry(job["id"], attempts, error, self.backoff(attempts))
+            job.update(status=QUEUED, attempts=attempts, last_error=error)
+        self._notify(job)
+
+
+spooler = PrintSpooler()
@@ -1,9 +1,8 @@
-import usb.core
-import usb.util
 import re
-from escpos.printer import Usb, Network
+from utils.escpos_sessions import sessions, session_key
 from PyQt6.QtWidgets import QMessageBox
 from models.printer import Printer
+from controllers.printer_discovery import printer_discovery
 
 
 class PrinterController:
@@ -13,37 +12,8 @@ class PrinterController:
     # ------------------------------------------------------
     @staticmethod
     def detect_usb_printers():
-        import usb.core, usb.util
-        printers = []
-        devices = usb.core.find(find_all=True)
-
-        for dev in devices:
-            is_printer = False
-
-            if dev.bDeviceClass == 7:
-                is_printer = True
-            elif dev.bDeviceClass == 0:  # might expose printer class through interfaces
-                try:
-                    cfg = dev.get_active_configuration()
-                    for interface in cfg:
-                        if interface.bInterfaceClass == 7:
-                            is_printer = True
-                            break
-                except:
-                    pass
-
-            if not is_printer:
-                continue
-
-            printers.append({
-                "name": usb.util.get_string(dev, dev.iProduct) or "USB Printer",
-                "vendor_id": f"{dev.idVendor:04X}",
-                "product_id": f"{dev.idProduct:04X}",
-                "serial_number": usb.util.get_string(dev, dev.iSerialNumber) or "",
-                "connection": "usb"
-            })
-
-        return printers
+        """USB printers plugged in now (descriptors cached per device by printer_discovery)."""
+        return printer_discovery.scan_usb()
 
 
 
@@ -116,7 +86,10 @@ class PrinterController:
     @staticmethod
     def delete_printer(printer_id, parent=None):
         try:
+            printer = Printer.get(printer_id)
             Printer.delete(printer_id)
+            if printer and session_key(printer):
+                sessions.discard(printer)
             QMessageBox.information(parent, "Deleted", "Printer removed successfully")
         except Exception as e:
             QMessageBox.warning(parent, "Error", f"Failed to delete: {e}")
@@ -131,16 +104,10 @@ class PrinterController:
         """
         try:
             if printer["connection"] == "usb":
-                v = int(printer["vendor_id"], 16)
-                p = int(printer["product_id"], 16)
-                escpos = Usb(v, p, timeout=4000)
-                escpos.text("Test Print OK\n")
-                escpos.cut()
+                sessions.session(printer).send_text("Test Print OK\n")
 
             elif printer["connection"] == "network":
-                escpos = Network(printer["ip"], printer["port"])
-                escpos.text("Network Test Print OK\n")
-                escpos.cut()
+                sessions.session(printer).send_text("Network Test Print OK\n")
 
             else:
                 raise Exception("Manual printers cannot print test automatically.")
@@ -0,0 +1,246 @@
+# controllers/printer_discovery.py
+"""
+Printer discovery, meant to run off the UI thread.
+
+USB: devices are enumerated on every scan (cheap), but their string descriptors
+and configurations (slow control transfers) are read once per plugged-in device
+and cached by bus/address/vendor/product.
+Network: hosts of a subnet are probed on the raw ESC/POS port (9100) with a
+bounded thread pool.
+
+PrinterDiscovery.watch() polls the USB bus in a background thread and, when a
+device is plugged or unplugged, updates printers.status of the matching USB
+printers and tells the listeners.
+"""
+import ipaddress
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.database import get_connection
+from models.printer import Printer
+
+RAW_PORT = 9100
+USB_PRINTER_CLASS = 7
+
+
+def local_subnet(prefix=24):
+    """This machine's LAN as an ip_network (default route interface), e.g. 192.168.1.0/24."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("10.255.255.255", 1))  # no packet is sent; picks the outgoing interface
+        ip = sock.getsockname()[0]
+    except OSError:
+        ip = "127.0.0.1"
+    finally:
+        sock.close()
+    return ipaddress.ip_network(f"{ip}/{prefix}", strict=False)
+
+
+def probe(host, port=RAW_PORT, timeout=0.5):
+    """True if something accepts TCP connections on host:port."""
+    try:
+        with socket.create_connection((str(host), port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _is_printer(dev):
+    if dev.bDeviceClass == USB_PRINTER_CLASS:
+        return True
+    if dev.bDeviceClass == 0:  # might expose printer class through interfaces
+        try:
+            cfg = dev.get_active_configuration()
+            return any(interface.bInterfaceClass == USB_PRINTER_CLASS for interface in cfg)
+        except Exception:
+            return False
+    return False
+
+
+def _usb_key(vendor_id, product_id):
+    """('04B8', '0E15') / ('0x04b8', ...) -> (0x04B8, 0x0E15); None if not hex."""
+    try:
+        return int(str(vendor_id), 16), int(str(product_id), 16)
+    except (TypeError, ValueError):
+        return None
+
+
+def _string(dev, index):
+    import usb.util
+
+    try:
+        return usb.util.get_string(dev, index) if index else None
+    except Exception:
+        return None
+
+
+class PrinterDiscovery:
+    def __init__(self, max_workers=64, poll_interval=3.0):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._descriptors = {}  # (bus, address, vid, pid) -> printer dict, or None for non-printers
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- listeners (called from the watcher thread) ---
+    def add_listener(self, callback):
+        """callback({printer_id: status}) after printers.status changed."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, changes):
+        for callback in list(self._listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"⚠️ Printer discovery listener failed: {e}")
+
+    # --- USB ---
+    def scan_usb(self):
+        """USB printers currently plugged in; descriptors are read once per device."""
+        import usb.core
+
+        found = []
+        seen = set()
+        for dev in usb.core.find(find_all=True):
+            key = (dev.bus, dev.address, dev.idVendor, dev.idProduct)
+            seen.add(key)
+            with self._lock:
+                cached = self._descriptors.get(key, False)
+            if cached is False:
+                cached = None
+                if _is_printer(dev):
+                    cached = {
+                        "name": _string(dev, dev.iProduct) or "USB Printer",
+                        "vendor_id": f"{dev.idVendor:04X}",
+                        "product_id": f"{dev.idProduct:04X}",
+                        "serial_number": _string(dev, dev.iSerialNumber) or "",
+                        "connection": "usb",
+                    }
+                with self._lock:
+                    self._descriptors[key] = cached
+            if cached:
+                found.append(dict(cached))
+
+        # unplugged devices: forget them (a replug gets a new address anyway)
+        with self._lock:
+            for key in set(self._descriptors) - seen:
+                del self._descriptors[key]
+        return found
+
+    # --- network ---
+    def scan_network(self, subnet=None, port=RAW_PORT, timeout=0.5, cancelled=None):
+        """Hosts of subnet (default: local /24) answering on port, probed concurrently."""
+        network = ipaddress.ip_network(subnet, strict=False) if subnet else local_subnet()
+        hosts = list(network.hosts())
+        found = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(hosts) or 1),
+                                thread_name_prefix="printer-probe") as pool:
+            def check(host):
+                if cancelled and cancelled():
+                    return None
+                return host if probe(host, port, timeout) else None
+
+            for host in pool.map(check, hosts):
+                if host is not None:
+                    found.append({"name": f"Network Printer {host}", "ip": str(host), "port": port,
+                                  "connection": "network"})
+        return found
+
+    def scan(self, subnet=None, network=True):
+        """USB + network printers, each marked 'known' if already in the printers table."""
+        try:
+            found = self.scan_usb()
+        except Exception as e:  # no libusb backend / permissions: still scan the network
+            print(f"⚠️ USB scan failed: {e}")
+            found = []
+        if network:
+            found += self.scan_network(subnet)
+
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT name, connection_type, ip_address, port, vendor_id, product_id FROM printers")
+        rows = cur.fetchall()
+        conn.close()
+        usb_known = {_usb_key(r["vendor_id"], r["product_id"]) for r in rows if r["connection_type"] == "usb"}
+        net_known = {(r["ip_address"], int(r["port"] or RAW_PORT))
+                     for r in rows if r["connection_type"] == "network"}
+        names = {r["name"] for r in rows}
+        for p in found:
+            if p["connection"] == "usb":
+                p["known"] = _usb_key(p["vendor_id"], p["product_id"]) in usb_known or p["name"] in names
+            else:
+                p["known"] = (p["ip"], p["port"]) in net_known
+
+        # discovered network printers we already have are obviously online
+        self.set_status({(p["ip"], p["port"]): "online" for p in found
+                         if p["connection"] == "network" and p["known"]}, kind="network")
+        return found
+
+    # --- printers.status ---
+    def set_status(self, statuses, kind="usb", missing=None):
+        """
+        statuses: {(vid, pid): status} for kind 'usb' (ints), {(ip, port): status} for 'network'.
+        Printers of that kind not in statuses get `missing` (None: left alone). USB printers
+        without a vendor / product id (added by hand, usually printed to through CUPS) cannot
+        be matched to a device and are always left alone.
+        Updates the printers whose status differs; returns and notifies {printer_id: status}.
+        """
+        if not statuses and missing is None:
+            return {}
+        conn = get_connection()
+        cur = conn.cursor()
+        if kind == "usb":
+            cur.execute("SELECT id, vendor_id, product_id FROM printers WHERE connection_type = 'usb'")
+            rows = [(r["id"], _usb_key(r["vendor_id"], r["product_id"])) for r in cur.fetchall()]
+            rows = [(pid, key) for pid, key in rows if key is not None]
+        else:
+            cur.execute("SELECT id, ip_address, port FROM printers WHERE connection_type = 'network'")
+            rows = [(r["id"], (r["ip_address"], int(r["port"] or RAW_PORT))) for r in cur.fetchall()]
+        conn.close()
+
+        wanted = {pid: statuses.get(key, missing) for pid, key in rows}
+        changes = Printer.set_statuses({pid: status for pid, status in wanted.items() if status is not None})
+        if changes:
+            self._notify(changes)
+        return changes
+
+    # --- hotplug ---
+    def watch(self):
+        """Start polling the USB bus for plugged / unplugged printers."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="usb-hotplug", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        present = None
+        last_error = None
+        while True:
+            try:
+                current = {_usb_key(p["vendor_id"], p["product_id"]) for p in self.scan_usb()}
+                last_error = None
+            except Exception as e:
+                if str(e) != last_error:  # e.g. no libusb backend: say it once
+                    print(f"⚠️ USB scan failed: {e}")
+                    last_error = str(e)
+                current = None
+            if current is not None and current != present:
+                # plugged in -> online, everything else (unplugged / never seen) -> offline
+                self.set_status({key: "online" for key in current}, kind="usb", missing="offline")
+                present = current
+            if self._stop.wait(self.poll_interval):
+                break
+
+
+printer_discovery = PrinterDiscovery()
@@ -0,0 +1,127 @@
+# controllers/printer_health.py
+"""
+Periodic printer health check keeping printers.status current.
+
+Every `interval` seconds all configured printers are checked concurrently:
+    network  TCP connect to ip:port (or an open pooled session)
+    usb      device present on the bus (one USB enumeration per round); a USB
+             printer without vendor / product id is checked like manual
+    manual   state of the CUPS queue of the same name / cups_name
+The statuses that changed are written in one batch and passed to the listeners
+as {printer_id: status}. A printer whose state cannot be determined (e.g. CUPS
+is not available) keeps its current status.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from controllers.printer_discovery import printer_discovery, probe, _usb_key, RAW_PORT
+from models.printer import Printer
+from utils.cups_discovery import cups_queues
+from utils.escpos_sessions import sessions, session_key
+
+ONLINE, OFFLINE = "online", "offline"
+
+
+class PrinterHealthMonitor:
+    def __init__(self, interval=30.0, timeout=1.0, max_workers=8):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._listeners = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- listeners (called from the monitor thread) ---
+    def add_listener(self, callback):
+        """callback({printer_id: status}) after printers.status changed."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, changes):
+        for callback in list(self._listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"⚠️ Printer health listener failed: {e}")
+
+    # --- checks ---
+    def _check_network(self, printer):
+        if sessions.is_connected(printer):
+            return ONLINE  # printers often take one client at a time: don't compete with our session
+        key = session_key(printer)
+        return ONLINE if probe(key[1], key[2] or RAW_PORT, self.timeout) else OFFLINE
+
+    @staticmethod
+    def _check_cups(printer):
+        try:
+            status = cups_queues.status(printer.get("cups_name") or printer["name"])
+        except Exception:
+            return None  # no CUPS / no such queue: nothing to say
+        return ONLINE if status["state"] in ("idle", "printing") and status["accepting"] else OFFLINE
+
+    def check(self, printers):
+        """{printer_id: status} for the given printer rows (None = unknown, left out)."""
+        usb_present = None
+        if any(p.get("connection_type") == "usb" and _usb_key(p.get("vendor_id"), p.get("product_id"))
+               for p in printers):
+            try:
+                usb_present = {_usb_key(d["vendor_id"], d["product_id"]) for d in printer_discovery.scan_usb()}
+            except Exception:
+                usb_present = None
+
+        results = {}
+        network = [p for p in printers if p.get("connection_type") == "network" and p.get("ip_address")]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="printer-health") as pool:
+            futures = {p["id"]: pool.submit(self._check_network, p) for p in network}
+            for p in printers:
+                kind = p.get("connection_type")
+                usb_key = _usb_key(p.get("vendor_id"), p.get("product_id")) if kind == "usb" else None
+                if usb_key is not None:
+                    if usb_present is not None:
+                        results[p["id"]] = ONLINE if usb_key in usb_present else OFFLINE
+                elif kind != "network":
+                    status = self._check_cups(p)
+                    if status:
+                        results[p["id"]] = status
+            for printer_id, future in futures.items():
+                results[printer_id] = future.result()
+        return results
+
+    def check_all(self):
+        """One round: check every printer, store and announce what changed."""
+        changes = Printer.set_statuses(self.check(Printer.all()))
+        if changes:
+            self._notify(changes)
+        return changes
+
+    # --- background loop ---
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="printer-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def check_soon(self):
+        """Run a round now (e.g. after a printer was added or edited)."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.check_all()
+            except Exception as e:
+                print(f"⚠️ Printer health check failed: {e}")
+            self._wake.wait(self.interval)
+
+
+printer_health = PrinterHealthMonitor()
@@ -1,5 +1,5 @@
 # controllers/report_controller.py
-from models.database import get_connection
+from models.rollup import SalesRollup
 from datetime import datetime
 import csv
 from fpdf import FPDF  # pip install fpdf
@@ -8,51 +8,18 @@ from fpdf import FPDF  # pip install fpdf
 class ReportController:
     @staticmethod
     def get_sales_summary(start_date=None, end_date=None):
-        conn = get_connection()
-        conn.row_factory = lambda cursor, row: {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
-        cur = conn.cursor()
-
-        query = "SELECT SUM(total) AS total_sales FROM orders"
-        params = []
-
         if start_date and end_date:
-            query += " WHERE created_at BETWEEN ? AND ?"
-            params = [start_date, end_date]
-
-        cur.execute(query, params)
-        result = cur.fetchone()
-        total_sales = result["total_sales"] if result and result["total_sales"] else 0
-
-        conn.close()
-        return {"total": total_sales}
+            totals = SalesRollup.order_totals(start_date, end_date)
+        else:
+            totals = SalesRollup.order_totals()
+        return {"total": totals["total"] or 0}
 
     @staticmethod
     def get_category_sales(start_date=None, end_date=None):
-        conn = get_connection()
-        conn.row_factory = lambda cursor, row: {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
-        cur = conn.cursor()
-
-        query = """
-            SELECT c.name AS category,
-                   SUM(oi.quantity * oi.price) AS total
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            JOIN categories c ON p.category_id = c.id
-            JOIN orders o ON oi.order_id = o.id
-        """
-
-        params = []
+        # pre-aggregated per day / category, no scan of order history
         if start_date and end_date:
-            query += " WHERE o.created_at BETWEEN ? AND ?"
-            params = [start_date, end_date]
-
-        query += " GROUP BY c.id"
-
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        conn.close()
-
-        return [{"category": r["category"], "total": r["total"] or 0} for r in rows]
+            return SalesRollup.by_category(start_date, end_date)
+        return SalesRollup.by_category()
 
     @staticmethod
     def export_sales_to_csv(filename, data):
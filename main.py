@@ -2,12 +2,35 @@
 from PyQt6.QtWidgets import QApplication
 from ui.login_window import LoginWindow
 import sys
-from models.database import init_db
+from models.database import init_db, close_pool
+from models.query_profiler import profiler, DEFAULTS as PROFILER_DEFAULTS
+from models.settings import Settings
+from controllers.print_spooler import spooler
+from controllers.kitchen_dispatch import kitchen_dispatch
+from controllers.printer_discovery import printer_discovery
+from controllers.printer_health import printer_health
+from controllers.backup_manager import backups
+from controllers.order_archiver import order_archiver
+from utils.escpos_sessions import sessions
 
 if __name__ == "__main__":
     
     app = QApplication(sys.argv)
     init_db()
+    profiler.configure(Settings.section("profiler", PROFILER_DEFAULTS))  # settings profiler_*
+    spooler.start()  # resume print jobs left from the last run
+    printer_discovery.watch()  # USB plug / unplug -> printers.status
+    printer_health.start()  # periodic network / USB / CUPS check -> printers.status
+    backups.start()  # rotating online backups (settings backup_*)
+    order_archiver.start()  # old closed orders -> monthly archive files (settings archive_*)
+    app.aboutToQuit.connect(kitchen_dispatch.flush_all)  # queue buffered tickets before the spooler stops
+    app.aboutToQuit.connect(spooler.stop)
+    app.aboutToQuit.connect(printer_discovery.stop)
+    app.aboutToQuit.connect(printer_health.stop)
+    app.aboutToQuit.connect(backups.stop)
+    app.aboutToQuit.connect(order_archiver.stop)
+    app.aboutToQuit.connect(sessions.close_all)
+    app.aboutToQuit.connect(close_pool)
 
     window = LoginWindow()
     window.show()
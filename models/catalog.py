@@ -0,0 +1,79 @@
+# models/catalog.py
+import threading
+
+
+class CatalogCache:
+    """
+    Process-wide in-memory copy of products and categories.
+    Loaded on first use and dropped whenever Product / Category write to the DB.
+    Returned dicts are shared: treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.version = 0  # bumped on every invalidation, lets dependants rebuild
+        self._products = {}
+        self._by_category = {}
+        self._categories = {}
+        self._categories_by_name = {}
+        self._product_list = []
+        self._category_list = []
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from models.product import Product
+            from models.category import Category
+
+            products = Product.get_all()
+            categories = Category.all()
+
+            self._product_list = products
+            self._products = {p["id"]: p for p in products}
+            self._by_category = {}
+            for p in products:
+                self._by_category.setdefault(p["category_id"], []).append(p)
+
+            self._category_list = categories
+            self._categories = {c["id"]: c for c in categories}
+            self._categories_by_name = {c["name"]: c for c in categories}
+            self._loaded = True
+
+    def invalidate(self):
+        """Drop the cached catalog; the next read reloads it from SQLite."""
+        with self._lock:
+            self._loaded = False
+            self.version += 1
+
+    # --- products ---
+    def products(self):
+        self._ensure_loaded()
+        return self._product_list
+
+    def product(self, product_id):
+        self._ensure_loaded()
+        return self._products.get(product_id)
+
+    def products_in_category(self, category_id):
+        self._ensure_loaded()
+        return self._by_category.get(category_id, [])
+
+    # --- categories ---
+    def categories(self):
+        self._ensure_loaded()
+        return self._category_list
+
+    def category(self, category_id):
+        self._ensure_loaded()
+        return self._categories.get(category_id)
+
+    def category_by_name(self, name):
+        self._ensure_loaded()
+        return self._categories_by_name.get(name)
+
+
+catalog = CatalogCache()
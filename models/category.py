@@ -1,5 +1,7 @@
 # models/category.py
 from models.database import get_connection
+from models.catalog import catalog
+from models.printer_routing import printer_routing
 
 class Category:
     @staticmethod
@@ -20,6 +22,7 @@ class Category:
         cur.execute("INSERT INTO categories (name) VALUES (?)", (name,))
         conn.commit()
         conn.close()
+        catalog.invalidate()
 
     @staticmethod
     def update(category_id, name):
@@ -29,12 +32,16 @@ class Category:
         cur.execute("UPDATE categories SET name = ? WHERE id = ?", (name, category_id))
         conn.commit()
         conn.close()
+        catalog.invalidate()
 
     @staticmethod
     def delete(category_id):
         """Delete a category"""
         conn = get_connection()
         cur = conn.cursor()
+        cur.execute("DELETE FROM printer_categories WHERE category_id = ?", (category_id,))
         cur.execute("DELETE FROM categories WHERE id = ?", (category_id,))
         conn.commit()
         conn.close()
+        catalog.invalidate()
+        printer_routing.invalidate()
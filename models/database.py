@@ -1,19 +1,406 @@
-# models/database.py
+import atexit
+import itertools
 import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 
+from models.migrations import migrate
+from models.query_profiler import profiler
+
 DB_PATH = Path(__file__).resolve().parent.parent / "fastfood.db"
 
+# pragmas applied once when a pooled connection is opened
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-16000;",
+    "PRAGMA busy_timeout=10000;",
+)
+
+
+class PooledConnection:
+    """
+    One checkout of the calling thread's pooled connection.
+    Behaves like sqlite3.Connection; close() hands it back to the pool.
+    row_factory is per checkout so callers can still override it.
+
+    Checkouts nest (a helper opening its own while the caller holds one): only the
+    outermost `with` block commits or rolls back. A nested block runs in a
+    SAVEPOINT, so its failure undoes just its own work, and commit() inside an
+    outer block is left to that block.
+    """
+
+    def __init__(self, pool, conn, slot=None):
+        self._pool = pool
+        self._conn = conn
+        self._slot = slot
+        self._savepoint = None
+        self._closed = False
+        self.row_factory = sqlite3.Row
+
+    def cursor(self):
+        cur = self._conn.cursor()
+        cur.row_factory = self.row_factory
+        return profiler.wrap(cur)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        if self._slot is not None and self._slot.blocks and not (self._entered and self._savepoint is None):
+            return  # inside someone's `with` block: that block commits
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    @property
+    def raw(self):
+        """The underlying sqlite3.Connection"""
+        return self._conn
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._conn)
+
+    _entered = False
+
+    def __enter__(self):
+        if self._slot is not None:
+            self._slot.blocks += 1
+            if self._slot.blocks > 1:
+                self._savepoint = f"nested_{self._slot.blocks}"
+                self._conn.execute(f"SAVEPOINT {self._savepoint}")
+        self._entered = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._savepoint:
+                if exc_type is not None:
+                    self._conn.execute(f"ROLLBACK TO {self._savepoint}")
+                self._conn.execute(f"RELEASE {self._savepoint}")
+            elif exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            if self._slot is not None and self._entered:
+                self._slot.blocks -= 1
+            self._entered = False
+            self.close()
+        return False
+
+    def __del__(self):
+        # a checkout that was never closed (early return / exception) is released on GC,
+        # like the old throwaway connections were
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+
+class _Slot:
+    """A thread's hold on a pooled connection; lives in the pool's thread-local."""
+    __slots__ = ("key", "conn", "generation", "depth", "blocks", "__weakref__")
+
+    def __init__(self, key, conn, generation):
+        self.key = key
+        self.conn = conn
+        self.generation = generation
+        self.depth = 0  # open checkouts
+        self.blocks = 0  # open `with` checkouts (only the outermost commits)
+
+
+class ConnectionPool:
+    """
+    Keeps one long-lived connection per thread. When a thread's local state goes
+    away (the thread ended, or a QThreadPool runnable returned: PyQt drops the
+    Python thread state after every run) its connection is parked in an idle
+    list and handed to the next thread that needs one, instead of being closed.
+    """
+
+    MAX_IDLE = 4
+
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.RLock()  # RLock: a slot finalizer may run inside a locked section
+        self._connections = {}  # slot key -> sqlite3.Connection (held by a live thread)
+        self._idle = []  # connections of finished threads, ready for reuse
+        self._keys = itertools.count(1)
+        self._generation = 0
+        self._busy = set()  # slot keys with a checkout open
+        self._gate = threading.Event()  # cleared while the pool is drained (restore)
+        self._gate.set()
+        self.stats = {"opened": 0, "reused": 0, "closed": 0, "health_failures": 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error:
+                pass
+        return conn
+
+    def _open(self):
+        """Give this thread a connection: an idle one if there is one, else a new one."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            generation = self._generation
+        if conn is None:
+            conn = self._connect()
+            with self._lock:
+                self.stats["opened"] += 1
+        else:
+            with self._lock:
+                self.stats["reused"] += 1
+
+        slot = _Slot(next(self._keys), conn, generation)
+        with self._lock:
+            self._connections[slot.key] = conn
+        finalizer = weakref.finalize(slot, self._retire, slot.key, conn, generation)
+        finalizer.atexit = False
+        self._local.slot = slot
+        return slot
+
+    def _retire(self, key, conn, generation):
+        """The owning thread's slot is gone: park its connection for reuse (or close it)."""
+        with self._lock:
+            if self._connections.get(key) is not conn:
+                return  # closed by close_all / health_check already
+            del self._connections[key]
+            if key in self._busy:
+                # the thread went away mid-checkout; whoever still holds the checkout keeps it
+                self._busy.discard(key)
+                return
+            park = generation == self._generation and len(self._idle) < self.MAX_IDLE
+            if park:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                except sqlite3.Error:
+                    park = False
+            if park:
+                self._idle.append(conn)
+                return
+        self._close_quietly(conn)
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self.stats["closed"] += 1
+
+    def _slot(self):
+        slot = getattr(self._local, "slot", None)
+        if slot is not None and slot.generation != self._generation:
+            return None
+        return slot
+
+    def acquire(self):
+        """Check out this thread's connection, opening it if needed."""
+        slot = self._slot()
+        if not self._gate.is_set() and not (slot and slot.depth):
+            self._gate.wait()  # drained: wait for the file swap to finish
+            slot = self._slot()
+        if slot is None:
+            slot = self._open()
+        else:
+            with self._lock:
+                self.stats["reused"] += 1
+
+        conn = slot.conn
+        if slot.depth == 0:
+            if conn.in_transaction:
+                # left open by a caller that never committed; don't let the next one commit it
+                conn.rollback()
+            with self._lock:
+                self._busy.add(slot.key)
+        slot.depth += 1
+        return PooledConnection(self, conn, slot)
+
+    def release(self, conn):
+        slot = getattr(self._local, "slot", None)
+        if slot is None or slot.conn is not conn:
+            return
+        slot.depth = max(0, slot.depth - 1)
+        if slot.depth == 0:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self._busy.discard(slot.key)
+
+    def connection(self):
+        # the checkout is itself a context manager: commit / rollback, then release
+        return self.acquire()
+
+    @contextmanager
+    def dedicated(self):
+        """A private connection, closed on exit; counted as busy so drain() waits for it."""
+        slot = self._slot()
+        key = next(self._keys)
+        while True:
+            if not (slot and slot.depth):
+                self._gate.wait()
+            with self._lock:
+                if self._gate.is_set() or (slot and slot.depth):
+                    self._busy.add(key)
+                    break
+        conn = None
+        try:
+            conn = self._connect()
+            yield conn
+        finally:
+            if conn is not None:
+                conn.close()
+            with self._lock:
+                self._busy.discard(key)
+
+    def health_check(self):
+        """Ping the current thread's connection, reopening it if it is broken."""
+        slot = self._slot()
+        if slot is None:
+            return True
+        try:
+            slot.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            with self._lock:
+                self.stats["health_failures"] += 1
+                self._connections.pop(slot.key, None)
+                self._busy.discard(slot.key)
+            self._close_quietly(slot.conn)
+            self._local.slot = None
+            return False
+
+    def close_all(self):
+        """Close every pooled connection; threads reconnect lazily on next use."""
+        with self._lock:
+            self._generation += 1
+            conns = list(self._connections.values()) + self._idle
+            self._connections.clear()
+            self._idle = []
+            for conn in conns:
+                self._close_quietly(conn)
+
+    @contextmanager
+    def drain(self, timeout=10.0):
+        """
+        Hold new checkouts, wait for the open ones to be released and close every
+        connection, so the database file can be replaced. Checkouts resume on exit.
+        Raises TimeoutError if connections are still in use after timeout seconds.
+        """
+        mine = getattr(self._local, "slot", None)
+        with self._lock:
+            self._gate.clear()
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                with self._lock:
+                    busy = self._busy - {mine.key if mine else None}
+                if not busy:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"database still in use by {len(busy)} thread(s)")
+                time.sleep(0.02)
+            self.close_all()
+            yield
+        finally:
+            self._gate.set()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["open"] = len(self._connections) + len(self._idle)
+            stats["idle"] = len(self._idle)
+        return stats
+
+
+_pool = ConnectionPool(DB_PATH)
+atexit.register(_pool.close_all)
+
 
 def get_connection():
-    # allow threads, wait longer before giving up, enable WAL for better concurrency
-    conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    # pooled: the thread's connection is reused, close() just returns it to the pool
+    return _pool.acquire()
+
+
+def connection():
+    """Context manager checkout: `with connection() as conn:` commits on success."""
+    return _pool.connection()
+
+
+def dedicated_connection():
+    """`with dedicated_connection() as conn:` an unpooled connection to the live database
+    (for per-connection state such as ATTACH), closed on exit; drain_pool() waits for it."""
+    return _pool.dedicated()
+
+
+def iter_chunks(query, params=(), size=500):
+    """Yield the rows of query in lists of up to size rows (fetchmany), on the calling thread's connection."""
+    conn = get_connection()
     try:
-        conn.execute("PRAGMA journal_mode=WAL;")
-    except Exception:
-        pass
-    return conn
+        cur = conn.cursor()
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def close_pool():
+    """Shutdown hook: close all pooled connections."""
+    _pool.close_all()
+
+
+def drain_pool(timeout=10.0):
+    """`with drain_pool():` no connection is open or handed out inside the block."""
+    return _pool.drain(timeout)
+
+
+def database_path():
+    """Path of the live database file."""
+    return Path(_pool.path)
+
+
+def use_database(path):
+    """Point the pool at another database file (benchmarks / tools); open connections are closed."""
+    global DB_PATH
+    _pool.close_all()
+    _pool.path = DB_PATH = Path(path)
+
+
+def pool_stats():
+    """Connections opened / reused / closed, for diagnostics."""
+    return _pool.snapshot()
 
 
 def init_db():
@@ -46,8 +433,10 @@ def init_db():
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS tables (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        area TEXT
+        table_number INTEGER UNIQUE,
+        name TEXT,
+        area TEXT,
+        status TEXT DEFAULT 'Free'
     )
     """)
 
@@ -137,6 +526,12 @@ def init_db():
     """)
 
 
+    
+    conn.commit()
+
+    # versioned schema changes + indexes (PRAGMA user_version)
+    migrate(conn)
+
     # Ensure one default row exists
     cursor.execute("SELECT COUNT(*) FROM settings")
     if cursor.fetchone()[0] == 0:
@@ -145,8 +540,5 @@ def init_db():
         VALUES ('My Restaurant', '123 Main St', '0550 000 000', '', 0, 'DZD', 0)
         """)
 
-
-
-    
     conn.commit()
     conn.close()
@@ -0,0 +1,237 @@
+# models/migrations.py
+"""
+Versioned schema migrations, tracked with PRAGMA user_version.
+Each step runs in its own transaction and bumps user_version on success.
+Add new steps to the end of MIGRATIONS; never renumber existing ones.
+"""
+
+
+def _columns(cur, table):
+    return {row[1]: row for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_column(cur, table, column, decl):
+    if column not in _columns(cur, table):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _m001_table_columns(cur):
+    """Columns the code already uses (tables.table_number/status, products.cost, ...)."""
+    cols = _columns(cur, "tables")
+    name_not_null = "name" in cols and cols["name"][3]
+
+    if name_not_null or "table_number" not in cols:
+        # rebuild: old schema had name NOT NULL, which TableController.generate_tables can't satisfy
+        number_expr = "COALESCE(table_number, id)" if "table_number" in cols else "id"
+        status_expr = "COALESCE(status, 'Free')" if "status" in cols else "'Free'"
+        area_expr = "area" if "area" in cols else "NULL"
+        name_expr = "name" if "name" in cols else "NULL"
+        cur.execute("""
+            CREATE TABLE tables_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_number INTEGER UNIQUE,
+                name TEXT,
+                area TEXT,
+                status TEXT DEFAULT 'Free'
+            )
+        """)
+        cur.execute(f"""
+            INSERT INTO tables_new (id, table_number, name, area, status)
+            SELECT id, {number_expr}, {name_expr}, {area_expr}, {status_expr} FROM tables
+        """)
+        cur.execute("DROP TABLE tables")
+        cur.execute("ALTER TABLE tables_new RENAME TO tables")
+    else:
+        _add_column(cur, "tables", "name", "TEXT")
+        _add_column(cur, "tables", "area", "TEXT")
+        _add_column(cur, "tables", "status", "TEXT DEFAULT 'Free'")
+
+    _add_column(cur, "products", "cost", "REAL DEFAULT 0.0")
+    _add_column(cur, "settings", "inventory_enabled", "INTEGER DEFAULT 0")
+
+
+def _m002_hot_path_indexes(cur):
+    """Indexes for the POS / admin / report queries."""
+    # pending order lookup per table
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_table_status ON orders(table_id, status)")
+    # order history / date filters, newest first
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at, id)")
+    # covering: order details, receipts and report joins read only these columns
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_order_items_order
+        ON order_items(order_id, product_id, quantity, price)
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ingredients_product ON ingredients(product_id)")
+    cur.execute("ANALYZE")
+
+
+def _m003_sales_rollup(cur):
+    """Daily / hourly sales rollup tables, filled from existing history."""
+    from models.rollup import SalesRollup
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            day TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            category_id INTEGER,
+            quantity INTEGER DEFAULT 0,
+            revenue REAL DEFAULT 0,
+            cost REAL DEFAULT 0,
+            lines INTEGER DEFAULT 0,
+            PRIMARY KEY (day, product_id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_hourly (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            category_id INTEGER,
+            quantity INTEGER DEFAULT 0,
+            revenue REAL DEFAULT 0,
+            cost REAL DEFAULT 0,
+            lines INTEGER DEFAULT 0,
+            PRIMARY KEY (day, hour, product_id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_daily_totals (
+            day TEXT PRIMARY KEY,
+            orders INTEGER DEFAULT 0,
+            order_total REAL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sales_daily_category ON sales_daily(category_id, day)")
+    SalesRollup.rebuild_with(cur)
+
+
+def _m004_print_jobs(cur):
+    """Persistent print spool (see controllers/print_spooler.py)."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS print_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target TEXT NOT NULL,
+            kind TEXT NOT NULL DEFAULT 'receipt',
+            order_id INTEGER,
+            title TEXT,
+            payload BLOB NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 5,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_print_jobs_target_status ON print_jobs(target, status, next_attempt_at, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_print_jobs_status ON print_jobs(status, id)")
+
+
+def _m005_printer_categories(cur):
+    """Normalized printer <-> category mapping, filled from printers.assigned_categories."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS printer_categories (
+            printer_id INTEGER NOT NULL REFERENCES printers(id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+            PRIMARY KEY (printer_id, category_id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_printer_categories_category ON printer_categories(category_id)")
+
+    categories = {row[1].strip(): row[0] for row in cur.execute("SELECT id, name FROM categories").fetchall() if row[1]}
+    rows = []
+    for printer_id, assigned in cur.execute("SELECT id, assigned_categories FROM printers").fetchall():
+        for name in (assigned or "").split(","):
+            category_id = categories.get(name.strip())
+            if category_id is not None:
+                rows.append((printer_id, category_id))
+    cur.executemany("INSERT OR IGNORE INTO printer_categories (printer_id, category_id) VALUES (?, ?)", rows)
+
+
+def _m006_order_items_printed(cur):
+    """order_items.printed_qty: how much of each line the kitchen already got (see kitchen_dispatch)."""
+    _add_column(cur, "order_items", "printed_qty", "INTEGER NOT NULL DEFAULT 0")
+    # existing orders were printed in full when they were executed
+    cur.execute("UPDATE order_items SET printed_qty = quantity")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_order_items_unprinted
+        ON order_items(order_id) WHERE quantity != printed_qty
+    """)
+
+
+def _m007_order_archive_months(cur):
+    """Registry of the per-month order archive files (see order_archive)."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS order_archive_months (
+            month TEXT PRIMARY KEY,
+            orders INTEGER NOT NULL DEFAULT 0,
+            items INTEGER NOT NULL DEFAULT 0,
+            first_id INTEGER,
+            last_id INTEGER,
+            archived_at TEXT
+        )
+    """)
+
+
+def _m008_settings_maintenance(cur):
+    """Backup / archive / print job / profiler settings on the settings row (see models.settings)."""
+    _add_column(cur, "settings", "backup_dir", "TEXT")
+    _add_column(cur, "settings", "backup_interval_hours", "REAL DEFAULT 24")
+    _add_column(cur, "settings", "backup_keep", "INTEGER DEFAULT 7")
+    _add_column(cur, "settings", "archive_dir", "TEXT")
+    _add_column(cur, "settings", "archive_horizon_days", "INTEGER DEFAULT 365")
+    _add_column(cur, "settings", "print_jobs_retention_days", "REAL DEFAULT 7")
+    _add_column(cur, "settings", "print_jobs_dead_retention_days", "REAL DEFAULT 30")
+    _add_column(cur, "settings", "profiler_enabled", "INTEGER DEFAULT 0")
+    _add_column(cur, "settings", "profiler_slow_ms", "REAL DEFAULT 50")
+    _add_column(cur, "settings", "profiler_n_plus_one", "INTEGER DEFAULT 10")
+    _add_column(cur, "settings", "profiler_window_s", "REAL DEFAULT 1")
+    _add_column(cur, "settings", "profiler_dump", "TEXT")
+
+
+def _m009_printer_cashier_flag(cur):
+    """printers.is_cashier, from the 'cashier' entry of assigned_categories (see models.printer)."""
+    _add_column(cur, "printers", "is_cashier", "INTEGER NOT NULL DEFAULT 0")
+    cashiers = [(printer_id,) for printer_id, assigned in
+                cur.execute("SELECT id, assigned_categories FROM printers").fetchall()
+                if "cashier" in (name.strip().lower() for name in (assigned or "").split(","))]
+    cur.executemany("UPDATE printers SET is_cashier = 1 WHERE id = ?", cashiers)
+
+
+MIGRATIONS = [
+    (1, "tables.table_number/status and legacy columns", _m001_table_columns),
+    (2, "hot path indexes", _m002_hot_path_indexes),
+    (3, "sales rollup tables", _m003_sales_rollup),
+    (4, "print job spool", _m004_print_jobs),
+    (5, "printer_categories mapping", _m005_printer_categories),
+    (6, "order_items.printed_qty", _m006_order_items_printed),
+    (7, "order archive registry", _m007_order_archive_months),
+    (8, "maintenance settings columns", _m008_settings_maintenance),
+    (9, "cashier printer flag", _m009_printer_cashier_flag),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration in order. Returns the resulting version."""
+    version = schema_version(conn)
+    for target, description, step in MIGRATIONS:
+        if target <= version:
+            continue
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            step(cur)
+            cur.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Migration {target} ({description}) failed: {e}") from e
+        version = target
+    return version
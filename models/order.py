@@ -1,6 +1,294 @@
 # models/order.py
-from models.database import get_connection
-from datetime import datetime
+import heapq
+
+from models.database import get_connection, iter_chunks
+from models.order_archive import OrderArchive
+from models.rollup import SalesRollup
+from datetime import datetime, date, timedelta
+
+
+def _day_after(day):
+    """'YYYY-MM-DD' -> next day, so an end date includes the whole day."""
+    return (date.fromisoformat(str(day)[:10]) + timedelta(days=1)).isoformat()
+
+
+def _newest_first(row):
+    return row["created_at"] or "", row["id"]
+
+
+class OrderQuery:
+    """
+    Composable order filter compiled to one parameterized SELECT.
+    Every setter returns the query, so filters chain:
+        OrderQuery().between("2024-01-01", "2024-01-31").payment_type("cash").page()
+    Empty / "All" values are ignored.
+
+    Archived months (see order_archive) are read only when the query asks for
+    them: a date range reaching into them, or an order number that was archived.
+    Without a start date a query covers the orders still in the main database.
+    """
+
+    COLUMNS = """
+        o.id,
+        t.table_number AS table_name,
+        u.username AS user_name,
+        o.total,
+        o.payment_type,
+        o.status,
+        o.created_at
+    """
+    JOINS = """
+        LEFT JOIN tables t ON o.table_id = t.id
+        LEFT JOIN users u ON o.user_id = u.id
+    """
+
+    def __init__(self):
+        self._clauses = []
+        self._params = []
+        self._start = self._end = self._order_id = None
+
+    def _where(self, clause, *params):
+        self._clauses.append(clause)
+        self._params.extend(params)
+        return self
+
+    # --- filters ---
+    def between(self, start_date=None, end_date=None):
+        """Orders created on start_date .. end_date inclusive (YYYY-MM-DD)."""
+        if start_date:
+            self._start = str(start_date)[:10]
+            self._where("o.created_at >= ?", self._start)
+        if end_date:
+            self._end = str(end_date)[:10]
+            self._where("o.created_at < ?", _day_after(end_date))
+        return self
+
+    def payment_type(self, payment_type):
+        if payment_type and payment_type != "All":
+            self._where("o.payment_type = ? COLLATE NOCASE", payment_type)
+        return self
+
+    def status(self, status):
+        if status and status != "All":
+            self._where("o.status = ? COLLATE NOCASE", status)
+        return self
+
+    def user(self, user_id):
+        if user_id is not None:
+            self._where("o.user_id = ?", user_id)
+        return self
+
+    def table(self, table_id):
+        if table_id is not None:
+            self._where("o.table_id = ?", table_id)
+        return self
+
+    def total_between(self, min_total=None, max_total=None):
+        if min_total is not None:
+            self._where("o.total >= ?", min_total)
+        if max_total is not None:
+            self._where("o.total <= ?", max_total)
+        return self
+
+    def search(self, text):
+        """Order number search: '123' or '#123'."""
+        text = (text or "").strip().lstrip("#")
+        if not text:
+            return self
+        if not text.isdigit():
+            return self._where("0")
+        self._order_id = int(text)
+        return self._where("o.id = ?", self._order_id)
+
+    @classmethod
+    def from_filters(cls, filters):
+        """Build from FilterDialog.get_filters()."""
+        filters = filters or {}
+        return (cls()
+                .between(filters.get("start"), filters.get("end"))
+                .payment_type(filters.get("payment_type"))
+                .status(filters.get("status"))
+                .user(filters.get("user_id"))
+                .table(filters.get("table_id"))
+                .total_between(filters.get("min_total"), filters.get("max_total"))
+                .search(filters.get("search")))
+
+    # --- compilation ---
+    def compile(self, extra=(), extra_params=()):
+        clauses = self._clauses + list(extra)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, self._params + list(extra_params)
+
+    def _select(self, after=None, limit=None, totals=False, source="orders"):
+        extra, extra_params = [], []
+        if after:
+            extra.append("(o.created_at, o.id) < (?, ?)")
+            extra_params.extend(after)
+        where, params = self.compile(extra, extra_params)
+
+        if totals:
+            # count / sum over every match in the same statement as the page; a plain
+            # aggregate CTE is an index scan, unlike COUNT(*) OVER () which sorts all matches
+            match_where, match_params = self.compile()
+            query = (f"WITH m AS (SELECT COUNT(*) AS match_count, COALESCE(SUM(o.total), 0) AS match_total"
+                     f" FROM {source} o{match_where})"
+                     f" SELECT {self.COLUMNS}, m.match_count, m.match_total"
+                     f" FROM {source} o CROSS JOIN m {self.JOINS}{where}")
+            params = match_params + params
+        else:
+            query = f"SELECT {self.COLUMNS} FROM {source} o {self.JOINS}{where}"
+        query += " ORDER BY o.created_at DESC, o.id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+
+    def _select_lines(self, orders="orders", items="order_items"):
+        where, params = self.compile()
+        query = f"""
+            SELECT {self.COLUMNS}, p.name AS product_name, oi.quantity, oi.price,
+                   oi.quantity * oi.price AS line_total
+            FROM {orders} o
+            JOIN {items} oi ON oi.order_id = o.id
+            LEFT JOIN products p ON p.id = oi.product_id
+            {self.JOINS}{where}
+            ORDER BY o.created_at DESC, o.id DESC, oi.id
+        """
+        return query, params
+
+    # --- archives ---
+    def archived_months(self):
+        """Archived months this query has to read ([] when the main database covers it)."""
+        if self._order_id is not None:
+            return OrderArchive.months(order_id=self._order_id)
+        if not self._start:
+            return []
+        return OrderArchive.months(self._start, self._end)
+
+    def _results(self, build):
+        """
+        Run build(orders_source, items_source) -> (query, params) on the main database or,
+        when archived months are needed, once per group of attached months (the first
+        group also reads main). Returns one list of dicts per group.
+        """
+        groups = OrderArchive.groups(self.archived_months())
+        if not groups:
+            return [self._fetch(*build("orders", "order_items"))]
+        results = []
+        for index, months in enumerate(groups):
+            with OrderArchive.reader(months) as (conn, aliases):
+                if index and not aliases:
+                    continue
+                query, params = build(OrderArchive.union("orders", aliases, index == 0),
+                                      OrderArchive.union("order_items", aliases, index == 0))
+                results.append([dict(row) for row in conn.execute(query, params).fetchall()])
+        return results
+
+    def _stream(self, build, size):
+        """Rows of build(...) one by one, newest first, merged across the archive groups."""
+        groups = OrderArchive.groups(self.archived_months())
+        if not groups:
+            for rows in iter_chunks(*build("orders", "order_items"), size):
+                yield from (dict(row) for row in rows)
+            return
+
+        def group_rows(index, months):
+            with OrderArchive.reader(months) as (conn, aliases):
+                if index and not aliases:
+                    return
+                cur = conn.execute(*build(OrderArchive.union("orders", aliases, index == 0),
+                                          OrderArchive.union("order_items", aliases, index == 0)))
+                while True:
+                    rows = cur.fetchmany(size)
+                    if not rows:
+                        break
+                    yield from (dict(row) for row in rows)
+
+        streams = [group_rows(index, months) for index, months in enumerate(groups)]
+        try:
+            # each group is sorted the same way; an order's lines all come from one group
+            yield from heapq.merge(*streams, key=_newest_first, reverse=True)
+        finally:
+            for stream in streams:
+                stream.close()
+
+    @staticmethod
+    def _chunked(rows, size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # --- execution ---
+    def _fetch(self, query, params):
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    def page(self, after=None, limit=200):
+        """
+        One page of matching orders (dicts), newest first.
+        after: (created_at, id) of the last row of the previous page (keyset cursor).
+        The first page also carries match_count / match_total for the whole result.
+        """
+        totals = after is None
+        results = self._results(lambda orders, items: self._select(after, limit, totals, orders))
+        if len(results) == 1:
+            return results[0]
+        rows = sorted((row for part in results for row in part), key=_newest_first, reverse=True)
+        rows = rows[:limit] if limit else rows
+        if totals:
+            count = sum(part[0]["match_count"] for part in results if part)
+            total = sum(part[0]["match_total"] for part in results if part)
+            for row in rows:
+                row["match_count"], row["match_total"] = count, total
+        return rows
+
+    def fetch(self, limit=None):
+        """(rows, count, total) in one query; count/total cover every match even with a limit."""
+        rows = self.page(None, limit)
+        if not rows:
+            return [], 0, 0.0
+        count, total = rows[0]["match_count"], rows[0]["match_total"]
+        for row in rows:
+            del row["match_count"], row["match_total"]
+        return rows, count, total
+
+    def all(self):
+        results = self._results(lambda orders, items: self._select(source=orders))
+        if len(results) == 1:
+            return results[0]
+        return sorted((row for part in results for row in part), key=_newest_first, reverse=True)
+
+    def summary(self):
+        """{'count', 'total'} for the matching orders."""
+        where, params = self.compile()
+        results = self._results(lambda orders, items: (
+            f"SELECT COUNT(*) AS count, COALESCE(SUM(o.total), 0) AS total FROM {orders} o{where}", params))
+        return {"count": sum(part[0]["count"] for part in results),
+                "total": sum(part[0]["total"] for part in results)}
+
+    def chunks(self, size=500):
+        """Matching orders in lists of up to size dicts (exports)."""
+        yield from self._chunked(self._stream(lambda orders, items: self._select(source=orders), size), size)
+
+    def line_count(self):
+        where, params = self.compile()
+        results = self._results(lambda orders, items: (
+            f"SELECT COUNT(*) AS count FROM {orders} o JOIN {items} oi ON oi.order_id = o.id{where}", params))
+        return sum(part[0]["count"] for part in results)
+
+    def line_chunks(self, size=500):
+        """Order lines of the matching orders (order columns + product, quantity, price, line_total), same order."""
+        yield from self._chunked(self._stream(self._select_lines, size), size)
+
 
 class Order:
     @staticmethod
@@ -9,10 +297,12 @@ class Order:
         conn = get_connection()
         cur = conn.cursor()
 
+        created_at = datetime.now().isoformat()
         cur.execute("""
             INSERT INTO orders (table_id, user_id, total, payment_type, status, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (table_id, user_id, total, payment_type, status, datetime.now().isoformat()))
+        """, (table_id, user_id, total, payment_type, status, created_at))
+        SalesRollup.record_order(cur, created_at, total)
 
         conn.commit()
         order_id = cur.lastrowid
@@ -20,97 +310,138 @@ class Order:
         return order_id  # ✅ return the order ID to use in controller
 
     @staticmethod
-    def all():
-        """Return all orders with table and user info."""
+    def close(order_id, status="paid"):
+        """Settle a pending order (receipt printed). Returns False if it was not pending."""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("UPDATE orders SET status = ? WHERE id = ? AND status = 'pending'", (status, order_id))
+        closed = cur.rowcount > 0
+        conn.commit()
+        conn.close()
+        return closed
+
+    @staticmethod
+    def sync_items(cur, order, lines):
+        """
+        Make an existing order's lines match lines ({product_id, quantity, price}) using the
+        caller's cursor / transaction, keeping printed_qty. A removed line the kitchen already
+        printed stays with quantity 0 until its cancellation is printed.
+        Returns the rollup changes as (product_id, quantity, price, line_delta).
+        """
+        wanted = {}
+        for line in lines:
+            if line["product_id"] in wanted:
+                wanted[line["product_id"]]["quantity"] += line["quantity"]
+            else:
+                wanted[line["product_id"]] = dict(line)
+
+        cur.execute("SELECT id, product_id, quantity, price, printed_qty FROM order_items WHERE order_id = ?",
+                    (order["id"],))
+        changes = []
+        for row in cur.fetchall():
+            line = wanted.pop(row["product_id"], None)
+            if line and (line["quantity"], line["price"]) == (row["quantity"], row["price"]):
+                continue  # unchanged
+            if row["quantity"]:
+                changes.append((row["product_id"], -row["quantity"], row["price"], -1))
+            if line:
+                cur.execute("UPDATE order_items SET quantity = ?, price = ? WHERE id = ?",
+                            (line["quantity"], line["price"], row["id"]))
+                changes.append((line["product_id"], line["quantity"], line["price"], 1))
+            elif row["printed_qty"]:
+                cur.execute("UPDATE order_items SET quantity = 0 WHERE id = ?", (row["id"],))
+            else:
+                cur.execute("DELETE FROM order_items WHERE id = ?", (row["id"],))
+
+        cur.executemany("""
+            INSERT INTO order_items (order_id, product_id, quantity, price)
+            VALUES (?, ?, ?, ?)
+        """, [(order["id"], l["product_id"], l["quantity"], l["price"]) for l in wanted.values()])
+        changes.extend((l["product_id"], l["quantity"], l["price"], 1) for l in wanted.values())
+        return changes
+
+    @staticmethod
+    def claim_kitchen_deltas(order_id):
+        """
+        Lines of the order the kitchen has not seen yet, as {product_id, quantity}
+        (quantity < 0: cancelled), and mark them printed. Fully cancelled lines are dropped.
+        """
         conn = get_connection()
-        conn.row_factory = lambda cursor, row: {
-            "id": row[0],
-            "table_name": row[1],
-            "user_name": row[2],
-            "total": row[3],
-            "payment_type": row[4],
-            "status": row[5],
-            "created_at": row[6],
-        }
         cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            deltas = Order.claim_kitchen_deltas_with(cur, order_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return deltas
 
+    @staticmethod
+    def claim_kitchen_deltas_with(cur, order_id):
+        """claim_kitchen_deltas() inside the caller's transaction, so the tickets can commit with it."""
         cur.execute("""
-            SELECT o.id, 
-                   t.table_number AS table_name, 
-                   u.username AS user_name,
-                   o.total, 
-                   o.payment_type, 
-                   o.status, 
-                   o.created_at
-            FROM orders o
-            LEFT JOIN tables t ON o.table_id = t.id
-            LEFT JOIN users u ON o.user_id = u.id
-            ORDER BY o.created_at DESC
-        """)
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+            SELECT product_id, quantity - printed_qty AS quantity
+            FROM order_items
+            WHERE order_id = ? AND quantity != printed_qty
+            ORDER BY id
+        """, (order_id,))
+        deltas = [dict(row) for row in cur.fetchall()]
+        if deltas:
+            cur.execute("UPDATE order_items SET printed_qty = quantity WHERE order_id = ? AND quantity != printed_qty",
+                        (order_id,))
+            cur.execute("DELETE FROM order_items WHERE order_id = ? AND quantity = 0", (order_id,))
+        return deltas
 
     @staticmethod
-    def filter(start_date=None, end_date=None, payment_type=None):
-        """Return filtered orders by date range and payment type."""
+    def has_kitchen_deltas(order_id):
+        """Whether the order has lines the kitchen has not seen yet."""
         conn = get_connection()
-        conn.row_factory = lambda cursor, row: {
-            "id": row[0],
-            "table_name": row[1],
-            "user_name": row[2],
-            "total": row[3],
-            "payment_type": row[4],
-            "created_at": row[5],
-        }
         cur = conn.cursor()
+        cur.execute("SELECT 1 FROM order_items WHERE order_id = ? AND quantity != printed_qty LIMIT 1", (order_id,))
+        found = cur.fetchone() is not None
+        conn.close()
+        return found
 
-        query = """
-            SELECT o.id, t.table_number AS table_name, u.username AS user_name,
-                   o.total, o.payment_type, o.created_at
-            FROM orders o
-            LEFT JOIN tables t ON o.table_id = t.id
-            LEFT JOIN users u ON o.user_id = u.id
-            WHERE 1=1
-        """
-        params = []
+    @staticmethod
+    def all():
+        """Return all orders with table and user info."""
+        return OrderQuery().all()
 
-        if start_date:
-            query += " AND o.created_at >= ?"
-            params.append(start_date)
-        if end_date:
-            query += " AND o.created_at <= ?"
-            params.append(end_date)
-        if payment_type:
-            query += " AND o.payment_type = ?"
-            params.append(payment_type)
+    @staticmethod
+    def page(after=None, limit=200):
+        """
+        One page of orders (as dicts), newest first.
+        after: (created_at, id) of the last row of the previous page; keyset
+        pagination on idx_orders_created_at, so every page costs the same.
+        """
+        return OrderQuery().page(after, limit)
 
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+    @staticmethod
+    def filter(start_date=None, end_date=None, payment_type=None):
+        """Return filtered orders by date range and payment type."""
+        return OrderQuery().between(start_date, end_date).payment_type(payment_type).all()
 
     @staticmethod
-    def stats():
-        """Return daily revenue for the last 7 days."""
+    def filter_options():
+        """Values for the filter dialog: statuses, payment types, users and tables."""
         conn = get_connection()
-        conn.row_factory = lambda cursor, row: {
-            "day": row[0],
-            "daily_revenue": row[1],
-        }
         cur = conn.cursor()
-        cur.execute("""
-            SELECT 
-                strftime('%Y-%m-%d', created_at) AS day,
-                SUM(total) AS daily_revenue
-            FROM orders
-            GROUP BY day
-            ORDER BY day DESC
-            LIMIT 7
-        """)
-        rows = cur.fetchall()
+        statuses = [r[0] for r in cur.execute(
+            "SELECT DISTINCT status FROM orders WHERE status IS NOT NULL ORDER BY status").fetchall()]
+        payment_types = [r[0] for r in cur.execute(
+            "SELECT DISTINCT payment_type FROM orders WHERE payment_type IS NOT NULL ORDER BY payment_type").fetchall()]
+        users = [dict(r) for r in cur.execute("SELECT id, username FROM users ORDER BY username").fetchall()]
+        tables = [dict(r) for r in cur.execute("SELECT id, table_number FROM tables ORDER BY table_number").fetchall()]
         conn.close()
-        return rows
+        return {"statuses": statuses, "payment_types": payment_types, "users": users, "tables": tables}
+
+    @staticmethod
+    def stats():
+        """Return daily revenue for the last 7 days (from the sales rollup)."""
+        return SalesRollup.recent_days(7)
 
     @staticmethod
     def get(order_id):
@@ -132,4 +463,6 @@ class Order:
         """, (order_id,))
         order = cur.fetchone()
         conn.close()
+        if order is None:
+            order = OrderArchive.find_order(order_id)[0]
         return order
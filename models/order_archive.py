@@ -0,0 +1,257 @@
+# models/order_archive.py
+"""
+Per-month archive of old orders.
+
+archive() moves closed orders of whole months older than the retention
+horizon, with their lines, from the main database into
+archive/orders-YYYY-MM.db (ATTACHed for the move) and records the month in
+order_archive_months. The sales rollups stay in the main database, so reports
+keep covering archived months without opening them.
+
+An order is closed once it is no longer 'pending' (the POS marks it paid when
+the receipt is printed) or, for orders from before that, once a later order
+was taken at the same table: a table only moves on after it was settled.
+
+Reads that reach into archived months (OrderQuery with an old date range or an
+order number search, order details) use reader(): a separate connection with
+those months ATTACHed and the orders / order_items of main and the archives
+exposed as one UNION ALL. SQLite attaches at most 10 databases per connection,
+so months are handed out in groups of MAX_ATTACHED; callers merge the groups.
+
+Configured on the settings row: archive_dir (default: archive/ next to the
+database) and archive_horizon_days (365, 0 disables archiving).
+"""
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from models.database import get_connection, database_path, dedicated_connection
+from models.settings import Settings
+
+ORDER_COLUMNS = ("id", "table_id", "user_id", "total", "payment_type", "status", "created_at")
+ITEM_COLUMNS = ("id", "order_id", "product_id", "quantity", "price", "printed_qty")
+MAX_ATTACHED = 8
+DEFAULTS = {"dir": None, "horizon_days": 365}
+# closed orders, for a query on main.orders aliased o
+CLOSED = """(
+    COALESCE(o.status, '') != 'pending' COLLATE NOCASE
+    OR EXISTS (SELECT 1 FROM main.orders later WHERE later.table_id = o.table_id AND later.id > o.id)
+)"""
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {db}.orders (
+        id INTEGER PRIMARY KEY,
+        table_id INTEGER,
+        user_id INTEGER,
+        total REAL,
+        payment_type TEXT,
+        status TEXT,
+        created_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS {db}.idx_orders_created_at ON orders(created_at, id);
+    CREATE TABLE IF NOT EXISTS {db}.order_items (
+        id INTEGER PRIMARY KEY,
+        order_id INTEGER,
+        product_id INTEGER,
+        quantity INTEGER,
+        price REAL,
+        printed_qty INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS {db}.idx_order_items_order ON order_items(order_id, product_id, quantity, price);
+"""
+
+
+def _month_start(month):
+    return f"{month}-01"
+
+
+def _next_month(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}-01"
+
+
+def _alias(month):
+    return "arch_" + month.replace("-", "_")
+
+
+class OrderArchive:
+    # --- settings / files ---
+    @staticmethod
+    def settings():
+        settings = Settings.section("archive", DEFAULTS)
+        settings["dir"] = Path(settings["dir"] or database_path().parent / "archive")
+        return settings
+
+    @staticmethod
+    def path(month, directory=None):
+        return Path(directory or OrderArchive.settings()["dir"]) / f"orders-{month}.db"
+
+    @staticmethod
+    def cutoff(horizon_days=None, today=None):
+        """First day of the oldest month that is kept in the main database."""
+        if horizon_days is None:
+            horizon_days = OrderArchive.settings()["horizon_days"]
+        limit = (today or date.today()) - timedelta(days=int(horizon_days))
+        return limit.replace(day=1).isoformat()
+
+    # --- registry ---
+    @staticmethod
+    def months(start=None, end=None, order_id=None):
+        """Archived months (newest first) overlapping start .. end (YYYY-MM-DD), or holding order_id."""
+        clauses, params = [], []
+        if start:
+            clauses.append("month >= ?")
+            params.append(str(start)[:7])
+        if end:
+            clauses.append("month <= ?")
+            params.append(str(end)[:7])
+        if order_id is not None:
+            clauses.append("? BETWEEN first_id AND last_id")
+            params.append(order_id)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        conn = get_connection()
+        try:
+            rows = conn.execute(f"SELECT month FROM order_archive_months{where} ORDER BY month DESC",
+                                params).fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # not migrated yet
+        conn.close()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def boundary():
+        """First day after the newest archived month ('' if nothing is archived)."""
+        months = OrderArchive.months()
+        return _next_month(months[0]) if months else ""
+
+    @staticmethod
+    def groups(months):
+        return [months[i:i + MAX_ATTACHED] for i in range(0, len(months), MAX_ATTACHED)]
+
+    # --- reading ---
+    @staticmethod
+    def union(table, aliases, include_main=True):
+        """SQL source for `table` across main (optional) and the attached archives."""
+        columns = ", ".join(ORDER_COLUMNS if table == "orders" else ITEM_COLUMNS)
+        parts = [f"SELECT {columns} FROM main.{table}"] if include_main else []
+        parts += [f"SELECT {columns} FROM {alias}.{table}" for alias in aliases]
+        return "(" + " UNION ALL ".join(parts) + ")"
+
+    @staticmethod
+    @contextmanager
+    def reader(months):
+        """A read connection to the main database with months (<= MAX_ATTACHED) attached; yields (conn, aliases)."""
+        directory = OrderArchive.settings()["dir"]
+        aliases = []
+        # not a pooled connection (ATTACH is per connection), but drain_pool() waits for it
+        with dedicated_connection() as conn:
+            for month in months:
+                path = OrderArchive.path(month, directory)
+                if not path.exists():
+                    print(f"⚠️ Order archive {path} is missing")
+                    continue
+                conn.execute(f"ATTACH DATABASE ? AS {_alias(month)}", (str(path),))
+                aliases.append(_alias(month))
+            yield conn, aliases
+
+    @staticmethod
+    def find_order(order_id):
+        """(order dict, item rows) of an archived order, or (None, [])."""
+        for month in OrderArchive.months(order_id=order_id):
+            with OrderArchive.reader([month]) as (conn, aliases):
+                if not aliases:
+                    continue
+                order = conn.execute(f"SELECT * FROM {aliases[0]}.orders WHERE id = ?", (order_id,)).fetchone()
+                if order:
+                    items = conn.execute(f"""
+                        SELECT oi.quantity, p.name AS product_name, oi.price
+                        FROM {aliases[0]}.order_items oi
+                        LEFT JOIN main.products p ON p.id = oi.product_id
+                        WHERE oi.order_id = ?
+                    """, (order_id,)).fetchall()
+                    return dict(order), [dict(row) for row in items]
+        return None, []
+
+    # --- archiving ---
+    @staticmethod
+    def archive(horizon_days=None, today=None, progress=None):
+        """
+        Move the closed orders of every month before cutoff(horizon_days) into their
+        month's archive file. One transaction per month; a month that was interrupted
+        is completed by the next run (rows already archived are skipped, not duplicated).
+        Returns {month: orders moved}.
+        """
+        settings = OrderArchive.settings()
+        horizon = settings["horizon_days"] if horizon_days is None else horizon_days
+        if not horizon or int(horizon) <= 0:
+            return {}
+        cutoff = OrderArchive.cutoff(horizon, today)
+        directory = settings["dir"]
+        directory.mkdir(parents=True, exist_ok=True)
+
+        conn = get_connection()
+        try:
+            months = [row[0] for row in conn.execute(f"""
+                SELECT DISTINCT substr(o.created_at, 1, 7) FROM main.orders o
+                WHERE o.created_at < ? AND {CLOSED}
+                ORDER BY 1
+            """, (cutoff,)).fetchall()]
+            moved = {}
+            for index, month in enumerate(months):
+                moved[month] = OrderArchive._archive_month(conn, month, cutoff, OrderArchive.path(month, directory))
+                if progress:
+                    progress(index + 1, len(months))
+            return moved
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _archive_month(conn, month, cutoff, path):
+        columns = ", ".join(ORDER_COLUMNS)
+        item_columns = ", ".join(ITEM_COLUMNS)
+        conn.execute("ATTACH DATABASE ? AS arch", (str(path),))  # not allowed inside a transaction
+        try:
+            conn.executescript(SCHEMA.format(db="arch"))
+            cur = conn.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS archiving (id INTEGER PRIMARY KEY)")
+                cur.execute("DELETE FROM temp.archiving")
+                cur.execute(f"""
+                    INSERT INTO temp.archiving (id)
+                    SELECT o.id FROM main.orders o
+                    WHERE o.created_at >= ? AND o.created_at < ? AND o.created_at < ?
+                      AND {CLOSED}
+                """, (_month_start(month), _next_month(month), cutoff))
+                cur.execute(f"""
+                    INSERT OR IGNORE INTO arch.orders ({columns})
+                    SELECT {columns} FROM main.orders WHERE id IN (SELECT id FROM temp.archiving)
+                """)
+                cur.execute(f"""
+                    INSERT OR IGNORE INTO arch.order_items ({item_columns})
+                    SELECT {item_columns} FROM main.order_items WHERE order_id IN (SELECT id FROM temp.archiving)
+                """)
+                items = cur.rowcount
+                cur.execute("DELETE FROM main.order_items WHERE order_id IN (SELECT id FROM temp.archiving)")
+                cur.execute("DELETE FROM main.orders WHERE id IN (SELECT id FROM temp.archiving)")
+                count = cur.rowcount
+                cur.execute("""
+                    INSERT INTO order_archive_months (month, orders, items, first_id, last_id, archived_at)
+                    SELECT ?, COUNT(*), ?, MIN(id), MAX(id), ? FROM temp.archiving
+                    WHERE 1
+                    ON CONFLICT(month) DO UPDATE SET
+                        orders = orders + excluded.orders,
+                        items = items + excluded.items,
+                        first_id = MIN(COALESCE(first_id, excluded.first_id), COALESCE(excluded.first_id, first_id)),
+                        last_id = MAX(COALESCE(last_id, excluded.last_id), COALESCE(excluded.last_id, last_id)),
+                        archived_at = excluded.archived_at
+                """, (month, items, datetime.now().isoformat(timespec="seconds")))
+                cur.execute("DELETE FROM temp.archiving")
+                conn.commit()
+                return count
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE arch")
@@ -0,0 +1,176 @@
+# models/print_job.py
+import time
+from datetime import datetime
+
+from models.database import get_connection
+
+# job states: queued -> printing -> done
+#                       printing -> queued (retry, after next_attempt_at)
+#                       printing -> dead   (max_attempts reached; kept for inspection / requeue)
+QUEUED, PRINTING, DONE, DEAD = "queued", "printing", "done", "dead"
+
+
+class PrintJob:
+    @staticmethod
+    def enqueue(target, payload, kind="receipt", order_id=None, title=None, max_attempts=5):
+        """Store a job and return its id. payload is the bytes to send."""
+        conn = get_connection()
+        cur = conn.cursor()
+        job_id = PrintJob.enqueue_with(cur, target, payload, kind, order_id, title, max_attempts)
+        conn.commit()
+        conn.close()
+        return job_id
+
+    @staticmethod
+    def enqueue_with(cur, target, payload, kind="receipt", order_id=None, title=None, max_attempts=5):
+        """enqueue() on the caller's cursor, inside its transaction (not committed)."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        now = datetime.now().isoformat()
+        cur.execute("""
+            INSERT INTO print_jobs (target, kind, order_id, title, payload, status, max_attempts,
+                                    next_attempt_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+        """, (target, kind, order_id, title, payload, QUEUED, max_attempts, now, now))
+        return cur.lastrowid
+
+    @staticmethod
+    def get(job_id):
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM print_jobs WHERE id = ?", (job_id,))
+        row = cur.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    @staticmethod
+    def claim_next(target, limit=1):
+        """
+        Mark the oldest ready jobs (up to limit) for target as printing.
+        Returns (jobs, wait): jobs is empty when nothing is ready, and wait is then the
+        seconds until the next backed-off job is due (None if the queue is empty).
+        """
+        now = time.time()
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("""
+                SELECT * FROM print_jobs
+                WHERE target = ? AND status = ? AND next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+            """, (target, QUEUED, now, limit))
+            rows = cur.fetchall()
+            if not rows:
+                cur.execute("""
+                    SELECT MIN(next_attempt_at) FROM print_jobs WHERE target = ? AND status = ?
+                """, (target, QUEUED))
+                due = cur.fetchone()[0]
+                conn.commit()
+                return [], (max(0.0, due - now) if due is not None else None)
+
+            updated_at = datetime.now().isoformat()
+            cur.executemany("UPDATE print_jobs SET status = ?, updated_at = ? WHERE id = ?",
+                            [(PRINTING, updated_at, row["id"]) for row in rows])
+            conn.commit()
+            jobs = [dict(row, status=PRINTING) for row in rows]
+            return jobs, 0.0
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _set(job_id, **fields):
+        fields["updated_at"] = datetime.now().isoformat()
+        conn = get_connection()
+        cur = conn.cursor()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        cur.execute(f"UPDATE print_jobs SET {assignments} WHERE id = ?", list(fields.values()) + [job_id])
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def mark_done(job_id, attempts):
+        PrintJob._set(job_id, status=DONE, attempts=attempts, last_error=None)
+
+    @staticmethod
+    def mark_done_many(jobs):
+        """jobs: [(job_id, attempts)] sent together in one write."""
+        updated_at = datetime.now().isoformat()
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.executemany("UPDATE print_jobs SET status = ?, attempts = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                        [(DONE, attempts, updated_at, job_id) for job_id, attempts in jobs])
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def mark_retry(job_id, attempts, error, delay):
+        PrintJob._set(job_id, status=QUEUED, attempts=attempts, last_error=error,
+                      next_attempt_at=time.time() + delay)
+
+    @staticmethod
+    def mark_dead(job_id, attempts, error):
+        PrintJob._set(job_id, status=DEAD, attempts=attempts, last_error=error)
+
+    @staticmethod
+    def requeue(job_id):
+        """Give a dead job a fresh set of attempts."""
+        PrintJob._set(job_id, status=QUEUED, attempts=0, next_attempt_at=0)
+
+    @staticmethod
+    def count_pending(target):
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM print_jobs WHERE target = ? AND status IN (?, ?)",
+                    (target, QUEUED, PRINTING))
+        count = cur.fetchone()[0]
+        conn.close()
+        return count
+
+    @staticmethod
+    def recover():
+        """After a restart: jobs left 'printing' go back to the queue. Returns targets with pending jobs."""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("UPDATE print_jobs SET status = ? WHERE status = ?", (QUEUED, PRINTING))
+        cur.execute("SELECT DISTINCT target FROM print_jobs WHERE status = ?", (QUEUED,))
+        targets = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        conn.close()
+        return targets
+
+    @staticmethod
+    def recent(limit=100, status=None):
+        """Latest jobs (without payload), newest first."""
+        query = """
+            SELECT id, target, kind, order_id, title, status, attempts, max_attempts, last_error,
+                   created_at, updated_at
+            FROM print_jobs
+        """
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(query, params)
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    def purge(older_than_days=7, status=DONE):
+        """Delete jobs in status (done by default) last updated more than older_than_days ago."""
+        cutoff = datetime.fromtimestamp(time.time() - older_than_days * 86400).isoformat()
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("DELETE FROM print_jobs WHERE status = ? AND updated_at < ?", (status, cutoff))
+        deleted = cur.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
@@ -1,45 +1,111 @@
 # models/printer.py
+"""
+Printers and what they print. Kitchen routing is the printer_categories mapping;
+the receipt printer is the one flagged is_cashier. Both are typed as one comma
+separated list ("Burgers, Drinks, cashier"); assigned_categories is derived from
+them on read (the stored column is only what older versions wrote).
+"""
 from models.database import get_connection
+from models.catalog import catalog
+from models.printer_routing import printer_routing
+
+CASHIER = "cashier"  # typed with the categories, stored as printers.is_cashier
+
+
+def _category_names(categories):
+    """'a, b' or ['a', 'b'] -> ['a', 'b'] (trimmed, no duplicates, order kept)"""
+    if isinstance(categories, str):
+        categories = categories.split(",")
+    names = []
+    for name in categories or []:
+        name = (name or "").strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _split_cashier(names):
+    """['Burgers', 'cashier'] -> (['Burgers'], True)"""
+    categories = [name for name in names if name.lower() != CASHIER]
+    return categories, len(categories) != len(names)
+
+
+def _with_categories(cur, printers):
+    """Fill assigned_categories from printer_categories (category order) and the cashier flag."""
+    if not printers:
+        return printers
+    ids = [p["id"] for p in printers]
+    cur.execute(f"""
+        SELECT pc.printer_id, c.name
+        FROM printer_categories pc
+        JOIN categories c ON c.id = pc.category_id
+        WHERE pc.printer_id IN ({", ".join("?" * len(ids))})
+        ORDER BY c.id
+    """, ids)
+    names = {}
+    for printer_id, name in cur.fetchall():
+        names.setdefault(printer_id, []).append(name)
+    for printer in printers:
+        assigned = names.get(printer["id"], []) + ([CASHIER] if printer.get("is_cashier") else [])
+        printer["assigned_categories"] = ",".join(assigned)
+    return printers
+
+
+def _map_categories(cur, printer_id, names):
+    """Add printer_categories rows for the names that are real categories."""
+    ids = [c["id"] for c in (catalog.category_by_name(n) for n in names) if c]
+    cur.executemany("INSERT OR IGNORE INTO printer_categories (printer_id, category_id) VALUES (?, ?)",
+                    [(printer_id, cid) for cid in ids])
 
 
 class Printer:
     @staticmethod
-    def create(name, type, connection, ip_address=None, port=None, categories=None, status="offline"):
+    def create(name, connection_type=None, vendor_id=None, product_id=None, serial_number=None,
+               ip_address=None, port=None, assigned_categories=None, status="offline"):
+        """Insert a printer and its category mapping; returns the new id."""
         import time
         max_retries = 3
+        names, is_cashier = _split_cashier(_category_names(assigned_categories))
+        if connection_type not in ("usb", "network"):
+            connection_type = None  # manual printers
 
         for attempt in range(max_retries):
+            conn = get_connection()
             try:
-                conn = get_connection()
                 cur = conn.cursor()
 
-                categories_str = ",".join(categories or [])
                 cur.execute("""
-                    INSERT INTO printers (name, type, connection, ip_address, port, assigned_categories, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (name, type, connection, ip_address, port, categories_str, status))
+                    INSERT INTO printers (name, connection_type, vendor_id, product_id, serial_number,
+                                          ip_address, port, is_cashier, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (name, connection_type, vendor_id, product_id, serial_number,
+                      ip_address, port, int(is_cashier), status))
+                printer_id = cur.lastrowid
+                _map_categories(cur, printer_id, names)
 
                 conn.commit()
                 conn.close()
-                return  # ✅ success, no retry needed
+                printer_routing.invalidate()
+                return printer_id  # ✅ success, no retry needed
 
             except Exception as e:
+                conn.rollback()
+                conn.close()
                 if "locked" in str(e).lower() and attempt < max_retries - 1:
                     time.sleep(0.3)  # wait 300ms then retry
                     continue
                 else:
                     raise
 
-
     @staticmethod
     def all():
         """Return all printers as list of dicts"""
         conn = get_connection()
         cur = conn.cursor()
         cur.execute("SELECT * FROM printers ORDER BY id DESC")
-        rows = cur.fetchall()
+        printers = _with_categories(cur, [dict(row) for row in cur.fetchall()])
         conn.close()
-        return [dict(row) for row in rows]
+        return printers
 
     @staticmethod
     def update(id, **kwargs):
@@ -56,15 +122,47 @@ class Printer:
 
         conn.commit()
         conn.close()
+        printer_routing.invalidate()
+
+    @staticmethod
+    def set_statuses(statuses):
+        """{printer_id: status}: write the ones that differ in one transaction; returns those"""
+        if not statuses:
+            return {}
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT id, status FROM printers")
+        changes = {row["id"]: statuses[row["id"]] for row in cur.fetchall()
+                   if row["id"] in statuses and statuses[row["id"]] != row["status"]}
+        if changes:
+            cur.executemany("UPDATE printers SET status=? WHERE id=?",
+                            [(status, printer_id) for printer_id, status in changes.items()])
+            conn.commit()
+        conn.close()
+        if changes:
+            printer_routing.invalidate()
+        return changes
 
     @staticmethod
     def delete(id):
         """Delete printer by ID"""
         conn = get_connection()
         cur = conn.cursor()
+        cur.execute("DELETE FROM printer_categories WHERE printer_id=?", (id,))
         cur.execute("DELETE FROM printers WHERE id=?", (id,))
         conn.commit()
         conn.close()
+        printer_routing.invalidate()
+
+    @staticmethod
+    def get(id):
+        """Printer by ID as a dict"""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM printers WHERE id=?", (id,))
+        printers = _with_categories(cur, [dict(row) for row in cur.fetchall()])
+        conn.close()
+        return printers[0] if printers else None
 
     @staticmethod
     def find_by_name(name):
@@ -72,58 +170,78 @@ class Printer:
         conn = get_connection()
         cur = conn.cursor()
         cur.execute("SELECT * FROM printers WHERE name=?", (name,))
-        row = cur.fetchone()
+        printers = _with_categories(cur, [dict(row) for row in cur.fetchall()[:1]])
         conn.close()
-        return dict(row) if row else None
+        return printers[0] if printers else None
 
     @staticmethod
     def find_by_category(category):
-        """Find printers assigned to a specific category"""
+        """Printers assigned to a category (name or id)"""
+        if not isinstance(category, int):
+            found = catalog.category_by_name(category)
+            if not found:
+                return []
+            category = found["id"]
+        return [dict(p) for p in printer_routing.printers_for(category)]
+
+    @staticmethod
+    def routes():
+        """category_id -> [printer dict] from printer_categories (feeds printer_routing)"""
         conn = get_connection()
         cur = conn.cursor()
         cur.execute("""
-            SELECT * FROM printers
-            WHERE assigned_categories LIKE ?
-        """, (f"%{category}%",))
-        rows = cur.fetchall()
+            SELECT pc.category_id, p.*
+            FROM printer_categories pc
+            JOIN printers p ON p.id = pc.printer_id
+            ORDER BY pc.category_id, p.id
+        """)
+        routes = {}
+        for row in cur.fetchall():
+            printer = dict(row)
+            routes.setdefault(printer.pop("category_id"), []).append(printer)
+        conn.close()
+        return routes
+
+    @staticmethod
+    def cashier():
+        """First online printer flagged is_cashier (feeds printer_routing)"""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM printers WHERE is_cashier = 1 AND status='online' ORDER BY id LIMIT 1")
+        row = cur.fetchone()
         conn.close()
-        return [dict(row) for row in rows]
+        return dict(row) if row else None
 
     @staticmethod
     def assign_category(printer_id, category):
-        """Assign or append category to printer (supports multiple categories)"""
+        """Assign a category to printer (or 'cashier': make it the receipt printer)"""
         conn = get_connection()
         cur = conn.cursor()
 
-        cur.execute("SELECT assigned_categories FROM printers WHERE id=?", (printer_id,))
-        row = cur.fetchone()
-        if row and row["assigned_categories"]:
-            existing = set(row["assigned_categories"].split(","))
+        category = category.strip()
+        if category.lower() == CASHIER:
+            cur.execute("UPDATE printers SET is_cashier=1 WHERE id=?", (printer_id,))
         else:
-            existing = set()
-
-        existing.add(category)
-        cur.execute("UPDATE printers SET assigned_categories=? WHERE id=?", (",".join(existing), printer_id))
+            _map_categories(cur, printer_id, [category])
 
         conn.commit()
         conn.close()
+        printer_routing.invalidate()
 
     @staticmethod
     def remove_category(printer_id, category):
-        """Remove a category from printer"""
+        """Remove a category from printer (or 'cashier': no longer the receipt printer)"""
         conn = get_connection()
         cur = conn.cursor()
 
-        cur.execute("SELECT assigned_categories FROM printers WHERE id=?", (printer_id,))
-        row = cur.fetchone()
-        if not row or not row["assigned_categories"]:
-            conn.close()
-            return
-
-        existing = set(row["assigned_categories"].split(","))
-        if category in existing:
-            existing.remove(category)
-            cur.execute("UPDATE printers SET assigned_categories=? WHERE id=?", (",".join(existing), printer_id))
+        category = category.strip()
+        found = catalog.category_by_name(category)
+        if category.lower() == CASHIER:
+            cur.execute("UPDATE printers SET is_cashier=0 WHERE id=?", (printer_id,))
+        elif found:
+            cur.execute("DELETE FROM printer_categories WHERE printer_id=? AND category_id=?",
+                        (printer_id, found["id"]))
 
         conn.commit()
         conn.close()
+        printer_routing.invalidate()
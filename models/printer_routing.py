@@ -0,0 +1,51 @@
+# models/printer_routing.py
+import threading
+
+
+class PrinterRouting:
+    """
+    In-memory category_id -> [printer dict] table built from printer_categories.
+    Dropped whenever Printer / Category change a mapping, rebuilt on the next lookup,
+    so routing an order line is a dict lookup instead of a printers scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.version = 0
+        self._routes = {}
+        self._cashier = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from models.printer import Printer
+
+            self._routes = Printer.routes()
+            self._cashier = Printer.cashier()
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self.version += 1
+
+    def printers_for(self, category_id):
+        """Printers assigned to a category (shared dicts: read-only)."""
+        self._ensure_loaded()
+        return self._routes.get(category_id, [])
+
+    def cashier(self):
+        """The online cashier printer, or None."""
+        self._ensure_loaded()
+        return self._cashier
+
+    def routes(self):
+        self._ensure_loaded()
+        return self._routes
+
+
+printer_routing = PrinterRouting()
@@ -1,5 +1,6 @@
 # models/product.py
 from models.database import get_connection
+from models.catalog import catalog
 
 class Product:
     @staticmethod
@@ -26,6 +27,7 @@ class Product:
         """, (name, category_id, price, image, status))
         conn.commit()
         conn.close()
+        catalog.invalidate()
 
     @staticmethod
     def update(product_id, name, category_id, price, status):
@@ -37,6 +39,7 @@ class Product:
         """, (name, category_id, price, status, product_id))
         conn.commit()
         conn.close()
+        catalog.invalidate()
 
     @staticmethod
     def delete(product_id):
@@ -45,6 +48,7 @@ class Product:
         cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
         conn.commit()
         conn.close()
+        catalog.invalidate()
 
     @staticmethod
     def get_by_id(product_id):
@@ -0,0 +1,157 @@
+# models/product_search.py
+import heapq
+import threading
+import unicodedata
+
+from models.catalog import catalog
+
+
+def normalize(text):
+    """Case- and accent-insensitive form used for indexing and queries"""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProductSearchIndex:
+    """
+    Prefix + trigram index over product names and their category names.
+    Synced from the catalog on query: only products whose name or category
+    changed since the last sync are re-indexed.
+    """
+
+    MAX_PREFIX = 12
+
+    def __init__(self, source=catalog):
+        self._source = source
+        self._lock = threading.Lock()
+        self._version = None
+        self._docs = {}       # product_id -> (name, category, tokens, prefixes, grams)
+        self._products = {}   # product_id -> catalog dict
+        self._prefixes = {}   # token prefix -> {product_id}
+        self._trigrams = {}   # trigram -> {product_id}
+
+    # --- indexing ---
+    def _add(self, product):
+        pid = product["id"]
+        name = normalize(product.get("name"))
+        category = normalize(product.get("category_name"))
+        tokens = set(name.split()) | set(category.split())
+
+        prefixes = set()
+        for tok in tokens:
+            for i in range(1, min(len(tok), self.MAX_PREFIX) + 1):
+                prefixes.add(tok[:i])
+        grams = _trigrams(name) | _trigrams(category)
+
+        for p in prefixes:
+            self._prefixes.setdefault(p, set()).add(pid)
+        for g in grams:
+            self._trigrams.setdefault(g, set()).add(pid)
+        self._docs[pid] = (name, category, tokens, prefixes, grams)
+        self._products[pid] = product
+
+    def _remove(self, pid):
+        doc = self._docs.pop(pid, None)
+        self._products.pop(pid, None)
+        if not doc:
+            return
+        for index, keys in ((self._prefixes, doc[3]), (self._trigrams, doc[4])):
+            for k in keys:
+                ids = index.get(k)
+                if ids is not None:
+                    ids.discard(pid)
+                    if not ids:
+                        del index[k]
+
+    def sync(self):
+        """Bring the index up to date with the catalog (incremental)."""
+        if self._version == self._source.version:
+            return
+        with self._lock:
+            version = self._source.version
+            if self._version == version:
+                return
+            current = {p["id"]: p for p in self._source.products()}
+
+            for pid in [pid for pid in self._docs if pid not in current]:
+                self._remove(pid)
+            for pid, product in current.items():
+                doc = self._docs.get(pid)
+                if doc and doc[0] == normalize(product.get("name")) \
+                        and doc[1] == normalize(product.get("category_name")):
+                    self._products[pid] = product  # refresh price etc., keys unchanged
+                    continue
+                self._remove(pid)
+                self._add(product)
+            self._version = version
+
+    # --- querying ---
+    def _match_term(self, term):
+        ids = set(self._prefixes.get(term[:self.MAX_PREFIX], ()))
+        if len(term) > self.MAX_PREFIX:
+            ids = {pid for pid in ids if any(t.startswith(term) for t in self._docs[pid][2])}
+        if len(term) >= 3:
+            # infix match: candidates sharing every trigram, then verified
+            grams = sorted(_trigrams(term), key=lambda g: len(self._trigrams.get(g, ())))
+            candidates = None
+            for g in grams:
+                hit = self._trigrams.get(g)
+                if not hit:
+                    candidates = set()
+                    break
+                candidates = set(hit) if candidates is None else candidates & hit
+                if not candidates:
+                    break
+            for pid in (candidates or set()) - ids:
+                doc = self._docs[pid]
+                if term in doc[0] or term in doc[1]:
+                    ids.add(pid)
+        return ids
+
+    def _rank(self, pid, query, terms):
+        name = self._docs[pid][0]
+        if name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        words = name.split()
+        if all(any(w.startswith(t) for w in words) for t in terms):
+            return 2
+        if all(t in name for t in terms):
+            return 3
+        return 4  # matched through the category name
+
+    def search(self, text, category_id=None, limit=None):
+        """Return catalog product dicts matching text, best matches first."""
+        self.sync()
+        query = normalize(text).strip()
+        terms = query.split()
+        if not terms:
+            products = self._source.products() if category_id is None \
+                else self._source.products_in_category(category_id)
+            return products[:limit] if limit else products
+
+        ids = None
+        for term in sorted(terms, key=len, reverse=True):
+            hit = self._match_term(term)
+            ids = hit if ids is None else ids & hit
+            if not ids:
+                return []
+
+        results = [self._products[pid] for pid in ids]
+        if category_id is not None:
+            results = [p for p in results if p.get("category_id") == category_id]
+
+        def key(p):
+            return self._rank(p["id"], query, terms), self._docs[p["id"]][0]
+
+        if limit:
+            return heapq.nsmallest(limit, results, key=key)
+        return sorted(results, key=key)
+
+
+product_index = ProductSearchIndex()
@@ -0,0 +1,382 @@
+# models/query_profiler.py
+"""
+In-process SQL profiler for the pooled connections (models.database).
+
+While enabled, every cursor handed out by the pool is wrapped: the time spent in
+execute and in the fetches, the rows returned (or changed) and the call site
+(first frame outside the database layer) are aggregated per statement, with
+the literals normalized away, into a latency histogram. Statements slower than
+slow_ms go to a ring buffer. The same statement run from the same call site
+n_plus_one times within window_s seconds on one thread is reported as an N+1
+pattern (a per-item SELECT in a loop that should be one query or the catalog).
+
+Off by default. The settings are kept on the settings row (profiler_enabled,
+profiler_slow_ms, profiler_n_plus_one, profiler_window_s, profiler_dump) and
+applied by main.py once the database is open; the admin Diagnostics page turns
+it on / off and saves the change there. FASTFOOD_PROFILE=1 forces it on. When
+disabled the only cost is one attribute check per cursor. dump() writes a JSON
+snapshot (also at exit when dump is set); `python -m models.query_profiler
+profile.json` prints it.
+"""
+import argparse
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+DEFAULTS = {"enabled": False, "slow_ms": 50.0, "n_plus_one": 10, "window_s": 1.0, "dump": None}
+# histogram bucket upper bounds, ms (the last bucket is everything slower)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+MAX_STATEMENTS = 500  # distinct normalized statements kept
+MAX_SITES = 5  # call sites kept per statement
+
+_SKIP_FILES = ("database.py", "query_profiler.py", "contextlib.py")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(sql):
+    """One line, literals -> ?, IN (?, ?, ...) -> IN (...)."""
+    sql = _SPACE.sub(" ", _NUMBER.sub("?", _STRING.sub("?", sql))).strip()
+    return _IN_LIST.sub("(...)", sql)
+
+
+_site_names = {}  # (code, line, caller code, caller line) -> formatted call site
+
+
+def _frame_name(code, line):
+    path = code.co_filename
+    try:
+        path = os.path.relpath(path)
+    except ValueError:
+        pass
+    return f"{path}:{line} in {code.co_name}"
+
+
+def call_site(depth=2):
+    """
+    'path:line in function' of the first caller outside the database layer, followed
+    by its own caller (a model method is usually called from the loop that matters).
+    """
+    frame = sys._getframe(depth)
+    while frame and frame.f_code.co_filename.endswith(_SKIP_FILES):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    caller = frame.f_back
+    key = (frame.f_code, frame.f_lineno, caller and caller.f_code, caller and caller.f_lineno)
+    name = _site_names.get(key)
+    if name is None:
+        name = _frame_name(frame.f_code, frame.f_lineno)
+        if caller is not None:
+            name += " <- " + _frame_name(caller.f_code, caller.f_lineno)
+        if len(_site_names) < 10000:
+            _site_names[key] = name
+    return name
+
+
+class _Stat:
+    __slots__ = ("sql", "calls", "total_ms", "max_ms", "rows", "histogram", "sites")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(BUCKETS_MS)
+        self.sites = {}
+
+    def add(self, ms, rows, site):
+        self.calls += 1
+        self.total_ms += ms
+        self.rows += rows
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.histogram[bisect_left(BUCKETS_MS, ms)] += 1
+        if site in self.sites or len(self.sites) < MAX_SITES:
+            self.sites[site] = self.sites.get(site, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of the calls."""
+        wanted, seen = self.calls * fraction, 0
+        for count, bound in zip(self.histogram, BUCKETS_MS):
+            seen += count
+            if count and seen >= wanted:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "histogram": list(self.histogram),
+            "sites": dict(sorted(self.sites.items(), key=lambda item: -item[1])),
+        }
+
+
+class ProfiledCursor:
+    """
+    sqlite3.Cursor stand-in that times execute + fetches of each statement and
+    reports it to the profiler once the statement is done (exhausted, replaced
+    by the next execute, or the cursor is closed / collected).
+    """
+
+    def __init__(self, profiler, cursor):
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_pending", None)  # [sql, ms, rows, site]
+
+    def _begin(self, sql, site, method, *args):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            method(sql, *args)
+        finally:
+            object.__setattr__(self, "_pending", [sql, (time.perf_counter() - start) * 1000, 0, site])
+        if self._cursor.description is None:  # no result set: DML / DDL
+            self._pending[2] = max(self._cursor.rowcount, 0)
+            self._finish()
+        return self
+
+    def _fetched(self, start, rows, done):
+        pending = self._pending
+        if pending is not None:
+            pending[1] += (time.perf_counter() - start) * 1000
+            pending[2] += rows
+            if done:
+                self._finish()
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            object.__setattr__(self, "_pending", None)
+            self._profiler.record(*pending)
+
+    def execute(self, sql, params=()):
+        return self._begin(sql, call_site(), self._cursor.execute, params)
+
+    def executemany(self, sql, seq):
+        return self._begin(sql, call_site(), self._cursor.executemany, seq)
+
+    def executescript(self, script):
+        return self._begin(script, call_site(), self._cursor.executescript)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size or self._cursor.arraysize)
+        self._fetched(start, len(rows), len(rows) < (size or self._cursor.arraysize))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+class QueryProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = DEFAULTS["slow_ms"]
+        self.n_plus_one = DEFAULTS["n_plus_one"]
+        self.window_s = DEFAULTS["window_s"]
+        self.dump_path = DEFAULTS["dump"]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._normalized = {}  # raw sql -> normalized (the same strings come back every call)
+        self.reset()
+
+    def configure(self, settings=None):
+        """Apply the settings dict (DEFAULTS when None); FASTFOOD_PROFILE=1 forces it on."""
+        if settings is None:
+            settings = DEFAULTS
+        self.slow_ms = float(settings.get("slow_ms", self.slow_ms))
+        self.n_plus_one = int(settings.get("n_plus_one", self.n_plus_one))
+        self.window_s = float(settings.get("window_s", self.window_s))
+        self.dump_path = settings.get("dump")
+        self.enabled = bool(settings.get("enabled")) or os.environ.get("FASTFOOD_PROFILE") == "1"
+        return self
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self.slow = deque(maxlen=100)
+            self.n_plus_one_hits = {}  # (sql, site) -> {"sql", "site", "count", "bursts", "last"}
+            self.dropped = 0
+            self.started = datetime.now().isoformat(timespec="seconds")
+
+    def wrap(self, cursor):
+        """The pool's hook: a profiled cursor while enabled, the cursor itself otherwise."""
+        return ProfiledCursor(self, cursor) if self.enabled else cursor
+
+    # --- recording ---
+    def _normalize(self, sql):
+        normalized = self._normalized.get(sql)
+        if normalized is None:
+            normalized = normalize(sql)
+            if len(self._normalized) < 4 * MAX_STATEMENTS:
+                self._normalized[sql] = normalized
+        return normalized
+
+    def record(self, sql, ms, rows, site):
+        key = self._normalize(sql)
+        now = time.monotonic()
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    self.dropped += 1
+                    return
+                stat = self._stats[key] = _Stat(key)
+            stat.add(ms, rows, site)
+            if ms >= self.slow_ms:
+                self.slow.append({"at": datetime.now().isoformat(timespec="seconds"), "ms": round(ms, 3),
+                                  "rows": rows, "sql": key, "site": site})
+        self._track_repeats(key, site, now)
+
+    def _track_repeats(self, key, site, now):
+        """Same statement from the same place over and over in a short burst: N+1."""
+        last = getattr(self._local, "last", None)
+        if last and last[0] == key and last[1] == site and now - last[3] <= self.window_s:
+            count = last[2] + 1
+        else:
+            count = 1
+        self._local.last = (key, site, count, now if count == 1 else last[3])
+        if count == self.n_plus_one:  # report each burst once, when it crosses the threshold
+            with self._lock:
+                hit = self.n_plus_one_hits.setdefault((key, site), {"sql": key, "site": site, "bursts": 0,
+                                                                    "max_run": 0, "last": None})
+                hit["bursts"] += 1
+                hit["last"] = datetime.now().isoformat(timespec="seconds")
+        if count >= self.n_plus_one:
+            with self._lock:
+                hit = self.n_plus_one_hits.get((key, site))
+                if hit is not None and count > hit["max_run"]:
+                    hit["max_run"] = count
+
+    # --- reading ---
+    def snapshot(self, sort="total_ms", limit=None):
+        with self._lock:
+            statements = [stat.as_dict() for stat in self._stats.values()]
+            slow = list(self.slow)
+            n_plus_one = [dict(hit) for hit in self.n_plus_one_hits.values()]
+            dropped, started = self.dropped, self.started
+        statements.sort(key=lambda s: s[sort], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "started": started,
+            "taken": datetime.now().isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "buckets_ms": [b if b != float("inf") else None for b in BUCKETS_MS],
+            "statements": statements[:limit] if limit else statements,
+            "slow": slow,
+            "n_plus_one": sorted(n_plus_one, key=lambda h: -h["max_run"]),
+            "dropped_statements": dropped,
+        }
+
+    def dump(self, path=None):
+        """Write snapshot() as JSON; returns the path."""
+        path = Path(path or self.dump_path or "query_profile.json")
+        path.write_text(json.dumps(self.snapshot(), indent=2))
+        return path
+
+    def _dump_at_exit(self):
+        if self.dump_path and self._stats:
+            try:
+                self.dump()
+            except OSError as e:
+                print(f"⚠️ Could not write the query profile: {e}")
+
+
+profiler = QueryProfiler().configure()
+atexit.register(profiler._dump_at_exit)
+
+
+def format_report(snapshot, top=20, sort="total_ms"):
+    """Plain-text report of a snapshot() / dump file."""
+    statements = sorted(snapshot["statements"], key=lambda s: s[sort], reverse=True)[:top]
+    lines = [f"Query profile {snapshot['started']} .. {snapshot['taken']}",
+             f"{'calls':>8} {'total ms':>10} {'mean':>8} {'p95':>8} {'max':>8} {'rows':>9}  statement"]
+    for s in statements:
+        lines.append(f"{s['calls']:>8} {s['total_ms']:>10.1f} {s['mean_ms']:>8.2f} {s['p95_ms']:>8.2f} "
+                     f"{s['max_ms']:>8.2f} {s['rows']:>9}  {s['sql'][:100]}")
+        for site, count in list(s["sites"].items())[:2]:
+            lines.append(f"{'':>56}  ↳ {site} ({count})")
+    if snapshot["n_plus_one"]:
+        lines += ["", "N+1 patterns (same statement repeated from one call site):"]
+        for hit in snapshot["n_plus_one"]:
+            lines.append(f"  {hit['max_run']:>5}x in a row, {hit['bursts']} burst(s)  {hit['site']}")
+            lines.append(f"         {hit['sql'][:100]}")
+    if snapshot["slow"]:
+        lines += ["", f"Slow statements (>= {snapshot['slow_ms']} ms), newest last:"]
+        for entry in snapshot["slow"][-top:]:
+            lines.append(f"  {entry['at']} {entry['ms']:>9.1f} ms  {entry['site']}")
+            lines.append(f"         {entry['sql'][:100]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print a query profile written by the profiler's dump()")
+    parser.add_argument("path", nargs="?", default="query_profile.json")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", choices=("total_ms", "mean_ms", "p95_ms", "max_ms", "calls", "rows"),
+                        default="total_ms")
+    args = parser.parse_args(argv)
+    print(format_report(json.loads(Path(args.path).read_text()), args.top, args.sort))
+
+
+if __name__ == "__main__":
+    main()
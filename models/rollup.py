@@ -0,0 +1,237 @@
+# models/rollup.py
+from models.database import get_connection, iter_chunks
+
+
+def _day(created_at):
+    return str(created_at)[:10]
+
+
+def _hour(created_at):
+    try:
+        return int(str(created_at)[11:13])
+    except ValueError:
+        return 0
+
+
+class SalesRollup:
+    """
+    Pre-aggregated sales per day / hour and product (sales_daily, sales_hourly)
+    plus per-day order counts and totals (sales_daily_totals).
+    Updated incrementally inside the checkout transaction; rebuild() recomputes
+    everything from orders / order_items. Cost is captured at sale time.
+    """
+
+    # --- incremental updates (call with the writer's cursor, inside its transaction) ---
+    @staticmethod
+    def record_order(cur, created_at, order_total, lines=()):
+        """Count a new order and its lines. lines: iterable of (product_id, quantity, price)."""
+        cur.execute("""
+            INSERT INTO sales_daily_totals (day, orders, order_total) VALUES (?, 1, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                orders = orders + 1,
+                order_total = order_total + excluded.order_total
+        """, (_day(created_at), order_total or 0))
+        SalesRollup.record_items(cur, created_at, lines)
+
+    @staticmethod
+    def adjust_order_total(cur, created_at, delta):
+        """An already counted order's total changed by delta (order edited)."""
+        cur.execute("UPDATE sales_daily_totals SET order_total = order_total + ? WHERE day = ?",
+                    (delta, _day(created_at)))
+
+    @staticmethod
+    def record_items(cur, created_at, lines):
+        """
+        Add order lines to an already counted order.
+        lines: (product_id, quantity, price) or (product_id, quantity, price, line_delta);
+        a removed line is (product_id, -quantity, price, -1).
+        """
+        from models.catalog import catalog
+
+        day, hour = _day(created_at), _hour(created_at)
+        rows = []
+        for product_id, quantity, price, *line_delta in lines:
+            product = catalog.product(product_id) or {}
+            cost = float(product.get("cost") or 0)
+            rows.append((day, hour, product_id or 0, product.get("category_id"),
+                         quantity, quantity * price, quantity * cost, line_delta[0] if line_delta else 1))
+        if not rows:
+            return
+
+        cur.executemany("""
+            INSERT INTO sales_daily (day, product_id, category_id, quantity, revenue, cost, lines)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, product_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue,
+                cost = cost + excluded.cost,
+                lines = lines + excluded.lines
+        """, [(r[0], r[2], r[3], r[4], r[5], r[6], r[7]) for r in rows])
+        cur.executemany("""
+            INSERT INTO sales_hourly (day, hour, product_id, category_id, quantity, revenue, cost, lines)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, hour, product_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue,
+                cost = cost + excluded.cost,
+                lines = lines + excluded.lines
+        """, rows)
+        if any(r[7] < 0 for r in rows):
+            # lines removed by an order edit: drop products that no longer sold anything that day
+            cur.execute("DELETE FROM sales_daily WHERE day = ? AND lines <= 0", (day,))
+            cur.execute("DELETE FROM sales_hourly WHERE day = ? AND lines <= 0", (day,))
+
+    # --- full rebuild ---
+    @staticmethod
+    def rebuild_with(cur, since=""):
+        """
+        Recompute the rollup tables from orders / order_items using cur, for the days
+        >= since (all days by default). Days before since (archived months) are kept.
+        """
+        cur.execute("DELETE FROM sales_daily WHERE day >= ?", (since,))
+        cur.execute("DELETE FROM sales_hourly WHERE day >= ?", (since,))
+        cur.execute("DELETE FROM sales_daily_totals WHERE day >= ?", (since,))
+
+        cur.execute("""
+            INSERT INTO sales_daily_totals (day, orders, order_total)
+            SELECT substr(created_at, 1, 10), COUNT(*), COALESCE(SUM(total), 0)
+            FROM orders
+            WHERE created_at >= ?
+            GROUP BY substr(created_at, 1, 10)
+        """, (since,))
+        cur.execute("""
+            INSERT INTO sales_hourly (day, hour, product_id, category_id, quantity, revenue, cost, lines)
+            SELECT substr(o.created_at, 1, 10),
+                   CAST(substr(o.created_at, 12, 2) AS INTEGER),
+                   COALESCE(oi.product_id, 0),
+                   MAX(p.category_id),
+                   SUM(oi.quantity),
+                   SUM(oi.quantity * oi.price),
+                   SUM(oi.quantity * COALESCE(p.cost, 0)),
+                   COUNT(*)
+            FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            LEFT JOIN products p ON p.id = oi.product_id
+            WHERE o.created_at >= ?
+            GROUP BY 1, 2, 3
+        """, (since,))
+        cur.execute("""
+            INSERT INTO sales_daily (day, product_id, category_id, quantity, revenue, cost, lines)
+            SELECT day, product_id, MAX(category_id), SUM(quantity), SUM(revenue), SUM(cost), SUM(lines)
+            FROM sales_hourly
+            WHERE day >= ?
+            GROUP BY day, product_id
+        """, (since,))
+
+    @staticmethod
+    def rebuild():
+        """Rebuild the rollup tables in one transaction (archived months keep their totals)."""
+        from models.order_archive import OrderArchive
+
+        since = OrderArchive.boundary()
+        conn = get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            SalesRollup.rebuild_with(conn.cursor(), since)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # --- reads ---
+    @staticmethod
+    def _range(column, start_date, end_date):
+        clauses, params = [], []
+        if start_date:
+            clauses.append(f"{column} >= ?")
+            params.append(_day(start_date))
+        if end_date:
+            clauses.append(f"{column} <= ?")
+            params.append(_day(end_date))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def daily_chunks(start_date=None, end_date=None, size=200):
+        """Like daily(), yielded in lists of up to size rows (for streaming into the UI)."""
+        where, params = SalesRollup._range("d.day", start_date, end_date)
+        yield from iter_chunks(f"""
+            SELECT d.day AS date,
+                   COALESCE(t.orders, 0) AS orders,
+                   SUM(d.revenue) AS revenue,
+                   SUM(d.cost) AS cost
+            FROM sales_daily d
+            LEFT JOIN sales_daily_totals t ON t.day = d.day
+            {where}
+            GROUP BY d.day
+            ORDER BY d.day ASC
+        """, params, size)
+
+    @staticmethod
+    def daily(start_date=None, end_date=None):
+        """Per-day orders, revenue and cost (date, orders, revenue, cost), oldest first."""
+        return [dict(row) for rows in SalesRollup.daily_chunks(start_date, end_date) for row in rows]
+
+    @staticmethod
+    def by_category(start_date=None, end_date=None):
+        """Revenue per category (category, total), largest first."""
+        where, params = SalesRollup._range("d.day", start_date, end_date)
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT c.name AS category, SUM(d.revenue) AS total
+            FROM sales_daily d
+            JOIN categories c ON c.id = d.category_id
+            {where}
+            GROUP BY c.id
+            ORDER BY total DESC
+        """, params)
+        rows = [{"category": r["category"], "total": r["total"] or 0} for r in cur.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    def hourly(day):
+        """Revenue and quantity per hour for one day."""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT hour, SUM(quantity) AS quantity, SUM(revenue) AS revenue, SUM(cost) AS cost
+            FROM sales_hourly
+            WHERE day = ?
+            GROUP BY hour
+            ORDER BY hour
+        """, (_day(day),))
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    def order_totals(start_date=None, end_date=None):
+        """Sum of orders.total and order count over a date range."""
+        where, params = SalesRollup._range("day", start_date, end_date)
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT COALESCE(SUM(order_total), 0) AS total, COALESCE(SUM(orders), 0) AS orders
+            FROM sales_daily_totals {where}
+        """, params)
+        row = dict(cur.fetchone())
+        conn.close()
+        return row
+
+    @staticmethod
+    def recent_days(limit=7):
+        """Daily order_total for the most recent days (day, daily_revenue)."""
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT day, order_total AS daily_revenue
+            FROM sales_daily_totals
+            ORDER BY day DESC
+            LIMIT ?
+        """, (limit,))
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
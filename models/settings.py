@@ -0,0 +1,47 @@
+# models/settings.py
+"""
+Application settings stored on the single settings row, so they survive logins
+(config.json only remembers the last login and is rewritten on every sign in / out).
+
+Maintenance settings are grouped by column prefix: section("backup", defaults)
+reads backup_dir, backup_interval_hours, ... and falls back to defaults for
+missing columns or NULLs (e.g. before the database is migrated).
+"""
+import sqlite3
+
+from models.database import get_connection
+
+
+class Settings:
+    @staticmethod
+    def row():
+        conn = get_connection()
+        try:
+            row = conn.execute("SELECT * FROM settings LIMIT 1").fetchone()
+        except sqlite3.OperationalError:
+            row = None  # no schema yet
+        conn.close()
+        return dict(row) if row else {}
+
+    @staticmethod
+    def section(prefix, defaults):
+        """{key: value} for the columns prefix_<key>, defaults where unset."""
+        row = Settings.row()
+        values = dict(defaults)
+        for key in defaults:
+            value = row.get(f"{prefix}_{key}")
+            if value is not None:
+                values[key] = value
+        return values
+
+    @staticmethod
+    def save_section(prefix, values):
+        """Write {key: value} to the columns prefix_<key> of the settings row."""
+        if not values:
+            return
+        columns = ", ".join(f"{prefix}_{key} = ?" for key in values)
+        conn = get_connection()
+        conn.execute(f"UPDATE settings SET {columns} WHERE id = 1",
+                     list(values.values()))
+        conn.commit()
+        conn.close()
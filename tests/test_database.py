@@ -0,0 +1,69 @@
+# tests/test_database.py
+"""Nested checkouts of the pooled connection (models.database)."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from models.database import DB_PATH, use_database, init_db, get_connection, connection
+
+
+def _names():
+    conn = get_connection()
+    names = [row["name"] for row in conn.execute("SELECT name FROM categories ORDER BY id")]
+    conn.close()
+    return names
+
+
+def _add(name):
+    """A helper that commits its own work, as the models do."""
+    conn = get_connection()
+    conn.execute("INSERT INTO categories (name) VALUES (?)", (name,))
+    conn.commit()
+    conn.close()
+
+
+class NestedCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        use_database(os.path.join(self.tmp, "test.db"))
+        init_db()
+
+    def tearDown(self):
+        use_database(DB_PATH)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_inner_block_does_not_commit_the_outer_one(self):
+        with self.assertRaises(RuntimeError):
+            with connection() as outer:
+                outer.execute("INSERT INTO categories (name) VALUES ('outer')")
+                with connection() as inner:
+                    inner.execute("INSERT INTO categories (name) VALUES ('inner')")
+                _add("helper")  # its commit is left to the outer block
+                raise RuntimeError("outer fails")
+        self.assertEqual(_names(), [])
+
+    def test_failed_inner_block_keeps_the_outer_work(self):
+        with connection() as outer:
+            outer.execute("INSERT INTO categories (name) VALUES ('outer')")
+            with self.assertRaises(RuntimeError):
+                with connection() as inner:
+                    inner.execute("INSERT INTO categories (name) VALUES ('inner')")
+                    raise RuntimeError("inner fails")
+            outer.execute("INSERT INTO categories (name) VALUES ('after')")
+        self.assertEqual(_names(), ["outer", "after"])
+
+    def test_outer_block_commits_everything(self):
+        with connection() as outer:
+            outer.execute("BEGIN IMMEDIATE")
+            with connection() as inner:
+                inner.execute("INSERT INTO categories (name) VALUES ('inner')")
+            _add("helper")
+            self.assertTrue(outer.in_transaction)
+        self.assertEqual(_names(), ["inner", "helper"])
+        _add("plain")  # no block open: commits right away
+        self.assertEqual(_names(), ["inner", "helper", "plain"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_escpos_sessions.py
+"""PrinterSession / SessionManager against utils.fake_printer."""
+import threading
+import time
+import unittest
+
+from utils.escpos_sessions import PrinterSession, SessionManager
+from utils.fake_printer import FakePrinterServer
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class PrinterSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakePrinterServer().start()
+        self.key = ("network",) + self.server.address
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_reconnects_after_the_printer_hangs_up(self):
+        session = PrinterSession(self.key)
+        session.send_raw(b"first;")
+        self.assertTrue(_wait_for(lambda: self.server.received == b"first;"))
+        self.assertEqual(self.server.drop(), 1)
+        time.sleep(0.05)  # let the FIN arrive
+        session.send_raw(b"second;")
+        session.send_raw(b"third;")
+        self.assertTrue(_wait_for(lambda: len(self.server.received) == 19))
+        self.assertEqual(bytes(self.server.received), b"first;second;third;")  # nothing lost
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(session.stats["reconnects"], 1)
+        self.assertEqual(session.stats["failures"], 0)
+        session.close()
+
+    def test_concurrent_writes_are_serialized(self):
+        self.server.delay = 0.001  # slow printer: writers pile up on the lock
+        session = PrinterSession(self.key)
+        payloads = [b"<%02d" % i + bytes([65 + i]) * 20000 + b">" for i in range(8)]
+        threads = [threading.Thread(target=session.send_raw, args=(p,)) for p in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = sum(map(len, payloads))
+        self.assertTrue(_wait_for(lambda: len(self.server.received) == total, 5.0))
+        received = bytes(self.server.received)
+        for payload in payloads:
+            self.assertIn(payload, received)  # each ticket arrived in one piece
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(session.stats["writes"], len(payloads))
+        session.close()
+
+
+class SessionManagerTest(unittest.TestCase):
+    def test_one_session_per_device(self):
+        manager = SessionManager(keepalive_interval=60)
+        with FakePrinterServer() as server, FakePrinterServer() as other:
+            host, port = server.address
+            row = {"connection_type": "network", "ip_address": host, "port": port}
+            listed = {"connection": "network", "ip": host, "port": str(port)}  # PrinterController.get_all()
+            session = manager.session(row)
+            self.assertIs(manager.session(listed), session)
+            self.assertIs(manager.session(("network", host, port)), session)
+            self.assertIsNot(manager.session(("network",) + other.address), session)
+
+            manager.session(row).send_raw(b"a")
+            manager.session(listed).send_raw(b"b")
+            self.assertTrue(_wait_for(lambda: len(server.received) == 2))
+            self.assertEqual(server.connections, 1)
+            self.assertTrue(manager.is_connected(row))
+            self.assertEqual(other.connections, 0)
+            manager.close_all()
+            self.assertFalse(manager.is_connected(row))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# tests/test_kitchen_dispatch.py
+"""Kitchen tickets: claimed lines and the table they are headed with."""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from models.database import DB_PATH, use_database, init_db, get_connection
+from models.catalog import catalog
+from controllers.kitchen_dispatch import KitchenDispatcher
+from controllers.print_spooler import spooler
+
+
+class KitchenTicketTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        use_database(os.path.join(self.tmp, "test.db"))
+        init_db()
+        conn = get_connection()
+        conn.execute("INSERT INTO categories (name) VALUES ('Burgers')")
+        conn.execute("INSERT INTO products (name, category_id, price, status) VALUES ('Big', 1, 500, 'available')")
+        conn.execute("INSERT INTO tables (table_number, name, status) VALUES (3, 'Terrace 3', 'Free')")
+        conn.execute("INSERT INTO tables (table_number, name, status) VALUES (7, 'Terrace 7', 'Free')")
+        conn.execute("""INSERT INTO printers (name, connection_type, ip_address, port, status)
+                        VALUES ('Grill', 'network', '10.0.0.1', 9100, 'online')""")
+        conn.execute("INSERT INTO printer_categories (printer_id, category_id) VALUES (1, 1)")
+        table_id = conn.execute("SELECT id FROM tables WHERE table_number = 7").fetchone()[0]
+        conn.execute("INSERT INTO orders (table_id, user_id, total, payment_type, status) "
+                     "VALUES (?, 1, 1000, 'cash', 'pending')", (table_id,))
+        conn.execute("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (1, 1, 2, 500)")
+        conn.commit()
+        conn.close()
+        catalog.invalidate()
+
+    def tearDown(self):
+        use_database(DB_PATH)
+        catalog.invalidate()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_ticket_names_the_orders_table(self):
+        jobs = []
+        submit = lambda cur, batch: (jobs.extend(batch), [dict(job, id=n) for n, job in enumerate(batch)])[1]
+        with mock.patch.object(spooler, "submit_with", submit), mock.patch.object(spooler, "announce"):
+            self.assertEqual(KitchenDispatcher().dispatch(1, window=0), [0])
+        ticket = jobs[0]["payload"].decode("cp437")
+        self.assertIn("Terrace 7", ticket)  # not the table's row id
+        self.assertIn("2 x Big", ticket)
+        conn = get_connection()
+        printed = conn.execute("SELECT printed_qty FROM order_items WHERE order_id = 1").fetchone()[0]
+        conn.close()
+        self.assertEqual(printed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
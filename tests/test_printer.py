@@ -0,0 +1,56 @@
+# tests/test_printer.py
+"""Printer categories / cashier flag (models.printer)."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from models.database import DB_PATH, use_database, init_db
+from models.catalog import catalog
+from models.category import Category
+from models.printer import Printer
+from models.printer_routing import printer_routing
+
+
+class PrinterCategoriesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        use_database(os.path.join(self.tmp, "test.db"))
+        init_db()
+        catalog.invalidate()
+        printer_routing.invalidate()
+        Category.create("Burgers")
+        Category.create("Drinks")
+        catalog.invalidate()
+
+    def tearDown(self):
+        use_database(DB_PATH)
+        catalog.invalidate()
+        printer_routing.invalidate()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_cashier_is_a_flag_not_a_category(self):
+        kitchen = Printer.create("Kitchen", "network", ip_address="10.0.0.1", port=9100,
+                                 assigned_categories="Burgers, cashier-notes", status="online")
+        till = Printer.create("Till", "network", ip_address="10.0.0.2", port=9100,
+                              assigned_categories="Drinks, Cashier", status="online")
+        self.assertEqual(Printer.cashier()["id"], till)  # 'cashier-notes' is not the role
+        self.assertEqual(Printer.get(till)["assigned_categories"], "Drinks,cashier")
+        self.assertEqual(Printer.get(kitchen)["assigned_categories"], "Burgers")
+
+        Printer.remove_category(till, "cashier")
+        self.assertIsNone(Printer.cashier())
+        Printer.assign_category(kitchen, "cashier")
+        self.assertEqual(Printer.cashier()["id"], kitchen)
+
+    def test_renamed_category_shows_its_new_name(self):
+        printer_id = Printer.create("Kitchen", "network", assigned_categories="Burgers")
+        Category.update(catalog.category_by_name("Burgers")["id"], "Smash burgers")
+        self.assertEqual(Printer.get(printer_id)["assigned_categories"], "Smash burgers")
+        self.assertEqual([p["assigned_categories"] for p in Printer.all()], ["Smash burgers"])
+        Printer.remove_category(printer_id, "Smash burgers")
+        self.assertEqual(Printer.get(printer_id)["assigned_categories"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
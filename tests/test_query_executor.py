@@ -0,0 +1,66 @@
+# tests/test_query_executor.py
+"""Overlapping streamed QueryExecutor submits on pooled connections."""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from models.database import DB_PATH, use_database, init_db, get_connection, iter_chunks, pool_stats
+from ui.workers import QueryExecutor
+
+
+def _slow_stream(size=50):
+    for rows in iter_chunks("SELECT id, name FROM categories ORDER BY id", (), size):
+        time.sleep(0.001)  # keep both streams open at the same time
+        yield rows
+
+
+class OverlappingStreamsTest(unittest.TestCase):
+    ROWS = 2000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+        cls.tmp = tempfile.mkdtemp()
+        use_database(os.path.join(cls.tmp, "test.db"))
+        init_db()
+        conn = get_connection()
+        conn.executemany("INSERT INTO categories (name) VALUES (?)", [(f"Category {i}",) for i in range(cls.ROWS)])
+        conn.commit()
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        use_database(DB_PATH)
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_overlapping_streams(self):
+        executor = QueryExecutor(max_threads=2)
+        errors, rows, done = [], {"a": 0, "b": 0}, []
+        before = pool_stats()
+        rounds = 10
+        for _ in range(rounds):
+            for key in rows:
+                executor.submit(key, _slow_stream, stream=True,
+                                on_chunk=lambda chunk, key=key: rows.__setitem__(key, rows[key] + len(chunk)),
+                                on_result=done.append, on_error=errors.append)
+            self.assertTrue(executor.wait(30000))
+            self.app.processEvents()
+        after = pool_stats()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(done), 2 * rounds)
+        self.assertEqual(rows, {"a": self.ROWS * rounds, "b": self.ROWS * rounds})
+        # 20 runs on two worker threads: connections come back from the idle list
+        self.assertLessEqual(after["opened"] - before["opened"], 2)
+        self.assertGreater(after["reused"], before["reused"])
+        self.assertEqual(after["closed"], before["closed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_settings.py
+"""Maintenance settings on the settings row (models.settings)."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from models.database import DB_PATH, use_database, init_db
+from models.settings import Settings
+from models.order_archive import OrderArchive
+from models.query_profiler import QueryProfiler, DEFAULTS as PROFILER_DEFAULTS
+from controllers.backup_manager import BackupManager
+from controllers.print_spooler import PrintSpooler
+
+
+class SettingsSectionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp)  # config.json lands here
+        use_database(os.path.join(self.tmp, "test.db"))
+        init_db()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        use_database(DB_PATH)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_defaults_until_saved(self):
+        self.assertEqual(Settings.section("backup", {"interval_hours": 12, "keep": 2, "dir": "x"}),
+                         {"interval_hours": 24, "keep": 7, "dir": "x"})  # column defaults win, NULL falls back
+
+    def test_saved_values_survive_login(self):
+        from utils.config_manager import save_config
+        Settings.save_section("backup", {"dir": os.path.join(self.tmp, "bk"), "keep": 3})
+        save_config({"username": "admin", "role": "admin"})  # "remember me" rewrites config.json
+        save_config({})
+        settings = BackupManager.settings()
+        self.assertEqual(str(settings["dir"]), os.path.join(self.tmp, "bk"))
+        self.assertEqual(settings["keep"], 3)
+
+    def test_archive_settings(self):
+        self.assertEqual(OrderArchive.settings()["horizon_days"], 365)
+        Settings.save_section("archive", {"horizon_days": 90})
+        self.assertEqual(OrderArchive.settings()["horizon_days"], 90)
+        self.assertEqual(OrderArchive.settings()["dir"].name, "archive")
+
+    def test_print_job_retention(self):
+        self.assertEqual(PrintSpooler.retention(), {"retention_days": 7, "dead_retention_days": 30})
+        Settings.save_section("print_jobs", {"retention_days": 0})
+        self.assertEqual(PrintSpooler.retention()["retention_days"], 0)
+
+    def test_profiler_settings(self):
+        Settings.save_section("profiler", {"enabled": 1, "slow_ms": 12.5})
+        profiler = QueryProfiler().configure(Settings.section("profiler", PROFILER_DEFAULTS))
+        self.assertTrue(profiler.enabled)
+        self.assertEqual(profiler.slow_ms, 12.5)
+        self.assertEqual(profiler.n_plus_one, PROFILER_DEFAULTS["n_plus_one"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -9,11 +10,12 @@ from PyQt6.QtCore import Qt
 
 from models.product import Product
 from models.category import Category
+from models.catalog import catalog
 from controllers.category_controller import CategoryController
 from models.database import init_db
-from PyQt6.QtWidgets import QInputDialog, QMessageBox, QTableWidget, QTableWidgetItem
+from PyQt6.QtWidgets import QInputDialog, QMessageBox, QTableWidget, QTableWidgetItem, QTableView
 from controllers.order_controller import OrderController
-from PyQt6.QtWidgets import QFileDialog
+from PyQt6.QtWidgets import QFileDialog, QProgressDialog
 import csv
 from controllers.printer_controller import PrinterController
 from models.printer import Printer
@@ -28,6 +30,13 @@ from utils.config_manager import save_config
 from ui.login_window import LoginWindow
 from ui.tables_page import TablesPage
 from ui.inventory_window import InventoryPage
+from ui.diagnostics_page import DiagnosticsPage
+from ui.workers import QueryExecutor, PrinterStatusBridge, ProgressReporter
+from controllers import catalog_io
+from controllers.order_export import export_orders
+from controllers.printer_discovery import printer_discovery
+from controllers.printer_health import printer_health
+from ui.orders_model import OrdersTableModel, OrderActionsDelegate
 from models.category import Category
 import usb.core
 import usb.util
@@ -102,6 +111,7 @@ class AdminDashboard(QMainWindow):
         super().__init__()
         self.user = user or {"username": "Admin", "role": role.capitalize()}
         self.role = role
+        self.executor = QueryExecutor(self)
 
         self.setWindowTitle("FastFood Admin Dashboard")
         self.setWindowTitle("FastFood Admin Dashboard")
@@ -134,6 +144,7 @@ class AdminDashboard(QMainWindow):
         self.btn_printers = QPushButton("🖨️ Printers")
         self.btn_users = QPushButton("👥 Users")
         self.btn_settings = QPushButton("⚙️ Settings")
+        self.btn_diagnostics = QPushButton("🩺 Diagnostics")
         # --- Sign Out button ---
         self.btn_logout = QPushButton("🚪 Sign Out")
         self.btn_logout.setStyleSheet("""
@@ -153,7 +164,7 @@ class AdminDashboard(QMainWindow):
         self.sidebar_layout.addWidget(self.btn_logout)
 
 
-        for btn in [self.btn_dashboard,self.btn_inventory,self.btn_printers, self.btn_products,self.btn_orders,self.btn_categories, self.btn_tables, self.btn_users, self.btn_settings]:
+        for btn in [self.btn_dashboard,self.btn_inventory,self.btn_printers, self.btn_products,self.btn_orders,self.btn_categories, self.btn_tables, self.btn_users, self.btn_settings, self.btn_diagnostics]:
             btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
             btn.setStyleSheet("text-align: left; padding: 10px 15px; font-size: 14px;")
@@ -191,6 +202,7 @@ class AdminDashboard(QMainWindow):
         self.page_settings = SettingsPage()
         self.page_orders = self.create_orders_page()
         self.page_printers = self.create_printers_page()
+        self.page_diagnostics = DiagnosticsPage()
 
 
         self.pages.addWidget(self.page_dashboard)
@@ -202,6 +214,7 @@ class AdminDashboard(QMainWindow):
         self.pages.addWidget(self.page_orders)
         self.pages.addWidget(self.page_printers)
         self.pages.addWidget(self.page_inventory)
+        self.pages.addWidget(self.page_diagnostics)
 
 
 
@@ -223,6 +236,7 @@ class AdminDashboard(QMainWindow):
         self.btn_orders.clicked.connect(lambda: self.switch_page(6, "Orders & Sales"))
         self.btn_printers.clicked.connect(lambda: self.switch_page(7, "Printers Management"))
         self.btn_inventory.clicked.connect(lambda: self.switch_page(8, "Inventory Management"))
+        self.btn_diagnostics.clicked.connect(lambda: self.switch_page(9, "Diagnostics"))
 
 
         
@@ -259,6 +273,12 @@ class AdminDashboard(QMainWindow):
         header_label.setStyleSheet("font-size: 18px; font-weight: bold;")
         header_layout.addWidget(header_label)
         header_layout.addStretch()
+        self.btn_import_catalog = QPushButton("📥 Import")
+        self.btn_import_catalog.clicked.connect(self.import_catalog)
+        header_layout.addWidget(self.btn_import_catalog)
+        self.btn_export_catalog = QPushButton("📤 Export")
+        self.btn_export_catalog.clicked.connect(self.export_catalog)
+        header_layout.addWidget(self.btn_export_catalog)
         add_btn = QPushButton("➕ Add Product")
         add_btn.clicked.connect(self.add_product)
         header_layout.addWidget(add_btn)
@@ -274,9 +294,79 @@ class AdminDashboard(QMainWindow):
         self.load_products()
         return page
 
+    # --- bulk import / export ---
+    def _progress_dialog(self, title, label):
+        """ProgressReporter wired to a modal progress dialog (Cancel -> reporter.cancel())."""
+        reporter = ProgressReporter(self)
+        dialog = QProgressDialog(label, "Cancel", 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(reporter.cancel)
+
+        def update(done, total):
+            dialog.setMaximum(total)
+            dialog.setValue(min(done, total) if total else 0)
+            dialog.setLabelText(f"{label}\n{done} / {total} records" if total else f"{label}\n{done} records")
+        reporter.progressed.connect(update)
+        return reporter, dialog
+
+    def import_catalog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Catalog", "", "Catalog (*.csv *.json)")
+        if not path:
+            return
+        reporter, dialog = self._progress_dialog("Import Catalog", "Importing categories, products and ingredients…")
+        self.btn_import_catalog.setEnabled(False)
+
+        def finished(result):
+            dialog.reset()
+            self.btn_import_catalog.setEnabled(True)
+            self.load_products()
+            lines = [f"{kind.capitalize()}: {result[kind]['inserted']} added, {result[kind]['updated']} updated"
+                     for kind in catalog_io.TYPES]
+            if result["errors"]:
+                lines.append(f"\n{len(result['errors'])} record(s) skipped:")
+                lines += [f"line {line}: {message}" if line else message
+                          for line, message in result["errors"][:20]]
+                if len(result["errors"]) > 20:
+                    lines.append("…")
+            QMessageBox.information(self, "Import Complete", "\n".join(lines))
+
+        def failed(error):
+            dialog.reset()
+            self.btn_import_catalog.setEnabled(True)
+            if reporter.cancelled():
+                QMessageBox.information(self, "Import Cancelled", "Import cancelled, nothing was changed.")
+            else:
+                QMessageBox.critical(self, "Import Failed", f"Nothing was imported:\n{error}")
+
+        self.executor.submit("catalog-import", catalog_io.import_catalog, path,
+                             progress=reporter.report, cancelled=reporter.cancelled,
+                             on_result=finished, on_error=failed)
+
+    def export_catalog(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Catalog", "catalog.csv", "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        reporter, dialog = self._progress_dialog("Export Catalog", "Exporting the catalog…")
+        dialog.setCancelButton(None)
+        self.btn_export_catalog.setEnabled(False)
+
+        def finished(count):
+            dialog.reset()
+            self.btn_export_catalog.setEnabled(True)
+            QMessageBox.information(self, "Export Complete", f"{count} records exported to:\n{path}")
+
+        def failed(error):
+            dialog.reset()
+            self.btn_export_catalog.setEnabled(True)
+            QMessageBox.critical(self, "Export Failed", f"Export failed:\n{error}")
+
+        self.executor.submit("catalog-export", catalog_io.export_catalog, path,
+                             progress=reporter.report, on_result=finished, on_error=failed)
+
     def load_products(self):
-        from models.product import Product
-        products = Product.get_all()
+        products = catalog.products()
 
         self.table.setRowCount(len(products))
         for row_index, product in enumerate(products):
@@ -333,8 +423,7 @@ class AdminDashboard(QMainWindow):
 
 
     def add_product(self):
-        from models.category import Category
-        categories = Category.all()
+        categories = catalog.categories()
         dialog = ProductForm(categories)
         if dialog.exec():
             self.load_products()
@@ -342,7 +431,7 @@ class AdminDashboard(QMainWindow):
 
     def edit_product(self, product_id):
         product = Product.get_by_id(product_id)   # ✅ get full product data
-        categories = Category.all()
+        categories = catalog.categories()
         dialog = ProductForm(categories, product)
         if dialog.exec():
             self.load_products()
@@ -529,103 +618,113 @@ class AdminDashboard(QMainWindow):
         header_layout.addWidget(lbl)
         header_layout.addStretch()
 
+        self.lbl_orders_summary = QLabel("")
+        self.lbl_orders_summary.setStyleSheet("color: #555; margin-right: 10px;")
         self.btn_filter = QPushButton("🔍 Filter")
-        self.btn_export = QPushButton("📤 Export to CSV")
+        self.btn_clear_filter = QPushButton("✖ Clear")
+        self.btn_export = QPushButton("📤 Export")
+        header_layout.addWidget(self.lbl_orders_summary)
         header_layout.addWidget(self.btn_filter)
+        header_layout.addWidget(self.btn_clear_filter)
         header_layout.addWidget(self.btn_export)
         layout.addLayout(header_layout)
 
-        # Table
-        self.table_orders = QTableWidget()
-        self.table_orders.setColumnCount(7)
-        self.table_orders.setHorizontalHeaderLabels(["ID", "Table", "User", "Total (DA)", "Payment Type", "Date", "Actions"])
-
+        # Table: paged model + painted action buttons, no per-row widgets
+        self.orders_filters = None
+        self.orders_query = OrderController.query_orders()
+        self.orders_model = OrdersTableModel(self.orders_query.page, executor=self.executor, parent=self)
+        self.orders_model.pageLoaded.connect(self._on_orders_page)
+        self.orders_model.loadFailed.connect(
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to load orders:\n{e}"))
+        self.table_orders = QTableView()
+        self.table_orders.setModel(self.orders_model)
+        self.orders_actions = OrderActionsDelegate(self.table_orders)
+        self.orders_actions.actionTriggered.connect(self._on_order_action)
+        self.table_orders.setItemDelegateForColumn(OrdersTableModel.ACTIONS_COLUMN, self.orders_actions)
+        self.table_orders.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_orders.verticalHeader().setVisible(False)
+        self.table_orders.verticalHeader().setDefaultSectionSize(32)
         self.table_orders.horizontalHeader().setStretchLastSection(True)
+        self.table_orders.setColumnWidth(OrdersTableModel.ACTIONS_COLUMN, 280)
         layout.addWidget(self.table_orders)
 
         self.load_orders()
 
         # Connect buttons
         self.btn_filter.clicked.connect(self.filter_orders)
+        self.btn_clear_filter.clicked.connect(self.clear_order_filter)
         self.btn_export.clicked.connect(self.export_orders)
 
         return page
 
     def load_orders(self):
-        orders = OrderController.get_all_orders()
-        self.table_orders.setRowCount(len(orders))
-
-        for i, order in enumerate(orders):
-            self.table_orders.setItem(i, 0, QTableWidgetItem(str(order["id"])))
-            self.table_orders.setItem(i, 1, QTableWidgetItem(str(order["table_number"]) if "table_number" in order.keys() else ""))
-            self.table_orders.setItem(i, 2, QTableWidgetItem(str(order["user_name"]) if "user_name" in order.keys() else ""))
-            self.table_orders.setItem(i, 3, QTableWidgetItem(f"{order['total']:.2f}" if order["total"] else "0.00"))
-            self.table_orders.setItem(i, 4, QTableWidgetItem(order["payment_type"] if "payment_type" in order.keys() else ""))
-            self.table_orders.setItem(i, 5, QTableWidgetItem(order["status"] if "status" in order.keys() else ""))
-
-
-            # --- Add buttons: Reprint | Refund | Details ---
-            btn_reprint = QPushButton("🖨 Reprint")
-            btn_refund = QPushButton("💸 Refund")
-            btn_details = QPushButton("📋 Details")
-
-            btn_reprint.setStyleSheet("background:#0984e3; color:white; border-radius:5px; padding:4px;")
-            btn_refund.setStyleSheet("background:#e84118; color:white; border-radius:5px; padding:4px;")
-            btn_details.setStyleSheet("background:#00b894; color:white; border-radius:5px; padding:4px;")
-
-            btn_reprint.clicked.connect(lambda _, o=order: self.reprint_order(o))
-            btn_refund.clicked.connect(lambda _, o=order: self.refund_order(o))
-            btn_details.clicked.connect(lambda _, o=order: self.show_order_details(o))
-
-            action_layout = QHBoxLayout()
-            action_layout.addWidget(btn_reprint)
-            action_layout.addWidget(btn_refund)
-            action_layout.addWidget(btn_details)
-            action_layout.setContentsMargins(0, 0, 0, 0)
-
-            action_widget = QWidget()
-            action_widget.setLayout(action_layout)
-            self.table_orders.setCellWidget(i, 6, action_widget)
-
+        # first page only; the view asks for more (fetchMore) as it scrolls
+        self.orders_model.reload()
+
+    def _on_order_action(self, action, order):
+        if action == "reprint":
+            self.reprint_order(order)
+        elif action == "refund":
+            self.refund_order(order)
+        elif action == "details":
+            self.show_order_details(order)
+
+
+    def _on_orders_page(self, rows):
+        # the first page of a query carries the count / sum over all matches
+        if rows and "match_count" in rows[0]:
+            self.lbl_orders_summary.setText(
+                f"{rows[0]['match_count']} orders — {rows[0]['match_total']:.2f} DA")
+        elif not rows and self.orders_model.rowCount() == 0:
+            self.lbl_orders_summary.setText("0 orders — 0.00 DA")
 
     def filter_orders(self):
-        dialog = FilterDialog(self)
+        dialog = FilterDialog(self, OrderController.get_filter_options(), self.orders_filters)
         if not dialog.exec():
             return
 
-        filters = dialog.get_filters()
-        orders = OrderController.get_all_orders()
-
-        filtered = []
-        for order in orders:
-            date = order["created_at"].split(" ")[0]
-            if not (filters["start"] <= date <= filters["end"]):
-                continue
-            if filters["payment_type"] != "All" and order["payment_type"] != filters["payment_type"]:
-                continue
-            filtered.append(order)
-
-        self.table_orders.setRowCount(len(filtered))
-        for i, order in enumerate(filtered):
-            self.table_orders.setItem(i, 0, QTableWidgetItem(str(order["id"])))
-            self.table_orders.setItem(i, 1, QTableWidgetItem(order.get("table_name", "")))
-            self.table_orders.setItem(i, 2, QTableWidgetItem(order.get("user_name", "")))
-            self.table_orders.setItem(i, 3, QTableWidgetItem(f"{order['total']:.2f}"))
-            self.table_orders.setItem(i, 4, QTableWidgetItem(order["payment_type"]))
-            self.table_orders.setItem(i, 5, QTableWidgetItem(order["created_at"]))
+        self.orders_filters = dialog.get_filters()
+        self.orders_query = OrderController.query_orders(self.orders_filters)
+        self.orders_model.set_fetcher(self.orders_query.page)
 
+    def clear_order_filter(self):
+        self.orders_filters = None
+        self.orders_query = OrderController.query_orders()
+        self.orders_model.set_fetcher(self.orders_query.page)
 
     def export_orders(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Export Orders", "", "CSV Files (*.csv)")
+        """Export the orders of the current filter (optionally line by line) in the background."""
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Export Orders", "orders.csv", "CSV Files (*.csv);;Excel Files (*.xlsx);;PDF Files (*.pdf)")
         if not path:
             return
-        orders = OrderController.get_all()
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Table", "User", "Total (DA)", "Payment Type", "Date"])
-            for o in orders:
-                writer.writerow([o["id"], o["table_name"], o["user_name"], o["total"], o["payment_type"], o["created_at"]])
-        QMessageBox.information(self, "Export Complete", f"Orders exported to:\n{path}")
+        if not os.path.splitext(path)[1]:
+            path += "." + selected.split("*.")[-1].rstrip(")")
+        lines = QMessageBox.question(
+            self, "Export Orders", "Include the order lines (one row per product)?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes
+
+        reporter, dialog = self._progress_dialog("Export Orders", "Exporting orders…")
+        self.btn_export.setEnabled(False)
+
+        def finished(count):
+            dialog.reset()
+            self.btn_export.setEnabled(True)
+            QMessageBox.information(self, "Export Complete", f"{count} rows exported to:\n{path}")
+
+        def failed(error):
+            dialog.reset()
+            self.btn_export.setEnabled(True)
+            if reporter.cancelled():
+                QMessageBox.information(self, "Export Cancelled", "Export cancelled, no file was written.")
+            else:
+                QMessageBox.critical(self, "Export Failed", f"Export failed:\n{error}")
+
+        # exports whatever the current filter shows
+        self.executor.submit("orders-export", export_orders, path, self.orders_query, lines=lines,
+                             progress=reporter.report, cancelled=reporter.cancelled,
+                             on_result=finished, on_error=failed)
 
 
     def reprint_order(self, order):
@@ -667,7 +766,7 @@ class AdminDashboard(QMainWindow):
         header_layout.addWidget(lbl)
         header_layout.addStretch()
 
-        btn_scan = QPushButton("🔍 Scan Printers")
+        btn_scan = self.btn_scan_printers = QPushButton("🔍 Scan Printers")
         btn_add = QPushButton("➕ Add Printer")
         btn_delete = QPushButton("🗑 Delete Printer")
         btn_assign = QPushButton("🔧 Assign Category")
@@ -705,10 +804,24 @@ class AdminDashboard(QMainWindow):
 
 
 
+        # --- Live status from the USB hotplug watcher / scans and the health monitor
+        self._printer_rows = {}
+        self.printer_status = PrinterStatusBridge(printer_discovery, self)
+        self.printer_status.statusChanged.connect(self._on_printer_status)
+        self.printer_health = PrinterStatusBridge(printer_health, self)
+        self.printer_health.statusChanged.connect(self._on_printer_status)
+
         # --- Initial load
         self.load_printers()
 
         return page
+
+    def _on_printer_status(self, changes):
+        """Update only the Status cells of the printers whose status changed."""
+        for printer_id, status in changes.items():
+            row = self._printer_rows.get(printer_id)
+            if row is not None:
+                self.table_printers.setItem(row, 5, QTableWidgetItem(status))
     
     def refresh_printers(self):
         self.load_printers()
@@ -717,6 +830,8 @@ class AdminDashboard(QMainWindow):
     def load_printers(self):
         # Clear old rows
         self.table_printers.setRowCount(0)
+        self._printer_rows = {}
+        printer_health.check_soon()  # fresh status for new / edited printers
 
         printers = PrinterController.get_all()
         if not printers:
@@ -726,6 +841,7 @@ class AdminDashboard(QMainWindow):
         self.table_printers.setRowCount(len(printers))
 
         for row, p in enumerate(printers):
+            self._printer_rows[p["id"]] = row
             self.table_printers.setItem(row, 0, QTableWidgetItem(str(p.get("id", ""))))
             self.table_printers.setItem(row, 1, QTableWidgetItem(p.get("name", "")))
             self.table_printers.setItem(row, 2, QTableWidgetItem(p.get("connection", "")))
@@ -754,21 +870,33 @@ class AdminDashboard(QMainWindow):
 
 
     def scan_printers(self):
-        """Scan USB printers (PyUSB) and allow the user to add them."""
-        printers = PrinterController.detect_usb_printers()
-
+        """Scan USB printers and the local network (port 9100) in the background."""
+        self.btn_scan_printers.setEnabled(False)
+        self.btn_scan_printers.setText("⏳ Scanning…")
+        self.executor.submit("printer-scan", printer_discovery.scan,
+                             on_result=self._show_scanned_printers, on_error=self._scan_failed)
+
+    def _scan_done(self):
+        self.btn_scan_printers.setEnabled(True)
+        self.btn_scan_printers.setText("🔍 Scan Printers")
+
+    def _scan_failed(self, error):
+        self._scan_done()
+        QMessageBox.warning(self, "Scan Failed", f"Printer scan failed:\n{error}")
+
+    def _show_scanned_printers(self, printers):
+        """Let the user add the printers found by scan_printers."""
+        self._scan_done()
         if not printers:
-            QMessageBox.information(self, "Scan Complete", "No USB printers found.")
+            QMessageBox.information(self, "Scan Complete", "No USB or network printers found.")
             return
 
-        existing = [p["name"] for p in Printer.all()]
-
         dialog = QDialog(self)
-        dialog.setWindowTitle("Detected USB Printers")
+        dialog.setWindowTitle("Detected Printers")
         dialog.resize(500, 400)
 
         layout = QVBoxLayout(dialog)
-        layout.addWidget(QLabel("Select USB printers to add:"))
+        layout.addWidget(QLabel("Select printers to add:"))
 
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -778,16 +906,23 @@ class AdminDashboard(QMainWindow):
         checkboxes = []
         for p in printers:
             name = p.get("name", "Unknown")
-            vid = p.get("vendor_id", "N/A")
-            pid = p.get("product_id", "N/A")
-            serial = p.get("serial_number", "N/A")
-
-            info = (
-                f"🖨️ <b>{name}</b><br>"
-                f"<small>Vendor ID: {vid}<br>"
-                f"Product ID: {pid}<br>"
-                f"Serial: {serial}</small>"
-            )
+            if p.get("connection") == "network":
+                info = (
+                    f"🌐 <b>{name}</b><br>"
+                    f"<small>IP: {p.get('ip')}<br>"
+                    f"Port: {p.get('port')}</small>"
+                )
+            else:
+                vid = p.get("vendor_id", "N/A")
+                pid = p.get("product_id", "N/A")
+                serial = p.get("serial_number", "N/A")
+
+                info = (
+                    f"🖨️ <b>{name}</b><br>"
+                    f"<small>Vendor ID: {vid}<br>"
+                    f"Product ID: {pid}<br>"
+                    f"Serial: {serial}</small>"
+                )
 
             chk = QCheckBox()
             lbl_info = QLabel(info)
@@ -799,7 +934,7 @@ class AdminDashboard(QMainWindow):
             row_layout.addWidget(lbl_info)
             row_layout.addStretch()
 
-            if name in existing:
+            if p.get("known"):
                 chk.setDisabled(True)
                 lbl_info.setText(f"🖨️ <b>{name}</b> <small>(already added)</small>")
 
@@ -819,20 +954,24 @@ class AdminDashboard(QMainWindow):
                 return
 
             added_count = 0
+            existing = {p["name"] for p in Printer.all()}
             for chk, printer in selected:
                 name = printer.get("name", "")
-                if any(p["name"] == name for p in Printer.all()):
+                if name in existing:
                     continue
 
                 Printer.create(
                     name=name,
-                    connection_type="usb",
+                    connection_type=printer.get("connection", "usb"),
                     vendor_id=printer.get("vendor_id"),
                     product_id=printer.get("product_id"),
                     serial_number=printer.get("serial_number"),
+                    ip_address=printer.get("ip"),
+                    port=printer.get("port"),
                     assigned_categories="[]",
                     status="online"
                 )
+                existing.add(name)
                 added_count += 1
 
             QMessageBox.information(dialog, "Success", f"Added {added_count} printer(s).")
@@ -964,17 +1103,12 @@ class AdminDashboard(QMainWindow):
             QMessageBox.warning(self, "Error", "Printer name is required")
             return
 
-        # Determine printer type based on connection
-        printer_type = connection if connection in ("usb", "network") else "manual"
-
-
         Printer.create(
             name=name,
-            type=printer_type,          # type now matches the allowed values in DB
-            connection=connection,      # keep connection info as descriptive
+            connection_type=connection,  # usb / network; anything else is stored as manual
             ip_address=ip,
             port=None,
-            categories=[c.strip() for c in categories.split(",") if c.strip()],
+            assigned_categories=categories,
             status="online"
         )
 
@@ -1045,6 +1179,7 @@ class AdminDashboard(QMainWindow):
             self.btn_printers.setVisible(False)
             self.btn_categories.setVisible(False)
             self.btn_tables.setVisible(False)
+            self.btn_diagnostics.setVisible(False)
 
         elif self.role == "kitchen":
             # Kitchen only sees Orders
@@ -1055,11 +1190,13 @@ class AdminDashboard(QMainWindow):
             self.btn_printers.setVisible(False)
             self.btn_users.setVisible(False)
             self.btn_settings.setVisible(False)
+            self.btn_diagnostics.setVisible(False)
 
         elif self.role == "manager":
             # Manager can view reports and orders but not users/settings
             self.btn_users.setVisible(False)
             self.btn_settings.setVisible(False)
+            self.btn_diagnostics.setVisible(False)
 
         elif self.role == "admin":
             # Full access
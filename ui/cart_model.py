@@ -0,0 +1,124 @@
+# ui/cart_model.py
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CartModel(QObject):
+    """
+    POS cart keyed by product_id, kept in insertion order, with running totals.
+    Emits row-level signals so the view only touches the row that changed.
+    Iterating yields line dicts {product_id, name, price, cost, qty}.
+    """
+
+    rowInserted = pyqtSignal(int)
+    rowChanged = pyqtSignal(int)
+    rowRemoved = pyqtSignal(int)
+    modelReset = pyqtSignal()
+    totalsChanged = pyqtSignal(float, float)  # total, total_cost
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines = {}   # product_id -> line
+        self._order = []   # product_ids by row
+        self._rows = {}    # product_id -> row
+        self.total = 0.0
+        self.total_cost = 0.0
+
+    # --- read access ---
+    def __iter__(self):
+        return iter([self._lines[pid] for pid in self._order])
+
+    def __len__(self):
+        return len(self._order)
+
+    def __bool__(self):
+        return bool(self._order)
+
+    def line(self, product_id):
+        return self._lines.get(product_id)
+
+    def line_at(self, row):
+        return self._lines[self._order[row]] if 0 <= row < len(self._order) else None
+
+    def row_of(self, product_id):
+        return self._rows.get(product_id, -1)
+
+    # --- mutations ---
+    def _apply_delta(self, line, delta):
+        self.total += line["price"] * delta
+        if line.get("cost") is not None:
+            self.total_cost += line["cost"] * delta
+
+    def _emit_totals(self):
+        self.totalsChanged.emit(self.total, self.total_cost)
+
+    def add(self, product, qty=1):
+        pid = product.get("id", product.get("product_id"))
+        line = self._lines.get(pid)
+        if line:
+            self.change_qty(pid, qty)
+            return
+
+        line = {
+            "product_id": pid,
+            "name": product.get("name", "Item"),
+            "price": float(product.get("price") or 0),
+            "cost": float(product.get("cost") or 0) if product.get("cost") is not None else None,
+            "qty": qty,
+        }
+        self._lines[pid] = line
+        self._rows[pid] = len(self._order)
+        self._order.append(pid)
+        self._apply_delta(line, qty)
+        self.rowInserted.emit(self._rows[pid])
+        self._emit_totals()
+
+    def change_qty(self, product_id, delta):
+        line = self._lines.get(product_id)
+        if not line:
+            return
+        if line["qty"] + delta <= 0:
+            self.remove(product_id)
+            return
+        line["qty"] += delta
+        self._apply_delta(line, delta)
+        self.rowChanged.emit(self._rows[product_id])
+        self._emit_totals()
+
+    def set_qty(self, product_id, qty):
+        line = self._lines.get(product_id)
+        if line:
+            self.change_qty(product_id, qty - line["qty"])
+
+    def remove(self, product_id):
+        line = self._lines.pop(product_id, None)
+        if not line:
+            return
+        row = self._rows.pop(product_id)
+        del self._order[row]
+        for r in range(row, len(self._order)):
+            self._rows[self._order[r]] = r
+        self._apply_delta(line, -line["qty"])
+        if not self._order:
+            # no drift once empty
+            self.total = self.total_cost = 0.0
+        self.rowRemoved.emit(row)
+        self._emit_totals()
+
+    def load(self, lines):
+        """Replace the whole cart (e.g. a table's pending order)."""
+        self._lines, self._order, self._rows = {}, [], {}
+        self.total = self.total_cost = 0.0
+        for line in lines:
+            pid = line["product_id"]
+            if pid in self._lines:
+                self._lines[pid]["qty"] += line["qty"]
+            else:
+                self._lines[pid] = dict(line)
+                self._rows[pid] = len(self._order)
+                self._order.append(pid)
+            self._apply_delta(line, line["qty"])
+        self.modelReset.emit()
+        self._emit_totals()
+
+    def clear(self):
+        self.load([])
@@ -0,0 +1,156 @@
+# ui/diagnostics_page.py
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QDoubleSpinBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from models.database import pool_stats
+from models.query_profiler import profiler
+from models.settings import Settings
+
+
+class DiagnosticsPage(QWidget):
+    """Query profiler (models.query_profiler) and connection pool counters, refreshed while visible."""
+
+    REFRESH_MS = 2000
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+
+        # --- Controls ---
+        controls = QHBoxLayout()
+        self.chk_enabled = QCheckBox("Profile SQL queries")
+        self.chk_enabled.setChecked(profiler.enabled)
+        self.chk_enabled.toggled.connect(self.toggle_profiler)
+        self.spin_slow = QDoubleSpinBox()
+        self.spin_slow.setRange(1, 10000)
+        self.spin_slow.setSuffix(" ms")
+        self.spin_slow.setValue(profiler.slow_ms)
+        self.spin_slow.valueChanged.connect(self.set_slow_ms)
+        self.btn_refresh = QPushButton("🔄 Refresh")
+        self.btn_reset = QPushButton("🧹 Reset")
+        self.btn_dump = QPushButton("💾 Dump…")
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_reset.clicked.connect(self.reset)
+        self.btn_dump.clicked.connect(self.dump)
+        controls.addWidget(self.chk_enabled)
+        controls.addWidget(QLabel("Slow above:"))
+        controls.addWidget(self.spin_slow)
+        controls.addStretch()
+        for btn in (self.btn_refresh, self.btn_reset, self.btn_dump):
+            controls.addWidget(btn)
+        layout.addLayout(controls)
+
+        self.lbl_summary = QLabel()
+        layout.addWidget(self.lbl_summary)
+
+        # --- Tables ---
+        self.tabs = QTabWidget()
+        self.table_statements = self._table(["Calls", "Total ms", "Mean ms", "p95 ms", "Max ms", "Rows",
+                                             "Statement", "Called from"])
+        self.table_n_plus_one = self._table(["Run", "Bursts", "Last", "Statement", "Called from"])
+        self.table_slow = self._table(["At", "ms", "Rows", "Statement", "Called from"])
+        self.tabs.addTab(self.table_statements, "Statements")
+        self.tabs.addTab(self.table_n_plus_one, "N+1 patterns")
+        self.tabs.addTab(self.table_slow, "Slow queries")
+        layout.addWidget(self.tabs)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    @staticmethod
+    def _table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSortingEnabled(True)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(len(headers) - 2, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                item = QTableWidgetItem()
+                if isinstance(value, (int, float)):
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 2) if isinstance(value, float) else value)
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                else:
+                    item.setText(str(value))
+                    item.setToolTip(str(value))
+                table.setItem(r, c, item)
+        table.setSortingEnabled(True)
+
+    # --- live refresh only while the page is shown ---
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = profiler.snapshot(limit=200)
+        pool = pool_stats()
+        state = "on" if snapshot["enabled"] else "off"
+        self.lbl_summary.setText(
+            f"Profiler <b>{state}</b> since {snapshot['started']} | "
+            f"{len(snapshot['statements'])} statements, {len(snapshot['n_plus_one'])} N+1, "
+            f"{len(snapshot['slow'])} slow | "
+            f"Pool: {pool['open']} open, {pool['opened']} opened, {pool['reused']} reused, "
+            f"{pool['health_failures']} health failures"
+        )
+
+        def top_site(sites):
+            return next(iter(sites), "")
+
+        self._fill(self.table_statements, [
+            (s["calls"], s["total_ms"], s["mean_ms"], s["p95_ms"], s["max_ms"], s["rows"], s["sql"],
+             top_site(s["sites"]))
+            for s in snapshot["statements"]
+        ])
+        self._fill(self.table_n_plus_one, [
+            (h["max_run"], h["bursts"], h["last"], h["sql"], h["site"]) for h in snapshot["n_plus_one"]
+        ])
+        self._fill(self.table_slow, [
+            (e["at"], e["ms"], e["rows"], e["sql"], e["site"]) for e in reversed(snapshot["slow"])
+        ])
+        self.tabs.setTabText(1, f"N+1 patterns ({len(snapshot['n_plus_one'])})")
+        self.tabs.setTabText(2, f"Slow queries ({len(snapshot['slow'])})")
+
+    def toggle_profiler(self, checked):
+        if checked:
+            profiler.enable()
+        else:
+            profiler.disable()
+        Settings.save_section("profiler", {"enabled": int(checked)})
+        self.refresh()
+
+    def set_slow_ms(self, value):
+        profiler.slow_ms = value
+        Settings.save_section("profiler", {"slow_ms": value})
+
+    def reset(self):
+        profiler.reset()
+        self.refresh()
+
+    def dump(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save query profile", "query_profile.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            profiler.dump(path)
+            QMessageBox.information(self, "✅ Saved",
+                                    f"Query profile saved to:\n{path}\n\n"
+                                    f"Print it with: python -m models.query_profiler \"{path}\"")
+        except OSError as e:
+            QMessageBox.critical(self, "❌ Error", f"Could not save the profile:\n{e}")
@@ -1,13 +1,15 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QDateEdit, QComboBox,
-    QPushButton, QLabel, QFrame
+    QPushButton, QLabel, QFrame, QDoubleSpinBox, QLineEdit
 )
 from PyQt6.QtCore import QDate, Qt
 from PyQt6.QtGui import QFont
 
 class FilterDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, options=None, filters=None):
+        """options: Order.filter_options(); filters: previous get_filters() result to pre-fill."""
         super().__init__(parent)
+        options = options or {}
         self.setWindowTitle("🔎 Filter Orders")
         self.setFixedWidth(360)
         self.setStyleSheet("""
@@ -20,14 +22,14 @@ class FilterDialog(QDialog):
                 color: #2f3640;
                 font-weight: bold;
             }
-            QDateEdit, QComboBox {
+            QDateEdit, QComboBox, QDoubleSpinBox, QLineEdit {
                 border: 1px solid #dcdde1;
                 border-radius: 6px;
                 padding: 6px;
                 font-size: 13px;
                 background-color: white;
             }
-            QDateEdit:hover, QComboBox:hover {
+            QDateEdit:hover, QComboBox:hover, QDoubleSpinBox:hover, QLineEdit:hover {
                 border: 1px solid #4cd137;
             }
             QPushButton {
@@ -76,10 +78,47 @@ class FilterDialog(QDialog):
         self.payment_combo = QComboBox()
         self.payment_combo.addItem("All")
         self.payment_combo.addItems(["Cash", "Card", "Other"])
+        for payment_type in options.get("payment_types", []):
+            if self.payment_combo.findText(payment_type, Qt.MatchFlag.MatchFixedString) < 0:
+                self.payment_combo.addItem(payment_type)
+
+        # Status / user / table
+        self.status_combo = QComboBox()
+        self.status_combo.addItem("All")
+        self.status_combo.addItems(options.get("statuses", []))
+
+        self.user_combo = QComboBox()
+        self.user_combo.addItem("All", None)
+        for user in options.get("users", []):
+            self.user_combo.addItem(user["username"], user["id"])
+
+        self.table_combo = QComboBox()
+        self.table_combo.addItem("All", None)
+        for table in options.get("tables", []):
+            self.table_combo.addItem(f"Table {table['table_number']}", table["id"])
+
+        # Total range (0 = no bound)
+        self.min_total = QDoubleSpinBox()
+        self.max_total = QDoubleSpinBox()
+        for spin in (self.min_total, self.max_total):
+            spin.setRange(0, 10_000_000)
+            spin.setDecimals(2)
+            spin.setSuffix(" DA")
+            spin.setSpecialValueText("Any")
+
+        # Order number
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("e.g. 1024")
 
         form_layout.addRow("📅 Start Date:", self.start_date)
         form_layout.addRow("📆 End Date:", self.end_date)
         form_layout.addRow("💳 Payment Type:", self.payment_combo)
+        form_layout.addRow("📌 Status:", self.status_combo)
+        form_layout.addRow("👤 User:", self.user_combo)
+        form_layout.addRow("🪑 Table:", self.table_combo)
+        form_layout.addRow("⬇ Min Total:", self.min_total)
+        form_layout.addRow("⬆ Max Total:", self.max_total)
+        form_layout.addRow("# Order:", self.search_edit)
 
         layout.addWidget(frame)
 
@@ -89,9 +128,37 @@ class FilterDialog(QDialog):
 
         self.btn_apply.clicked.connect(self.accept)
 
+        if filters:
+            self.set_filters(filters)
+
+    def set_filters(self, filters):
+        if filters.get("start"):
+            self.start_date.setDate(QDate.fromString(filters["start"], "yyyy-MM-dd"))
+        if filters.get("end"):
+            self.end_date.setDate(QDate.fromString(filters["end"], "yyyy-MM-dd"))
+        for combo, text in ((self.payment_combo, filters.get("payment_type")),
+                            (self.status_combo, filters.get("status"))):
+            index = combo.findText(text or "All", Qt.MatchFlag.MatchFixedString)
+            if index >= 0:
+                combo.setCurrentIndex(index)
+        for combo, value in ((self.user_combo, filters.get("user_id")),
+                             (self.table_combo, filters.get("table_id"))):
+            index = combo.findData(value)
+            if index >= 0:
+                combo.setCurrentIndex(index)
+        self.min_total.setValue(filters.get("min_total") or 0)
+        self.max_total.setValue(filters.get("max_total") or 0)
+        self.search_edit.setText(filters.get("search") or "")
+
     def get_filters(self):
         return {
             "start": self.start_date.date().toString("yyyy-MM-dd"),
             "end": self.end_date.date().toString("yyyy-MM-dd"),
-            "payment_type": self.payment_combo.currentText()
+            "payment_type": self.payment_combo.currentText(),
+            "status": self.status_combo.currentText(),
+            "user_id": self.user_combo.currentData(),
+            "table_id": self.table_combo.currentData(),
+            "min_total": self.min_total.value() or None,
+            "max_total": self.max_total.value() or None,
+            "search": self.search_edit.text().strip(),
         }
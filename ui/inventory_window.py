@@ -4,12 +4,15 @@ from PyQt6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QDialog,
     QFormLayout, QLineEdit, QDoubleSpinBox, QMessageBox
 )
+from PyQt6.QtCore import Qt
 from controllers.inventory_controller import InventoryController
+from ui.workers import QueryExecutor
 
 class InventoryPage(QWidget):
     def __init__(self):
         super().__init__()
         self.setLayout(QVBoxLayout())
+        self.executor = QueryExecutor(self, max_threads=1)
 
         # --- Top Buttons ---
         btn_layout = QHBoxLayout()
@@ -33,10 +36,16 @@ class InventoryPage(QWidget):
         self.load_items()
 
     def load_items(self):
+        # rows stream in from a worker thread; a second refresh cancels the first
         self.table.setRowCount(0)
-        items = InventoryController.get_all()
-        for row_idx, item in enumerate(items):
-            self.table.insertRow(row_idx)
+        self.executor.submit("items", InventoryController.iter_all, stream=True,
+                             on_chunk=self._append_items,
+                             on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to load inventory:\n{e}"))
+
+    def _append_items(self, items):
+        first = self.table.rowCount()
+        self.table.setRowCount(first + len(items))
+        for row_idx, item in enumerate(items, start=first):
             for col_idx, key in enumerate(["id", "name", "quantity", "unit", "min_quantity", "cost", "product_name"]):
                 value = item[key] if key in item.keys() else ""
                 cell = QTableWidgetItem(str(value))
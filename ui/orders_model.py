@@ -0,0 +1,164 @@
+# ui/orders_model.py
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRectF, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter
+
+
+class OrdersTableModel(QAbstractTableModel):
+    """
+    Orders, newest first, fetched page by page as the view scrolls (canFetchMore/fetchMore).
+    fetch_page(after, limit) returns order dicts after the (created_at, id) cursor;
+    with an executor the pages are loaded on a worker thread.
+    """
+
+    OrderRole = Qt.ItemDataRole.UserRole + 1
+    COLUMNS = [
+        ("ID", "id"),
+        ("Table", "table_name"),
+        ("User", "user_name"),
+        ("Total (DA)", "total"),
+        ("Payment Type", "payment_type"),
+        ("Date", "created_at"),
+        ("Actions", None),
+    ]
+    ACTIONS_COLUMN = 6
+
+    pageLoaded = pyqtSignal(list)
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, fetch_page=None, executor=None, page_size=200, parent=None):
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self._executor = executor
+        self.page_size = page_size
+        self._rows = []
+        self._exhausted = fetch_page is None
+        self._loading = False
+
+    # --- Qt model API ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        order = self._rows[index.row()]
+        key = self.COLUMNS[index.column()][1]
+        if role == self.OrderRole:
+            return order
+        if role == Qt.ItemDataRole.DisplayRole and key:
+            value = order.get(key)
+            if key == "total":
+                return f"{value or 0:.2f}"
+            return "" if value is None else str(value)
+        if role == Qt.ItemDataRole.TextAlignmentRole and key in ("id", "total"):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last["created_at"], last["id"])
+        if self._executor is not None:
+            self._executor.submit("orders-page", self._fetch_page, after, self.page_size,
+                                  on_result=self._append_page, on_error=self._page_failed)
+        else:
+            self._append_page(self._fetch_page(after, self.page_size))
+
+    # --- loading ---
+    def _append_page(self, rows):
+        self._loading = False
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        self.pageLoaded.emit(rows)
+
+    def _page_failed(self, error):
+        self._loading = False
+        self._exhausted = True
+        self.loadFailed.emit(error)
+
+    def reload(self):
+        """Drop loaded pages and start again from the newest order."""
+        if self._executor is not None:
+            self._executor.cancel("orders-page")
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = self._fetch_page is None
+        self._loading = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_fetcher(self, fetch_page):
+        """Page through a different source (e.g. a filtered query) from the top."""
+        self._fetch_page = fetch_page
+        self.reload()
+
+    def order_at(self, row):
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+
+class OrderActionsDelegate(QStyledItemDelegate):
+    """Paints Reprint / Refund / Details buttons in the actions column and reports clicks."""
+
+    ACTIONS = [
+        ("reprint", "🖨 Reprint", "#0984e3"),
+        ("refund", "💸 Refund", "#e84118"),
+        ("details", "📋 Details", "#00b894"),
+    ]
+
+    actionTriggered = pyqtSignal(str, dict)  # action, order
+
+    def _button_rects(self, rect):
+        rect = QRectF(rect).adjusted(3, 3, -3, -3)
+        gap = 4
+        width = (rect.width() - gap * (len(self.ACTIONS) - 1)) / len(self.ACTIONS)
+        return [QRectF(rect.left() + i * (width + gap), rect.top(), width, rect.height())
+                for i in range(len(self.ACTIONS))]
+
+    def sizeHint(self, option, index):
+        return QSize(270, 30)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        painter.setFont(option.font)
+        for (_, label, color), rect in zip(self.ACTIONS, self._button_rects(option.rect)):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(rect, 5, 5)
+            painter.setPen(QColor("white"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            pos = event.position()
+            for (action, _, _), rect in zip(self.ACTIONS, self._button_rects(option.rect)):
+                if rect.contains(pos):
+                    order = index.data(OrdersTableModel.OrderRole)
+                    if order is not None:
+                        self.actionTriggered.emit(action, order)
+                    return True
+        return False
@@ -1,17 +1,14 @@
 # ui/pos_window.py
 import sys
 from functools import partial
-import cups
 import time
-import os
-import tempfile
 import sqlite3
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFrame, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QScrollArea, QGridLayout, QTableWidget, QTableWidgetItem,
     QSizePolicy, QLineEdit, QInputDialog, QMessageBox, QSpacerItem, QSizePolicy as QSP
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import QSizePolicy as QSP, QSpacerItem
 from models.database import get_connection
@@ -19,6 +16,14 @@ from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem
 from datetime import datetime
 import json
 from controllers.order_controller import OrderController
+from models.catalog import catalog
+from models.product_search import product_index
+from models.printer_routing import printer_routing
+from ui.product_grid import ProductGridView
+from ui.cart_model import CartModel
+from ui.workers import SpoolerBridge
+from controllers.print_spooler import spooler, cups_target, SpoolerFull
+from controllers.kitchen_dispatch import kitchen_dispatch
 
 # try import project controllers/models; handle gracefully if absent
 try:
@@ -59,13 +64,14 @@ class POSWindow(QMainWindow):
         self.role = role
         self.current_user_id = user_id
         self.selected_table = None
+        self.current_order_id = None  # pending order loaded into the cart (edited in place on execute)
         self.cart_items = []  # ✅ initialize empty cart list
 
         self.setWindowTitle("🍟 FastFood — POS")
         self.setGeometry(100, 80, 1250, 760)
 
-        # cart: list of dicts {product_id, name, price, cost(optional), qty}
-        self.cart = []
+        # cart: CartModel keyed by product_id; yields {product_id, name, price, cost(optional), qty}
+        self.cart = CartModel(self)
 
         # central
         central = QWidget()
@@ -90,6 +96,17 @@ class POSWindow(QMainWindow):
         self.load_products()  # all products by default
         self.update_cart_table()
 
+        # row-level updates: a quantity tap touches one row and the totals labels
+        self.cart.rowInserted.connect(self._on_cart_row_inserted)
+        self.cart.rowChanged.connect(self._on_cart_row_changed)
+        self.cart.rowRemoved.connect(self._on_cart_row_removed)
+        self.cart.modelReset.connect(self.update_cart_table)
+        self.cart.totalsChanged.connect(self._on_cart_totals)
+
+        # print jobs run in the spooler; show their progress in the status bar
+        self.print_status = SpoolerBridge(spooler, self)
+        self.print_status.jobChanged.connect(self._on_print_job)
+
     # -----------------------
     # UI Builders
     # -----------------------
@@ -138,6 +155,12 @@ class POSWindow(QMainWindow):
         """)
         self.search_input.textChanged.connect(self._on_search)
 
+        # debounce: query the search index once typing pauses, not on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._run_search)
+
         # Selected table label
         self.lbl_selected_table = QLabel("Table: —")
         self.lbl_selected_table.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -218,14 +241,10 @@ class POSWindow(QMainWindow):
         ptitle.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
         prod_layout.addWidget(ptitle)
 
-        # grid area inside scroll
-        self.prod_scroll = QScrollArea()
-        self.prod_scroll.setWidgetResizable(True)
-        self.prod_container = QWidget()
-        self.prod_grid = QGridLayout(self.prod_container)
-        self.prod_grid.setSpacing(10)
-        self.prod_scroll.setWidget(self.prod_container)
-        prod_layout.addWidget(self.prod_scroll)
+        # virtualized grid: cards are painted by a delegate, nothing rebuilt per filter change
+        self.product_view = ProductGridView()
+        self.product_view.productActivated.connect(self.add_to_cart)
+        prod_layout.addWidget(self.product_view)
 
         area_layout.addWidget(prod_card, 26)
 
@@ -303,17 +322,7 @@ class POSWindow(QMainWindow):
             if w:
                 w.setParent(None)
 
-        cats = []
-        if Category:
-            try:
-                cats = getattr(Category, "all", getattr(Category, "get_all", lambda: []) )()
-            except Exception:
-                try:
-                    cats = Category.all()
-                except Exception:
-                    cats = []
-        else:
-            cats = []
+        cats = catalog.categories()
 
         # "All" button
         btn_all = QPushButton("All")
@@ -332,157 +341,70 @@ class POSWindow(QMainWindow):
             self.scroll_cat_layout.addWidget(btn)
 
     def load_products(self, category_id=None, search_term=""):
-        # clear grid
-        for i in reversed(range(self.prod_grid.count())):
-            item = self.prod_grid.itemAt(i)
-            if item:
-                w = item.widget()
-                if w:
-                    w.setParent(None)
-
-        products = []
-        if Product:
-            # try common APIs
-            try:
-                getter = getattr(Product, "all", getattr(Product, "get_all", None))
-                if getter:
-                    products = getter()
-                else:
-                    products = []
-            except Exception:
-                try:
-                    products = Product.get_all()
-                except Exception:
-                    products = []
+        # served from the in-memory catalog, no SQLite round trip per click / keystroke
+        if category_id is not None:
+            products = catalog.products_in_category(category_id)
         else:
-            products = []
-
-        # filter by category & search
-        def matches(p):
-            if category_id is not None:
-                pid_cat = p.get("category_id") if isinstance(p, dict) else None
-                try:
-                    if int(pid_cat) != int(category_id):
-                        return False
-                except Exception:
-                    return False
-            if search_term:
-                name = p.get("name", "") if isinstance(p, dict) else str(p)
-                if search_term.lower() not in name.lower():
-                    return False
-            return True
-
+            products = catalog.products()
 
-        # if products might be sqlite3.Row, convert to dict-like safely
-        pr_list = []
-        for p in products:
-            try:
-                pr = dict(p)
-            except Exception:
-                # maybe p is object or dict already
-                pr = p if isinstance(p, dict) else {"id": getattr(p, "id", None), "name": str(p)}
-            pr_list.append(pr)
-
-        filtered = [p for p in pr_list if matches(p)]
-
-        # grid rendering: 3 columns
-        cols = 3
-        for idx, p in enumerate(filtered):
-            r = idx // cols
-            c = idx % cols
-            card = self._make_product_card(p)
-            self.prod_grid.addWidget(card, r, c)
-
-    def _make_product_card(self, product):
-        # product is dict-like
-        pid = product.get("id")
-        name = product.get("name", "Unknown")
-        price = product.get("price", 0.0) or 0.0
-        cost = product.get("cost", None)
-
-        card = QFrame()
-        card.setObjectName("prod_card")
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(10, 10, 10, 10)
-        layout.setSpacing(6)
-
-        lbl_name = QLabel(name)
-        lbl_name.setWordWrap(True)
-        lbl_name.setFont(QFont("Segoe UI", 10, QFont.Weight.Medium))
-        layout.addWidget(lbl_name)
-
-        lbl_price = QLabel(f"Price: {price:.2f} DA")
-        layout.addWidget(lbl_price)
-
-        if cost is not None:
-            try:
-                cost_f = float(cost)
-                lbl_cost = QLabel(f"Cost: {cost_f:.2f} DA")
-                lbl_cost.setStyleSheet("color: #666; font-size: 12px;")
-                layout.addWidget(lbl_cost)
-            except Exception:
-                pass
-
-        btn_add = QPushButton("➕ Add")
-        btn_add.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn_add.clicked.connect(partial(self.add_to_cart, product))
-        layout.addStretch()
-        layout.addWidget(btn_add)
+        if search_term:
+            # ranked, accent/case-insensitive prefix + trigram lookup
+            filtered = product_index.search(search_term, category_id=category_id)
+        else:
+            filtered = products
 
-        return card
+        # rebinding the model is all a category switch costs
+        self.product_view.set_products(filtered)
 
     # -----------------------
     # Cart operations
     # -----------------------
     def add_to_cart(self, product):
         pid = product.get("id")
-        # find in cart
-        for item in self.cart:
-            if item["product_id"] == pid:
-                item["qty"] += 1
-                self.update_cart_table()
-                return
-
-        # else add new
-        self.cart.append({
-            "product_id": pid,
-            "name": product.get("name", "Item"),
-            "price": float(product.get("price") or 0),
-            "cost": float(product.get("cost") or 0) if product.get("cost") is not None else None,
-            "qty": 1
-        })
-        self.update_cart_table()
+        # use the current catalog entry so price edits apply without reloading the grid
+        product = catalog.product(pid) or product
+        self.cart.add(product)
 
     def update_cart_table(self):
+        """Full rebuild; only used when the whole cart is replaced."""
         self.table_cart.setRowCount(0)
-        total = 0.0
-        total_cost = 0.0
-        for row_idx, item in enumerate(self.cart):
-            self.table_cart.insertRow(row_idx)
-            self.table_cart.setItem(row_idx, 0, QTableWidgetItem(item["name"]))
-            self.table_cart.setItem(row_idx, 1, QTableWidgetItem(str(item["qty"])))
-            self.table_cart.setItem(row_idx, 2, QTableWidgetItem(f"{item['price'] * item['qty']:.2f}"))
-
-            # actions cell: + / - / remove
-            btns = QWidget()
-            b_layout = QHBoxLayout(btns)
-            b_layout.setContentsMargins(0, 0, 0, 0)
-            inc = QPushButton("+")
-            dec = QPushButton("-")
-            rem = QPushButton("✖")
-            inc.setFixedSize(QSize(28, 24)); dec.setFixedSize(QSize(28, 24)); rem.setFixedSize(QSize(28, 24))
-            inc.clicked.connect(partial(self._change_qty, row_idx, 1))
-            dec.clicked.connect(partial(self._change_qty, row_idx, -1))
-            rem.clicked.connect(partial(self._remove_item, row_idx))
-            b_layout.addWidget(inc)
-            b_layout.addWidget(dec)
-            b_layout.addWidget(rem)
-            self.table_cart.setCellWidget(row_idx, 3, btns)
-
-            total += item["price"] * item["qty"]
-            if item.get("cost") is not None:
-                total_cost += item["cost"] * item["qty"]
-
+        for row_idx in range(len(self.cart)):
+            self._on_cart_row_inserted(row_idx)
+        self._on_cart_totals(self.cart.total, self.cart.total_cost)
+
+    def _on_cart_row_inserted(self, row_idx):
+        item = self.cart.line_at(row_idx)
+        pid = item["product_id"]
+        self.table_cart.insertRow(row_idx)
+        self.table_cart.setItem(row_idx, 0, QTableWidgetItem(item["name"]))
+        self.table_cart.setItem(row_idx, 1, QTableWidgetItem(str(item["qty"])))
+        self.table_cart.setItem(row_idx, 2, QTableWidgetItem(f"{item['price'] * item['qty']:.2f}"))
+
+        # actions cell: + / - / remove (bound to the product, so rows can shift freely)
+        btns = QWidget()
+        b_layout = QHBoxLayout(btns)
+        b_layout.setContentsMargins(0, 0, 0, 0)
+        inc = QPushButton("+")
+        dec = QPushButton("-")
+        rem = QPushButton("✖")
+        inc.setFixedSize(QSize(28, 24)); dec.setFixedSize(QSize(28, 24)); rem.setFixedSize(QSize(28, 24))
+        inc.clicked.connect(partial(self._change_qty, pid, 1))
+        dec.clicked.connect(partial(self._change_qty, pid, -1))
+        rem.clicked.connect(partial(self._remove_item, pid))
+        b_layout.addWidget(inc)
+        b_layout.addWidget(dec)
+        b_layout.addWidget(rem)
+        self.table_cart.setCellWidget(row_idx, 3, btns)
+
+    def _on_cart_row_changed(self, row_idx):
+        item = self.cart.line_at(row_idx)
+        self.table_cart.item(row_idx, 1).setText(str(item["qty"]))
+        self.table_cart.item(row_idx, 2).setText(f"{item['price'] * item['qty']:.2f}")
+
+    def _on_cart_row_removed(self, row_idx):
+        self.table_cart.removeRow(row_idx)
+
+    def _on_cart_totals(self, total, total_cost):
         self.lbl_total.setText(f"Total: {total:.2f} DA")
         if total_cost:
             profit = total - total_cost
@@ -490,36 +412,27 @@ class POSWindow(QMainWindow):
         else:
             self.lbl_profit.setText("")
 
-    def _change_qty(self, row_idx, delta):
-        if row_idx < 0 or row_idx >= len(self.cart):
-            return
-        self.cart[row_idx]["qty"] += delta
-        if self.cart[row_idx]["qty"] <= 0:
-            self.cart.pop(row_idx)
-        self.update_cart_table()
+    def _change_qty(self, product_id, delta):
+        self.cart.change_qty(product_id, delta)
 
-    def _remove_item(self, row_idx):
-        if 0 <= row_idx < len(self.cart):
-            self.cart.pop(row_idx)
-            self.update_cart_table()
+    def _remove_item(self, product_id):
+        self.cart.remove(product_id)
 
     def clear_cart(self):
         if not self.cart:
             return
         confirm = QMessageBox.question(self, "Clear Cart", "Remove all items from cart?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if confirm == QMessageBox.StandardButton.Yes:
-            self.cart = []
-            self.update_cart_table()
+            self.cart.clear()
 
     def _edit_qty(self, row, col):
         # only allow editing qty cell (col 1)
-        if col != 1 or row < 0 or row >= len(self.cart):
+        item = self.cart.line_at(row)
+        if col != 1 or item is None:
             return
-        current = self.cart[row]["qty"]
-        qty, ok = QInputDialog.getInt(self, "Edit Quantity", "Quantity:", value=current, min=1, max=999)
+        qty, ok = QInputDialog.getInt(self, "Edit Quantity", "Quantity:", value=item["qty"], min=1, max=999)
         if ok:
-            self.cart[row]["qty"] = qty
-            self.update_cart_table()
+            self.cart.set_qty(item["product_id"], qty)
 
     # -----------------------
     # Actions: print / execute
@@ -531,7 +444,7 @@ class POSWindow(QMainWindow):
         try:
             if PrinterController and hasattr(PrinterController, "print_order"):
                 # create minimal order object to print
-                order = {"items": self.cart, "total": sum(i["price"] * i["qty"] for i in self.cart)}
+                order = {"items": list(self.cart), "total": self.cart.total}
                 PrinterController.print_order(order)
                 QMessageBox.information(self, "Printed", "Order sent to printer.")
             else:
@@ -553,56 +466,27 @@ class POSWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", "The cart is empty.")
                 return
 
-            # Compute total from cart
-            total = 0.0
-            for it in self.cart:
-                qty = int(it.get("qty", it.get("quantity", 1)))
-                price = float(it.get("price", 0.0))
-                total += qty * price
-
-            # Create order via controller (returns order_id)
-            order_id = OrderController.create_order(
+            # Save header + all lines in one transaction; category grouping comes back with it
+            # a table reopened with its pending order updates that order instead of adding a new one
+            order_id, items_by_category = OrderController.checkout(
                 table_id=self.selected_table,
                 user_id=self.current_user_id,
-                total=total,
+                cart=list(self.cart),
                 payment_type="cash",
-                status="pending"
+                status="pending",
+                order_id=self.current_order_id
             )
 
             if not order_id:
                 raise Exception("OrderController failed to create order (no id returned).")
 
-            # Insert items via controller
-            for it in self.cart:
-                product_id = it.get("product_id") or it.get("id")
-                qty = int(it.get("qty", it.get("quantity", 1)))
-                price = float(it.get("price", 0.0))
-                OrderController.add_order_item(order_id, product_id, qty, price)
+            self.current_order_id = order_id
 
-            # Optionally send to category printers using existing helper (keeps printing isolated)
-            # We build items_by_category similarly to previous behavior but do it after DB ops:
-            items_by_category = {}
-            try:
-                # group by category for kitchen printers (touch DB only inside controller helpers or short connections)
-                conn = get_connection()
-                cur = conn.cursor()
-                for it in self.cart:
-                    pid = it.get("product_id") or it.get("id")
-                    cur.execute("SELECT category_id, name FROM products WHERE id=?", (pid,))
-                    prod = cur.fetchone()
-                    cat_id = prod["category_id"] if prod else None
-                    name = prod["name"] if prod and "name" in prod.keys() else it.get("name", "Item")
-                    qty = int(it.get("qty", it.get("quantity", 1)))
-                    items_by_category.setdefault(cat_id, []).append(f"{name} x{qty}")
-                conn.close()
-            except Exception:
-                # If product lookups fail, just proceed without category printers
-                items_by_category = {}
-
-            # send to per-category printers (if any)
+            # kitchen stations get only what they haven't printed yet, coalesced per station;
+            # queued, so an offline printer can't block the till
             try:
                 if items_by_category:
-                    OrderController.print_receipt(order_id)
+                    kitchen_dispatch.dispatch(order_id)
             except Exception as e:
                 print("Printer error (category):", e)
                 QMessageBox.warning(self, "Printer Warning", f"Failed sending to category printers: {e}")
@@ -630,16 +514,17 @@ class POSWindow(QMainWindow):
             SELECT o.id
             FROM orders o
             WHERE o.table_id=? AND o.status='pending'
+            ORDER BY o.id DESC
+            LIMIT 1
         """, (table_id,))
         order = cursor.fetchone()
+        self.current_order_id = order["id"] if order else None
 
-        self.cart = []
-        self.table_cart.setRowCount(0)
-
+        lines = []
         if order:
             order_id = order["id"]
             cursor.execute("""
-                SELECT p.name, oi.quantity, oi.price
+                SELECT oi.product_id, p.name, oi.quantity, oi.price, p.cost
                 FROM order_items oi
                 JOIN products p ON oi.product_id = p.id
                 WHERE oi.order_id=?
@@ -647,16 +532,15 @@ class POSWindow(QMainWindow):
             rows = cursor.fetchall()
 
             for r in rows:
-                self.cart.append({
-                    "product_id": None,
+                lines.append({
+                    "product_id": r["product_id"],
                     "name": r["name"],
                     "qty": r["quantity"],
-                    "price": r["price"]
+                    "price": r["price"],
+                    "cost": r["cost"]
                 })
 
-            self.update_cart_table()
-        else:
-            self.clear_cart()
+        self.cart.load(lines)
 
         conn.close()
 
@@ -731,8 +615,11 @@ class POSWindow(QMainWindow):
 
 
     def _on_search(self, text):
-        # re-run load_products with search term
-        self.load_products(category_id=None, search_term=text)
+        # restart the debounce timer; _run_search fires once typing pauses
+        self._search_timer.start()
+
+    def _run_search(self):
+        self.load_products(category_id=None, search_term=self.search_input.text())
 
     def _show_help(self):
         QMessageBox.information(self, "Help", "POS window: click a product to add to cart.\nDouble-click Qty cell to edit.\nUse Print / Execute to handle the order.")
@@ -767,21 +654,21 @@ class POSWindow(QMainWindow):
   
     def _print_receipt(self):
         """
-        Print the latest order for the selected table via OrderController.print_receipt(),
-        then mark the table free and clear the cart UI.
+        Print the table's open order (else its latest one) via OrderController.print_receipt(),
+        mark the order paid and the table free, and clear the cart UI.
         """
         try:
             if not getattr(self, "selected_table", None):
                 QMessageBox.warning(self, "No Table", "Please select a table first.")
                 return
 
-            # Find the last order id for this table (most recent)
+            # The table's pending order; a settled one only for a reprint
             with get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute("""
                     SELECT id FROM orders
-                    WHERE table_id=? 
-                    ORDER BY created_at DESC
+                    WHERE table_id=?
+                    ORDER BY status = 'pending' DESC, created_at DESC
                     LIMIT 1
                 """, (self.selected_table,))
                 row = cur.fetchone()
@@ -792,24 +679,30 @@ class POSWindow(QMainWindow):
 
             order_id = row["id"]
 
-            # Use controller to print (controller opens/closes its own DB connections)
+            # Queue the receipt with the spooler (controller opens/closes its own DB connections)
             try:
                 OrderController.print_receipt(order_id)
+            except SpoolerFull as e:
+                QMessageBox.warning(self, "Printer Busy", f"Receipt not queued: {e}")
+                return
             except Exception as e:
                 # surface the error but do not leave DB open here (controller handles its own DB)
                 QMessageBox.critical(self, "Print Error", f"Failed to print receipt: {e}")
                 return
 
+            # Settled: the next Execute on this table starts a new order instead of editing this one
+            OrderController.close_order(order_id)
+
             # Mark table free after printing
             self._mark_table_as_free(self.selected_table)
 
             # Clear cart UI and internal cart
-            self.cart = []
-            self.update_cart_table()
+            self.cart.clear()
             self.lbl_selected_table.setText("Table: —")
             self.selected_table = None
+            self.current_order_id = None
 
-            QMessageBox.information(self, "Done", "Receipt printed and table cleared.")
+            QMessageBox.information(self, "Done", "Receipt sent to the printer and table cleared.")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to print:\n{e}")
@@ -868,114 +761,42 @@ class POSWindow(QMainWindow):
 
     def _print_with_cups(self, receipt_text, printer_name):
         try:
-            conn = cups.Connection()
-
-            # Save receipt temporarily
-            tmp_path = "/tmp/receipt.txt"
-            with open(tmp_path, "w") as f:
-                f.write(receipt_text)
-
-            # Send to printer
-            conn.printFile(printer_name, tmp_path, "Receipt", {})
-            print(f"🖨️ Sent to printer: {printer_name}")
-
+            spooler.submit(cups_target(printer_name), receipt_text, kind="receipt", title="Receipt")
+            print(f"🖨️ Queued for printer: {printer_name}")
         except Exception as e:
             print(f"❌ Printing failed: {e}")
 
+    def _on_print_job(self, job):
+        status = job.get("status")
+        label = job.get("title") or f"Job #{job.get('id')}"
+        if status == "done":
+            self.statusBar().showMessage(f"🖨 Printed: {label}", 5000)
+        elif status == "printing":
+            self.statusBar().showMessage(f"🖨 Printing: {label}…")
+        elif status == "queued" and job.get("attempts"):
+            self.statusBar().showMessage(
+                f"⚠️ {label}: printer not responding, retrying (attempt {job['attempts']}) — {job.get('last_error')}")
+        elif status == "dead":
+            self.statusBar().showMessage(f"❌ {label} could not be printed: {job.get('last_error')}")
+
     def _send_to_cashier_printer(self, order_id):
         """
         Send the receipt to the cashier printer via CUPS.
         Expects printers table to contain either a 'cups_name' column or 'name' field
         that matches an available CUPS printer queue.
         """
-        # Get printer from DB
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM printers WHERE assigned_categories LIKE '%cashier%' AND status='online' LIMIT 1")
-            printer = cursor.fetchone()
-
+        # cached with the category routes (dropped whenever a printer changes)
+        printer = printer_routing.cashier()
         if not printer:
             raise Exception("No online cashier printer (assigned 'cashier') found in DB.")
 
-        # determine the queue name to use with CUPS
-        cups_queue = None
-        # if you store an explicit cups queue name column, prefer it (recommended):
-        if "cups_name" in printer.keys() and printer["cups_name"]:
-            cups_queue = printer["cups_name"]
-        else:
-            # fallback to name: ensure it's a queue that CUPS knows
-            cups_queue = printer["name"]
+        # explicit cups_name column if present, else the printer name;
+        # the CUPS worker resolves it against its cached queue list
+        cups_queue = printer.get("cups_name") or printer["name"]
 
-        # build receipt text from DB
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT o.id, o.total, o.created_at, t.name as table_name
-                FROM orders o
-                LEFT JOIN tables t ON o.table_id = t.id
-                WHERE o.id=?
-            """, (order_id,))
-            order = cursor.fetchone()
-
-            cursor.execute("""
-                SELECT p.name, oi.quantity, oi.price
-                FROM order_items oi
-                JOIN products p ON oi.product_id = p.id
-                WHERE oi.order_id=?
-            """, (order_id,))
-            items = cursor.fetchall()
-
-        # Compose receipt
-        table_name = order["table_name"] or "No Table"
-        receipt_lines = []
-        receipt_lines.append(f"*** {table_name} ***")
-        receipt_lines.append(f"Order #{order_id}")
-        receipt_lines.append(f"Date: {order['created_at']}")
-        receipt_lines.append("-" * 32)
-        for it in items:
-            name = it["name"][:28]
-            qty = it["quantity"]
-            line_total = it["price"] * qty
-            receipt_lines.append(f"{name:28} x{qty:<3} {line_total:7.2f} DA")
-        receipt_lines.append("-" * 32)
-        receipt_lines.append(f"TOTAL: {order['total']:.2f} DA")
-        receipt_lines.append("")
-        receipt_lines.append("*** THANK YOU ***")
-        receipt_text = "\n".join(receipt_lines) + "\n"
-
-        # Print via CUPS
-        try:
-            cups_conn = cups.Connection()
-            # Validate printer exists in CUPS
-            available = cups_conn.getPrinters()
-            if cups_queue not in available:
-                # if not found, try to match by substring (friendly fallback)
-                found = None
-                for q in available:
-                    if cups_queue.lower() in q.lower() or printer.get("ip_address") and printer["ip_address"] in q:
-                        found = q
-                        break
-                if found:
-                    cups_queue = found
-                else:
-                    raise Exception(f"CUPS queue '{cups_queue}' not found. Available: {', '.join(available.keys())}")
-
-            # write to tmp file and print
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
-                tmp.write(receipt_text.encode("utf-8"))
-                tmp.flush()
-                tmp_path = tmp.name
-
-            # send to CUPS
-            cups_conn.printFile(cups_queue, tmp_path, f"Order-{order_id}", {})
-            print(f"✅ Sent receipt to printer queue: {cups_queue}")
-        finally:
-            # cleanup tmp file if exists
-            try:
-                if tmp_path and os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-            except Exception:
-                pass
+        # Queue for the CUPS worker (queue name resolution happens there)
+        return spooler.submit(cups_target(cups_queue), OrderController.render_receipt(order_id),
+                              kind="receipt", order_id=order_id, title=f"Order-{order_id}")
 
     # -----------------------
     # Styling
@@ -0,0 +1,130 @@
+# ui/product_grid.py
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRectF, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen
+
+
+class ProductListModel(QAbstractListModel):
+    """List model over catalog product dicts; switching category only swaps the list."""
+
+    ProductRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._products = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._products)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._products):
+            return None
+        product = self._products[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return product.get("name", "Unknown")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{product.get('name', '')} — {product.get('price') or 0:.2f} DA"
+        if role == self.ProductRole:
+            return product
+        return None
+
+    def set_products(self, products):
+        self.beginResetModel()
+        self._products = products
+        self.endResetModel()
+
+    def product_at(self, row):
+        return self._products[row] if 0 <= row < len(self._products) else None
+
+
+class ProductCardDelegate(QStyledItemDelegate):
+    """Paints a product card (name, price, cost, add button) instead of building widgets."""
+
+    CARD_SIZE = QSize(170, 118)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_font = QFont("Segoe UI", 10, QFont.Weight.Medium)
+        self.text_font = QFont("Segoe UI", 9)
+
+    def sizeHint(self, option, index):
+        return self.CARD_SIZE
+
+    def paint(self, painter, option, index):
+        product = index.data(ProductListModel.ProductRole)
+        if product is None:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(3, 3, -3, -3)
+
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(QPen(QColor("#98c1ff" if hovered else "#e6e9ef"), 1))
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(rect, 10, 10)
+
+        inner = rect.adjusted(10, 8, -10, -8)
+        painter.setPen(QColor("#222"))
+        painter.setFont(self.name_font)
+        name_rect = QRectF(inner.left(), inner.top(), inner.width(), 36)
+        painter.drawText(name_rect, Qt.TextFlag.TextWordWrap | Qt.AlignmentFlag.AlignLeft, product.get("name", "Unknown"))
+
+        painter.setFont(self.text_font)
+        price = product.get("price") or 0.0
+        painter.drawText(QRectF(inner.left(), inner.top() + 38, inner.width(), 16),
+                         Qt.AlignmentFlag.AlignLeft, f"Price: {price:.2f} DA")
+        cost = product.get("cost")
+        if cost is not None:
+            painter.setPen(QColor("#666"))
+            painter.drawText(QRectF(inner.left(), inner.top() + 54, inner.width(), 16),
+                             Qt.AlignmentFlag.AlignLeft, f"Cost: {float(cost):.2f} DA")
+
+        btn = QRectF(inner.left(), inner.bottom() - 24, inner.width(), 24)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#1366d6" if hovered else "#2f80ed"))
+        painter.drawRoundedRect(btn, 8, 8)
+        painter.setPen(QColor("white"))
+        painter.drawText(btn, Qt.AlignmentFlag.AlignCenter, "➕ Add")
+        painter.restore()
+
+
+class ProductGridView(QListView):
+    """
+    Virtualized product grid: only visible cards are laid out and painted,
+    and no per-product widgets are created or destroyed on filter changes.
+    """
+
+    productActivated = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.product_model = ProductListModel(self)
+        self.setModel(self.product_model)
+        self.setItemDelegate(ProductCardDelegate(self))
+
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setSpacing(4)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+
+        self.clicked.connect(self._on_clicked)
+
+    def set_products(self, products):
+        self.product_model.set_products(products)
+        self.scrollToTop()
+
+    def _on_clicked(self, index):
+        product = self.product_model.product_at(index.row())
+        if product is not None:
+            self.productActivated.emit(product)
@@ -6,7 +6,8 @@ from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtCharts import QChart, QChartView, QPieSeries, QBarSet, QBarSeries, QBarCategoryAxis
 from PyQt6.QtGui import QPainter, QFont
 from datetime import datetime, timedelta
-from models.database import get_connection
+from models.rollup import SalesRollup
+from ui.workers import QueryExecutor
 import csv
 
 
@@ -15,6 +16,8 @@ class ReportsPage(QWidget):
         super().__init__()
         self.setWindowTitle("Reports & Statistics")
         self.resize(1100, 750)
+        self.executor = QueryExecutor(self)
+        self._daily_rows = []
 
         # === Scrollable main layout ===
         main_layout = QVBoxLayout(self)
@@ -193,32 +196,41 @@ class ReportsPage(QWidget):
         self.load_data()
 
     # -------------------------------
-    # Load Data from SQLite
+    # Load Data from SQLite (in the background)
     # -------------------------------
     def load_data(self, start_date=None, end_date=None):
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Revenue, Cost, and Profit grouped by date
-        query = """
-            SELECT 
-                DATE(o.created_at) AS date,
-                COUNT(DISTINCT o.id) AS orders,
-                SUM(oi.quantity * oi.price) AS revenue,
-                SUM(oi.quantity * p.cost) AS cost
-            FROM orders o
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN products p ON oi.product_id = p.id
-        """
-        params = []
-        if start_date and end_date:
-            query += " WHERE DATE(o.created_at) BETWEEN ? AND ?"
-            params = [start_date, end_date]
-
-        query += " GROUP BY DATE(o.created_at) ORDER BY DATE(o.created_at) ASC;"
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        # Revenue, Cost and order count per day, read from the daily sales rollup.
+        # Rows stream into the table as they arrive; a newer filter cancels this one.
+        self._daily_rows = []
+        self.table.setRowCount(0)
+        self.summary_label.setText("Loading summary...")
+        self.executor.submit(
+            "daily", SalesRollup.daily_chunks, start_date, end_date, stream=True,
+            on_chunk=self._append_daily_rows,
+            on_result=self._daily_loaded,
+            on_error=self._load_failed,
+        )
+        self.update_category_chart()
+
+    def _append_daily_rows(self, rows):
+        first = self.table.rowCount()
+        self.table.setRowCount(first + len(rows))
+        for i, row in enumerate(rows, start=first):
+            profit = (row["revenue"] or 0) - (row["cost"] or 0)
+            self.table.setItem(i, 0, QTableWidgetItem(str(row["date"])))
+            self.table.setItem(i, 1, QTableWidgetItem(str(row["orders"])))
+            self.table.setItem(i, 2, QTableWidgetItem(f"{row['revenue'] or 0:.2f}"))
+            self.table.setItem(i, 3, QTableWidgetItem(f"{row['cost'] or 0:.2f}"))
+            profit_item = QTableWidgetItem(f"{profit:.2f}")
+            if profit >= 0:
+                profit_item.setForeground(Qt.GlobalColor.darkGreen)
+            else:
+                profit_item.setForeground(Qt.GlobalColor.red)
+            self.table.setItem(i, 4, profit_item)
+        self._daily_rows.extend(rows)
+
+    def _daily_loaded(self, _=None):
+        data = self._daily_rows
 
         # --- Summary ---
         total_orders = sum(r["orders"] or 0 for r in data) if data else 0
@@ -235,26 +247,12 @@ class ReportsPage(QWidget):
             f"📈 Avg Order: <b>{avg_order:.2f} DA</b>"
         )
 
-        # --- Table ---
-        self.table.setRowCount(len(data))
-        for i, row in enumerate(data):
-            profit = (row["revenue"] or 0) - (row["cost"] or 0)
-            self.table.setItem(i, 0, QTableWidgetItem(str(row["date"])))
-            self.table.setItem(i, 1, QTableWidgetItem(str(row["orders"])))
-            self.table.setItem(i, 2, QTableWidgetItem(f"{row['revenue'] or 0:.2f}"))
-            self.table.setItem(i, 3, QTableWidgetItem(f"{row['cost'] or 0:.2f}"))
-            profit_item = QTableWidgetItem(f"{profit:.2f}")
-            if profit >= 0:
-                profit_item.setForeground(Qt.GlobalColor.darkGreen)
-            else:
-                profit_item.setForeground(Qt.GlobalColor.red)
-            self.table.setItem(i, 4, profit_item)
-
         # --- Charts ---
         self.update_sales_charts(data)
-        self.update_category_chart()
 
-        conn.close()
+    def _load_failed(self, error):
+        self.summary_label.setText("Failed to load report data.")
+        QMessageBox.critical(self, "❌ Error", f"Failed to load report data:\n{error}")
 
     # -------------------------------
     # Update Sales Charts
@@ -289,19 +287,12 @@ class ReportsPage(QWidget):
     # -------------------------------
     # Update Category Sales Breakdown
     # -------------------------------
-    def update_category_chart(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.name AS category, SUM(oi.quantity * oi.price) AS total_sales
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            JOIN categories c ON p.category_id = c.id
-            GROUP BY c.name
-            ORDER BY total_sales DESC
-        """)
-        data = cursor.fetchall()
-        conn.close()
+    def update_category_chart(self, rows=None):
+        if rows is None:
+            self.executor.submit("categories", SalesRollup.by_category,
+                                 on_result=self.update_category_chart, on_error=self._load_failed)
+            return
+        data = [{"category": r["category"], "total_sales": r["total"]} for r in rows]
 
         chart = QChart()
         chart.setTitle("🥧 Category Sales Breakdown")
@@ -1,13 +1,18 @@
 import os
-import shutil
 import sqlite3
+from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFormLayout,
-    QFileDialog, QMessageBox, QScrollArea, QGroupBox, QHBoxLayout
+    QFileDialog, QMessageBox, QScrollArea, QGroupBox, QHBoxLayout, QProgressDialog,
+    QDoubleSpinBox, QSpinBox
 )
 from PyQt6.QtGui import QPixmap, QFont
 from PyQt6.QtCore import Qt
-from models.database import get_connection, DB_PATH
+from models.database import get_connection
+from controllers.backup_manager import backups, DEFAULTS as BACKUP_DEFAULTS
+from models.settings import Settings
+from ui.workers import QueryExecutor, ProgressReporter
+from utils.receipt_renderer import receipts
 
 
 class SettingsPage(QWidget):
@@ -15,6 +20,7 @@ class SettingsPage(QWidget):
         super().__init__()
         self.setWindowTitle("Settings")
         self.resize(750, 700)
+        self.executor = QueryExecutor(self, max_threads=1)
 
         # ---------- Scrollable Main Layout ----------
         scroll = QScrollArea()
@@ -168,6 +174,22 @@ class SettingsPage(QWidget):
     # ------------------ BACKUP & RESTORE ------------------
     def init_backup_restore(self):
         group = QGroupBox("🗂️ Backup & Restore")
+        outer = QVBoxLayout()
+
+        form = QFormLayout()
+        self.backup_dir_input = QLineEdit()
+        self.backup_dir_input.setPlaceholderText("backups/ next to the database")
+        self.backup_interval_input = QDoubleSpinBox()
+        self.backup_interval_input.setRange(0, 24 * 30)
+        self.backup_interval_input.setSuffix(" h")
+        self.backup_interval_input.setSpecialValueText("Off")
+        self.backup_keep_input = QSpinBox()
+        self.backup_keep_input.setRange(1, 365)
+        form.addRow("Backup folder:", self.backup_dir_input)
+        form.addRow("Automatic backup every:", self.backup_interval_input)
+        form.addRow("Backups to keep:", self.backup_keep_input)
+        outer.addLayout(form)
+
         layout = QHBoxLayout()
 
         backup_btn = QPushButton("⬇️ Export Database")
@@ -204,7 +226,8 @@ class SettingsPage(QWidget):
 
         layout.addWidget(backup_btn)
         layout.addWidget(restore_btn)
-        group.setLayout(layout)
+        outer.addLayout(layout)
+        group.setLayout(outer)
         self.layout.addWidget(group)
     
     # ------------------ INVENTORY TOGGLE ------------------
@@ -260,6 +283,11 @@ class SettingsPage(QWidget):
                 self.logo_label.setPixmap(pixmap)
                 self.logo_path = row["logo_path"]
 
+        backup = Settings.section("backup", BACKUP_DEFAULTS)
+        self.backup_dir_input.setText(backup["dir"] or "")
+        self.backup_interval_input.setValue(backup["interval_hours"])
+        self.backup_keep_input.setValue(backup["keep"])
+
     # ------------------ SAVE SETTINGS ------------------
     def save_settings(self):
         conn = get_connection()
@@ -281,6 +309,12 @@ class SettingsPage(QWidget):
 
         conn.commit()
         conn.close()
+        Settings.save_section("backup", {
+            "dir": self.backup_dir_input.text().strip() or None,
+            "interval_hours": self.backup_interval_input.value(),
+            "keep": self.backup_keep_input.value(),
+        })
+        receipts.invalidate()  # header / logo / VAT are baked into the receipt template
         QMessageBox.information(self, "✅ Saved", "Settings saved successfully!")
 
     # ------------------ UPLOAD LOGO ------------------
@@ -315,18 +349,59 @@ class SettingsPage(QWidget):
         conn.close()
 
     # ------------------ EXPORT DATABASE ------------------
+    def _backup_progress(self, title, label):
+        reporter = ProgressReporter(self)
+        dialog = QProgressDialog(label, None, 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+        reporter.progressed.connect(lambda done, total: (dialog.setMaximum(total), dialog.setValue(done)))
+        return reporter, dialog
+
     def export_db(self):
-        target_file, _ = QFileDialog.getSaveFileName(self, "Export Database", "", "SQLite DB (*.db)")
-        if target_file:
-            shutil.copy(DB_PATH, target_file)
-            QMessageBox.information(self, "✅ Backup", f"Database exported to:\n{target_file}")
+        """Online backup (consistent while the app keeps writing), gzip-compressed."""
+        name = f"fastfood-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db.gz"
+        target_file, _ = QFileDialog.getSaveFileName(
+            self, "Export Database", name, "Compressed backup (*.db.gz);;SQLite DB (*.db)")
+        if not target_file:
+            return
+        reporter, dialog = self._backup_progress("Backup", "Backing up the database…")
+
+        def finished(result):
+            dialog.reset()
+            QMessageBox.information(self, "✅ Backup", f"Database exported to:\n{result['path']}\n"
+                                                       f"({result['size'] / 1024:.0f} KB, verified)")
+
+        def failed(error):
+            dialog.reset()
+            QMessageBox.warning(self, "⚠️ Error", f"Backup failed: {error}")
+
+        self.executor.submit("db-backup", backups.backup, target_file, progress=reporter.report,
+                             on_result=finished, on_error=failed)
 
     # ------------------ IMPORT DATABASE ------------------
     def import_db(self):
-        source_file, _ = QFileDialog.getOpenFileName(self, "Import Database", "", "SQLite DB (*.db)")
-        if source_file:
-            try:
-                shutil.copy(source_file, DB_PATH)
-                QMessageBox.information(self, "✅ Restore", "Database imported successfully. Restart app to apply changes.")
-            except Exception as e:
-                QMessageBox.warning(self, "⚠️ Error", f"Import failed: {e}")
+        source_file, _ = QFileDialog.getOpenFileName(
+            self, "Import Database", str(backups.settings()["dir"]), "Backups (*.db.gz *.db)")
+        if not source_file:
+            return
+        confirm = QMessageBox.question(
+            self, "Restore Database",
+            "Replace all current data with this backup?\nA backup of the current data is taken first.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if confirm != QMessageBox.StandardButton.Yes:
+            return
+        reporter, dialog = self._backup_progress("Restore", "Restoring the database…")
+
+        def finished(safety):
+            dialog.reset()
+            QMessageBox.information(self, "✅ Restore",
+                                    f"Database restored. Previous data saved to:\n{safety}\n\n"
+                                    "Restart the app to reload every screen.")
+
+        def failed(error):
+            dialog.reset()
+            QMessageBox.warning(self, "⚠️ Error", f"Import failed, current data kept: {error}")
+
+        self.executor.submit("db-restore", backups.restore, source_file, progress=reporter.report,
+                             on_result=finished, on_error=failed)
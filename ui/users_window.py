@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 import sqlite3
+from models.database import get_connection
 
 class UsersPage(QWidget):
     def __init__(self):
@@ -80,7 +81,7 @@ class UsersPage(QWidget):
         self.setLayout(layout)
 
     def connect_db(self):
-        return sqlite3.connect("fastfood.db")
+        return get_connection()
 
     def load_users(self):
         conn = self.connect_db()
@@ -0,0 +1,196 @@
+# ui/workers.py
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class QueryTicket:
+    """Handle for one submitted query; cancel() stops delivery (and streaming) of its results."""
+
+    def __init__(self, key):
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class _QuerySignals(QObject):
+    chunk = pyqtSignal(object, object)   # ticket, rows
+    done = pyqtSignal(object, object)    # ticket, result
+    failed = pyqtSignal(object, str)     # ticket, error
+
+
+class _QueryRunnable(QRunnable):
+    def __init__(self, ticket, fn, args, kwargs, stream, signals):
+        super().__init__()
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.stream = stream
+        self.signals = signals
+
+    def run(self):
+        ticket = self.ticket
+        if ticket.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+            if self.stream:
+                # result is an iterable of row lists (e.g. database.iter_chunks)
+                chunks = iter(result)
+                try:
+                    for rows in chunks:
+                        if ticket.cancelled:
+                            return
+                        self.signals.chunk.emit(ticket, list(rows))
+                finally:
+                    close = getattr(chunks, "close", None)
+                    if close:
+                        close()
+                result = None
+        except Exception as e:
+            self.signals.failed.emit(ticket, str(e))
+            return
+        if not ticket.cancelled:
+            self.signals.done.emit(ticket, result)
+
+
+class QueryExecutor(QObject):
+    """
+    Runs blocking queries on a QThreadPool and delivers results on the GUI thread.
+    One request is live per key: submitting again under the same key cancels the
+    previous one, so a superseded filter never overwrites newer results.
+    """
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._current = {}    # key -> live ticket
+        self._handlers = {}   # ticket -> (signals, on_result, on_chunk, on_error)
+
+    def submit(self, key, fn, *args, on_result=None, on_chunk=None, on_error=None, stream=False, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the background.
+        stream=True: fn returns an iterable of row lists, each delivered to on_chunk as it arrives;
+        on_result(None) is called once the stream is exhausted.
+        """
+        self.cancel(key)
+        ticket = QueryTicket(key)
+        signals = _QuerySignals()
+        signals.chunk.connect(self._on_chunk)
+        signals.done.connect(self._on_done)
+        signals.failed.connect(self._on_failed)
+
+        self._current[key] = ticket
+        self._handlers[ticket] = (signals, on_result, on_chunk, on_error)
+        self._pool.start(_QueryRunnable(ticket, fn, args, kwargs, stream, signals))
+        return ticket
+
+    def cancel(self, key):
+        ticket = self._current.pop(key, None)
+        if ticket is None:
+            return
+        # a queued runnable sees the flag and returns without running; a streaming one stops at the next chunk
+        ticket.cancel()
+        self._handlers.pop(ticket, None)
+
+    def cancel_all(self):
+        for key in list(self._current):
+            self.cancel(key)
+
+    def is_running(self, key):
+        return key in self._current
+
+    def wait(self, msecs=-1):
+        """Block until queued work is done (shutdown / scripts)."""
+        return self._pool.waitForDone(msecs)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.waitForDone()
+
+    # --- delivery (GUI thread) ---
+    def _live(self, ticket):
+        return not ticket.cancelled and self._current.get(ticket.key) is ticket
+
+    def _finish(self, ticket):
+        self._current.pop(ticket.key, None)
+        return self._handlers.pop(ticket, (None, None, None, None))
+
+    def _on_chunk(self, ticket, rows):
+        if not self._live(ticket):
+            return
+        on_chunk = self._handlers[ticket][2]
+        if on_chunk:
+            on_chunk(rows)
+
+    def _on_done(self, ticket, result):
+        if not self._live(ticket):
+            return
+        on_result = self._finish(ticket)[1]
+        if on_result:
+            on_result(result)
+
+    def _on_failed(self, ticket, error):
+        if not self._live(ticket):
+            return
+        on_error = self._finish(ticket)[3]
+        if on_error:
+            on_error(error)
+        else:
+            print(f"❌ Background query '{ticket.key}' failed: {error}")
+
+
+class SpoolerBridge(QObject):
+    """Re-emits print spooler job updates (from its worker threads) as a Qt signal on the GUI thread."""
+
+    jobChanged = pyqtSignal(dict)
+
+    def __init__(self, spooler, parent=None):
+        super().__init__(parent)
+        self._spooler = spooler
+        self._callback = self.jobChanged.emit
+        spooler.add_listener(self._callback)
+        self.destroyed.connect(self._detach)
+
+    def _detach(self, *_):
+        self._spooler.remove_listener(self._callback)
+
+
+class PrinterStatusBridge(QObject):
+    """Re-emits printer discovery status changes ({printer_id: status}) on the GUI thread."""
+
+    statusChanged = pyqtSignal(dict)
+
+    def __init__(self, discovery, parent=None):
+        super().__init__(parent)
+        self._discovery = discovery
+        self._callback = self.statusChanged.emit
+        discovery.add_listener(self._callback)
+        self.destroyed.connect(self._detach)
+
+    def _detach(self, *_):
+        self._discovery.remove_listener(self._callback)
+
+
+class ProgressReporter(QObject):
+    """
+    progress(done, total) / cancelled() callbacks for a background job, with the
+    progress re-emitted on the GUI thread (e.g. into a QProgressDialog).
+    """
+
+    progressed = pyqtSignal(int, int)  # done, total (0 = unknown)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancelled = False
+
+    def report(self, done, total=None):
+        self.progressed.emit(int(done), int(total or 0))
+
+    def cancel(self):
+        self._cancelled = True
+
+    def cancelled(self):
+        return self._cancelled
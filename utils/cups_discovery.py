@@ -0,0 +1,135 @@
+# utils/cups_discovery.py
+"""
+Cached view of the CUPS queues.
+
+getPrinters() is a round trip to the CUPS server, so the queue list is kept for
+`ttl` seconds and refreshed in a background thread once it goes stale (callers
+keep getting the previous list meanwhile). Printer-name -> queue resolution is
+memoized per refresh, and each thread reuses one cups.Connection, so sending a
+receipt is a single job submission.
+"""
+import threading
+import time
+
+# IPP printer-state values
+STATES = {3: "idle", 4: "printing", 5: "stopped"}
+
+
+class CupsDiscovery:
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._queues = None
+        self._resolved = {}
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    # --- connections ---
+    def connection(self):
+        """This thread's cups.Connection (created on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import cups
+
+            conn = self._local.conn = cups.Connection()
+        return conn
+
+    def drop_connection(self):
+        self._local.conn = None
+
+    # --- queue list ---
+    def refresh(self):
+        """Fetch the queue list now; returns it."""
+        try:
+            queues = self.connection().getPrinters()
+        except Exception:
+            self.drop_connection()
+            with self._lock:
+                self._refreshing = False
+            raise
+        with self._lock:
+            self._queues = queues
+            self._resolved = {}
+            self._fetched_at = time.monotonic()
+            self._refreshing = False
+        return queues
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ CUPS refresh failed: {e}")
+
+    def queues(self):
+        """{queue name: attributes}; blocks only when nothing has been fetched yet."""
+        with self._lock:
+            queues = self._queues
+            stale = time.monotonic() - self._fetched_at > self.ttl
+            start = queues is not None and stale and not self._refreshing
+            if start:
+                self._refreshing = True
+        if queues is None:
+            return self.refresh()
+        if start:
+            threading.Thread(target=self._refresh_in_background, name="cups-refresh", daemon=True).start()
+        return queues
+
+    def invalidate(self):
+        """Forget the queue list (next call fetches it again)."""
+        with self._lock:
+            self._queues = None
+            self._resolved = {}
+
+    # --- lookups ---
+    def _match(self, queues, name):
+        if not name:
+            return next(iter(queues), None)
+        if name in queues:
+            return name
+        # friendly fallback: substring match on the queue name
+        lowered = name.lower()
+        return next((q for q in queues if lowered in q.lower()), None)
+
+    def resolve(self, name=""):
+        """CUPS queue for a printer / queue name ('' = first available). Raises if none matches."""
+        resolved = self._resolved.get(name)
+        if resolved is not None:
+            return resolved
+
+        queues = self.queues()
+        queue = self._match(queues, name)
+        if queue is None:
+            # maybe the queue was added since the last refresh
+            queues = self.refresh()
+            queue = self._match(queues, name)
+        if queue is None:
+            if not queues:
+                raise Exception("No printer found in CUPS.")
+            raise Exception(f"CUPS queue '{name}' not found. Available: {', '.join(queues)}")
+
+        with self._lock:
+            self._resolved[name] = queue
+        return queue
+
+    def queue_for(self, printer):
+        """Queue of a printers row: its cups_name column if set, else its name."""
+        return self.resolve(printer.get("cups_name") or printer["name"])
+
+    def status(self, name):
+        """{'queue', 'state', 'message', 'accepting'} from the cached attributes."""
+        queue = self.resolve(name)
+        attrs = self.queues().get(queue, {})
+        return {
+            "queue": queue,
+            "state": STATES.get(attrs.get("printer-state"), "unknown"),
+            "message": attrs.get("printer-state-message", ""),
+            "accepting": attrs.get("printer-is-accepting-jobs", True),
+        }
+
+    def statuses(self):
+        """status() of every queue, by queue name."""
+        return {queue: self.status(queue) for queue in self.queues()}
+
+
+cups_queues = CupsDiscovery()
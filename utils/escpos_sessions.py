@@ -0,0 +1,227 @@
+# utils/escpos_sessions.py
+"""
+Long-lived ESC/POS connections shared by test prints, receipts and kitchen tickets.
+
+One PrinterSession per physical device (network host:port or USB vendor:product).
+Writes to a device are serialized by the session lock; the connection is opened
+on first use, kept open with a periodic keepalive, reopened after a failure and
+closed after sitting idle (many network printers accept a single client only).
+
+A network printer that hung up (power-cycled, closed the idle client) is noticed
+before the next write: the first send on such a socket still "succeeds" locally
+and its data is lost, so a reused socket is checked for EOF first.
+"""
+import select
+import socket
+import threading
+import time
+
+# DLE EOT 1: real-time printer status request, harmless on every ESC/POS printer
+KEEPALIVE_PROBE = b"\x10\x04\x01"
+
+
+def session_key(printer):
+    """('network', host, port) / ('usb', vid, pid) for a printers row or PrinterController.get_all() dict."""
+    connection = printer.get("connection_type") or printer.get("connection")
+    if connection == "network":
+        host = printer.get("ip_address") or printer.get("ip")
+        port = printer.get("port")
+        return ("network", host, int(port) if port not in (None, "", "N/A") else 9100)
+    if connection == "usb":
+        return ("usb", int(str(printer["vendor_id"]), 16), int(str(printer["product_id"]), 16))
+    return None
+
+
+def _open_device(key):
+    kind = key[0]
+    if kind == "network":
+        from escpos.printer import Network
+        device = Network(key[1], key[2], timeout=5)
+        device.open()
+        sock = device.device
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        return device
+    if kind == "usb":
+        from escpos.printer import Usb
+        device = Usb(key[1], key[2], timeout=4000)
+        device.open()
+        return device
+    raise ValueError(f"Unsupported printer connection: {key!r}")
+
+
+def _hung_up(device):
+    """True if the peer closed a network device's socket (pending status replies are discarded)."""
+    sock = getattr(device, "device", None)
+    if not isinstance(sock, socket.socket):
+        return False  # USB: failures show up on write
+    try:
+        while select.select([sock], [], [], 0)[0]:
+            if not sock.recv(4096):
+                return True
+    except (OSError, ValueError):
+        return True
+    return False
+
+
+class PrinterSession:
+    def __init__(self, key, opener=_open_device):
+        self.key = key
+        self.lock = threading.Lock()
+        self._opener = opener
+        self._device = None
+        self.last_used = 0.0
+        self.stats = {"connects": 0, "reconnects": 0, "writes": 0, "failures": 0}
+
+    @property
+    def connected(self):
+        return self._device is not None
+
+    def _connect(self):
+        self._device = self._opener(self.key)
+        self.stats["connects"] += 1
+
+    def _drop(self):
+        device, self._device = self._device, None
+        if device is not None:
+            try:
+                device.close()
+            except Exception:
+                pass
+
+    def run(self, action):
+        """
+        Call action(device) with the device locked, connecting first if needed.
+        If a reused connection turned out to be dead, reconnect once and retry;
+        a failure on a fresh connection is raised (the spooler retries the job).
+        """
+        with self.lock:
+            if self._device is not None and _hung_up(self._device):
+                self._drop()
+                self.stats["reconnects"] += 1
+            fresh = self._device is None
+            if fresh:
+                self._connect()
+            try:
+                result = action(self._device)
+            except Exception:
+                self._drop()
+                if fresh:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["reconnects"] += 1
+                self._connect()
+                try:
+                    result = action(self._device)
+                except Exception:
+                    self.stats["failures"] += 1
+                    self._drop()
+                    raise
+            self.stats["writes"] += 1
+            self.last_used = time.monotonic()
+            return result
+
+    def send_raw(self, data):
+        self.run(lambda device: device._raw(data))
+
+    def send_text(self, text, cut=True):
+        def _print(device):
+            device.text(text)
+            if cut:
+                device.cut()
+        self.run(_print)
+
+    def keepalive(self):
+        """Probe an idle connection; drop it if the printer went away."""
+        if not self.lock.acquire(blocking=False):
+            return  # busy printing, obviously alive
+        try:
+            if self._device is None:
+                return
+            try:
+                self._device._raw(KEEPALIVE_PROBE)
+            except Exception:
+                self._drop()
+        finally:
+            self.lock.release()
+
+    def close(self):
+        with self.lock:
+            self._drop()
+
+
+class SessionManager:
+    """Pool of PrinterSessions keyed by device, with a background keepalive / idle reaper."""
+
+    def __init__(self, keepalive_interval=20.0, idle_timeout=120.0, opener=_open_device):
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self._opener = opener
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def session(self, printer_or_key):
+        key = printer_or_key if isinstance(printer_or_key, tuple) else session_key(printer_or_key)
+        if key is None:
+            raise ValueError("Manual printers have no ESC/POS connection.")
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = PrinterSession(key, self._opener)
+            self._ensure_reaper()
+        return session
+
+    def _ensure_reaper(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._reap, name="escpos-keepalive", daemon=True)
+            self._thread.start()
+
+    def _reap(self):
+        while not self._stop.wait(self.keepalive_interval):
+            now = time.monotonic()
+            with self._lock:
+                sessions = list(self._sessions.values())
+            for session in sessions:
+                if not session.connected:
+                    continue
+                if now - session.last_used > self.idle_timeout:
+                    if session.lock.acquire(blocking=False):
+                        try:
+                            session._drop()
+                        finally:
+                            session.lock.release()
+                else:
+                    session.keepalive()
+
+    def is_connected(self, printer_or_key):
+        """True if a pooled connection to the device is open (and kept alive)."""
+        key = printer_or_key if isinstance(printer_or_key, tuple) else session_key(printer_or_key)
+        with self._lock:
+            session = self._sessions.get(key)
+        return bool(session and session.connected)
+
+    def discard(self, printer_or_key):
+        """Close and forget a device (printer deleted / reconfigured)."""
+        key = printer_or_key if isinstance(printer_or_key, tuple) else session_key(printer_or_key)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session:
+            session.close()
+
+    def close_all(self):
+        self._stop.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def stats(self):
+        with self._lock:
+            return {key: dict(s.stats, connected=s.connected) for key, s in self._sessions.items()}
+
+
+sessions = SessionManager()
@@ -0,0 +1,160 @@
+# utils/fake_printer.py
+"""
+Fake ESC/POS network printer (raw TCP, like port 9100) for local testing and benchmarks.
+
+    python -m utils.fake_printer --port 9100
+
+Records every byte it receives, counts connections, answers DLE EOT status
+requests with "online", and can be told to refuse, stall or hang up on its
+clients (drop()) to exercise retries and reconnects.
+"""
+import argparse
+import socket
+import threading
+import time
+
+DLE_EOT = b"\x10\x04"
+STATUS_ONLINE = b"\x12"
+CUT = (b"\x1dV", b"\x1bi", b"\x1bm")
+
+
+class FakePrinterServer:
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0):
+        self.host = host
+        self.port = port
+        self.delay = delay          # seconds to sleep per received chunk (slow printer)
+        self.refuse = False         # drop new connections immediately (offline printer)
+        self.connections = 0
+        self.received = bytearray()
+        self._lock = threading.Lock()
+        self._sock = None
+        self._clients = set()
+        self._thread = None
+        self._running = False
+
+    @property
+    def address(self):
+        return self.host, self.port
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, name="fake-printer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._lock:
+            sockets = list(self._clients)
+        if self._sock:
+            sockets.append(self._sock)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def drop(self):
+        """Hang up on the connected clients (printer power-cycled); keep listening."""
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(clients)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            if self.refuse:
+                client.close()
+                continue
+            with self._lock:
+                self.connections += 1
+                self._clients.add(client)
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        with client:
+            while self._running:
+                try:
+                    data = client.recv(65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                if self.delay:
+                    time.sleep(self.delay)
+                with self._lock:
+                    self.received.extend(data)
+                if DLE_EOT in data:
+                    try:
+                        client.sendall(STATUS_ONLINE)
+                    except OSError:
+                        break
+        with self._lock:
+            self._clients.discard(client)
+
+    # --- inspection ---
+    def cuts(self):
+        """Number of paper cuts received (≈ tickets printed)."""
+        with self._lock:
+            data = bytes(self.received)
+        return sum(data.count(cut) for cut in CUT)
+
+    def text(self):
+        with self._lock:
+            return bytes(self.received).decode("latin-1")
+
+    def reset(self):
+        with self._lock:
+            self.received.clear()
+            self.connections = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake ESC/POS network printer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per received chunk")
+    args = parser.parse_args()
+
+    server = FakePrinterServer(args.host, args.port, args.delay).start()
+    print(f"🖨️ Fake printer listening on {server.host}:{server.port} (Ctrl+C to stop)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            with server._lock:
+                chunk = bytes(server.received[seen:])
+                seen = len(server.received)
+            if chunk:
+                print(chunk.decode("cp437", "replace"), end="", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# utils/receipt_renderer.py
+"""
+Receipts and kitchen tickets rendered straight to ESC/POS bytes.
+
+The static parts of a receipt (shop header from the settings table, logo raster,
+footer, column layout) are compiled once into a ReceiptTemplate; rendering an
+order only appends its own lines to a bytearray. The template is rebuilt after
+the settings change (receipts.invalidate()), the logo raster after the image
+file changes.
+"""
+import os
+import threading
+from functools import lru_cache
+
+INIT = b"\x1b@"
+ALIGN_LEFT = b"\x1ba\x00"
+ALIGN_CENTER = b"\x1ba\x01"
+BOLD_ON = b"\x1bE\x01"
+BOLD_OFF = b"\x1bE\x00"
+SIZE_NORMAL = b"\x1d!\x00"
+SIZE_DOUBLE = b"\x1d!\x11"
+SIZE_TALL = b"\x1d!\x01"
+FEED_CUT = b"\n\n\n\x1dV\x42\x00"  # feed, then partial cut
+
+ENCODING = "cp437"
+
+
+def is_escpos(payload):
+    """True for payloads produced here (plain text jobs from older versions are not)."""
+    return bytes(payload[:2]) == INIT
+
+
+def plain_text(payload):
+    """Readable text of a rendered ticket (console / manual printers): commands and logo dropped."""
+    data = bytes(payload)
+    if not is_escpos(data):
+        return data.decode("utf-8", "replace")
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte == 0x1b:                    # ESC @ (1 byte) / ESC a n, ESC E n (2 bytes)
+            i += 2 if data[i + 1:i + 2] == b"@" else 3
+        elif byte == 0x1d:
+            op = data[i + 1:i + 2]
+            if op == b"v":                  # GS v 0 m xL xH yL yH <raster>
+                xl, xh, yl, yh = data[i + 4:i + 8]
+                i += 8 + (xl + (xh << 8)) * (yl + (yh << 8))
+            elif op == b"V":                # GS V m n
+                i += 4
+            else:                           # GS ! n
+                i += 3
+        else:
+            out.append(byte)
+            i += 1
+    return out.decode(ENCODING, "replace")
+
+
+def _enc(text):
+    return str(text).encode(ENCODING, "replace")
+
+
+@lru_cache(maxsize=4)
+def _logo_raster(path, mtime, max_dots):
+    """GS v 0 raster image for a logo file; b'' if it cannot be read."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return b""
+    try:
+        image = Image.open(path).convert("L")
+    except Exception as e:
+        print(f"⚠️ Receipt logo not usable ({path}): {e}")
+        return b""
+    if image.width > max_dots:
+        image = image.resize((max_dots, max(1, image.height * max_dots // image.width)))
+    # ESC/POS raster: 1 bit = black dot; PIL mode "1" packs white as 1, so invert first
+    bitmap = ImageOps.invert(image).convert("1")
+    width_bytes = (bitmap.width + 7) // 8
+    height = bitmap.height
+    return (b"\x1dv0\x00" + bytes((width_bytes & 0xFF, width_bytes >> 8, height & 0xFF, height >> 8))
+            + bitmap.tobytes() + b"\n")
+
+
+def logo_raster(path, max_dots=384):
+    if not path or not os.path.exists(path):
+        return b""
+    return _logo_raster(path, os.path.getmtime(path), max_dots)
+
+
+class ReceiptTemplate:
+    """Receipt layout for one settings row, compiled to byte fragments."""
+
+    def __init__(self, settings, width=32, logo_dots=384):
+        self.width = width
+        self.currency = settings.get("currency_symbol") or "DZD"
+        self.vat = float(settings.get("vat_percentage") or 0)
+
+        header = bytearray(INIT + ALIGN_CENTER)
+        header += logo_raster(settings.get("logo_path"), logo_dots)
+        header += SIZE_DOUBLE + BOLD_ON + _enc(settings.get("restaurant_name") or "") + b"\n"
+        header += SIZE_NORMAL + BOLD_OFF
+        for field in ("address", "phone"):
+            if settings.get(field):
+                header += _enc(settings[field]) + b"\n"
+        header += ALIGN_LEFT
+        self.header = bytes(header)
+
+        self.rule = _enc("-" * width) + b"\n"
+        self.footer = ALIGN_CENTER + b"\n" + BOLD_ON + _enc("*** THANK YOU ***") + BOLD_OFF + FEED_CUT
+
+        amount_w = 10
+        qty_w = 5
+        name_w = width - amount_w - qty_w
+        self._item = f"{{:<{name_w}.{name_w}}}{{:>{qty_w}}}{{:>{amount_w}.2f}}\n"
+        self._total = f"{{:<{width - amount_w}}}{{:>{amount_w}.2f}}\n"
+
+    def receipt(self, order, items):
+        """order: id, created_at, table_name, total; items: name, quantity, price."""
+        buf = bytearray(self.header)
+        buf += self.rule
+        buf += BOLD_ON + _enc(f"*** {order['table_name'] or 'No Table'} ***\n") + BOLD_OFF
+        buf += _enc(f"Order #{order['id']}\nDate: {str(order['created_at'])[:16].replace('T', ' ')}\n")
+        buf += self.rule
+
+        item_fmt = self._item
+        for item in items:
+            buf += _enc(item_fmt.format(item["name"], f"x{item['quantity']}", item["price"] * item["quantity"]))
+
+        total = order["total"] or 0
+        buf += self.rule
+        if self.vat:
+            vat = total * self.vat / (100 + self.vat)
+            buf += _enc(self._total.format(f"incl. VAT {self.vat:g}%", vat))
+        buf += BOLD_ON + SIZE_TALL + _enc(self._total.format(f"TOTAL {self.currency}", total))
+        buf += SIZE_NORMAL + BOLD_OFF
+        buf += self.footer
+        return bytes(buf)
+
+    def kitchen_ticket(self, order_id, category_name, items, table_name=None):
+        """items: product_name, quantity (negative: cancelled)."""
+        buf = bytearray(INIT + ALIGN_CENTER + SIZE_DOUBLE + BOLD_ON)
+        buf += _enc(f"{category_name}\n") + SIZE_NORMAL + BOLD_OFF
+        buf += _enc(f"Order #{order_id}\n")
+        if table_name:
+            buf += _enc(f"{table_name}\n")
+        buf += ALIGN_LEFT + self.rule + SIZE_TALL
+        for item in items:
+            if item["quantity"] < 0:
+                buf += BOLD_ON + _enc(f"CANCEL {-item['quantity']} x {item['product_name']}\n") + BOLD_OFF
+            else:
+                buf += _enc(f"{item['quantity']} x {item['product_name']}\n")
+        buf += SIZE_NORMAL + self.rule
+        buf += FEED_CUT
+        return bytes(buf)
+
+
+class ReceiptRenderer:
+    """Holds the compiled template for the current settings row."""
+
+    def __init__(self, width=32):
+        self.width = width
+        self._lock = threading.Lock()
+        self._template = None
+
+    def template(self):
+        template = self._template
+        if template is None:
+            with self._lock:
+                if self._template is None:
+                    from controllers.settings_controller import SettingsController
+
+                    self._template = ReceiptTemplate(SettingsController.get_settings(), self.width)
+                template = self._template
+        return template
+
+    def invalidate(self):
+        """Call after the settings (name, address, logo, VAT, currency) change."""
+        with self._lock:
+            self._template = None
+
+    def receipt(self, order, items):
+        return self.template().receipt(order, items)
+
+    def kitchen_ticket(self, order_id, category_name, items, table_name=None):
+        return self.template().kitchen_ticket(order_id, category_name, items, table_name)
+
+
+receipts = ReceiptRenderer()